@@ -43,9 +43,20 @@ if sys.version_info >= (3, 10):
 from sphinx.application import Sphinx
 
 # this package
-from sphinxcontrib.extras_require.directive import ExtrasRequireDirective
+from sphinxcontrib.extras_require.cache import clear_caches, report_statistics
+from sphinxcontrib.extras_require.deferred import ResolvePendingNoticesTransform, resolve_pending_notices
+from sphinxcontrib.extras_require.dependencies import check_outdated, merge_dependencies, purge_dependencies
+from sphinxcontrib.extras_require.directive import ExtrasRequireDirective, add_source_options
+from sphinxcontrib.extras_require.notice import (
+		ExpandNoticesTransform,
+		extras_require,
+		reset_prompt_cache,
+		visit_extras_require
+		)
+from sphinxcontrib.extras_require.prefetch import prefetch_requirements
 from sphinxcontrib.extras_require.purger import extras_require_purger
-from sphinxcontrib.extras_require.sources import sources  # noqa: F401
+from sphinxcontrib.extras_require.sources import sources
+from sphinxcontrib.extras_require.table import ExtrasRequireTableDirective
 
 __author__: str = "Dominic Davis-Foster"
 __copyright__: str = "2020 Dominic Davis-Foster"
@@ -67,10 +78,40 @@ def setup(app: Sphinx) -> Dict[str, Any]:
 
 	# Location of package source directory relative to documentation source directory
 	app.add_config_value("package_root", None, "env", [str])
+	app.add_config_value("package_roots", {}, "env", [dict])
 	app.add_config_value("pypi_name", None, "env", [str])
+	app.add_config_value("extras_require_site_packages", None, "env", [str])
+	app.add_config_value("extras_require_manifest", "extras-manifest.json", "env", [str])
+	app.add_config_value("extras_require_notice_cache_size", 256, '', [int])
+	app.add_config_value("extras_require_prefetch", False, '', [bool])
+	app.add_config_value("extras_require_deferred", False, "env", [bool])
+
+	# Searched here rather than on import, as it reads the metadata of every installed distribution.
+	sources.load_entry_points()
+	add_source_options(ExtrasRequireDirective.option_spec)
+	add_source_options(ExtrasRequireTableDirective.option_spec)
 
 	app.add_directive("extras-require", ExtrasRequireDirective)
+	app.add_directive("extras-require-table", ExtrasRequireTableDirective)
+	app.add_node(
+			extras_require,
+			html=(visit_extras_require, None),
+			latex=(visit_extras_require, None),
+			text=(visit_extras_require, None),
+			man=(visit_extras_require, None),
+			)
+	app.add_post_transform(ResolvePendingNoticesTransform)
+	app.add_post_transform(ExpandNoticesTransform)
+	app.connect("source-read", reset_prompt_cache)
 	app.connect("env-purge-doc", extras_require_purger.purge_nodes)
+	app.connect("env-purge-doc", purge_dependencies)
+	app.connect("env-merge-info", extras_require_purger.merge_info)
+	app.connect("env-merge-info", merge_dependencies)
+	app.connect("env-get-outdated", check_outdated)
+	app.connect("builder-inited", clear_caches)
+	app.connect("env-before-read-docs", prefetch_requirements)
+	app.connect("env-updated", resolve_pending_notices)
+	app.connect("build-finished", report_statistics)
 
 	return {
 			"version": __version__,
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+#
+#  __main__.py
+"""
+Command line interface.
+
+.. code-block:: bash
+
+	python -m sphinxcontrib.extras_require check doc-source
+	python -m sphinxcontrib.extras_require build-manifest
+
+.. versionadded:: 0.6.0
+"""
+#
+#  Copyright © 2020-2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Redistribution and use in source and binary forms, with or without modification,
+#  are permitted provided that the following conditions are met:
+#
+#      * Redistributions of source code must retain the above copyright notice,
+#        this list of conditions and the following disclaimer.
+#      * Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+#  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+#  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+#  A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER
+#  OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+
+# stdlib
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+__all__ = ["main"]
+
+
+def _check(args: argparse.Namespace) -> int:
+	# this package
+	from sphinxcontrib.extras_require.check import check_directory
+
+	n_directives, errors = check_directory(args.srcdir, jobs=args.jobs)
+
+	for error in errors:
+		print(error)
+
+	if errors:
+		print(f"Found {len(errors)} problem(s) in {n_directives} directive(s).", file=sys.stderr)
+		return 1
+
+	print(f"Checked {n_directives} directive(s).", file=sys.stderr)
+	return 0
+
+
+def _build_manifest(args: argparse.Namespace) -> int:
+	# this package
+	from sphinxcontrib.extras_require.manifest import build_manifest, write_manifest
+
+	try:
+		manifest = build_manifest(args.project_root, args.requirements)
+	except (OSError, ValueError) as e:
+		print(e, file=sys.stderr)
+		return 1
+
+	output = args.output or os.path.join(args.project_root, "extras-manifest.json")
+	write_manifest(manifest, output)
+
+	n_extras = sum(len(entry.get("extras", ())) for entry in manifest["sources"].values())
+	print(f"Wrote {n_extras} extra(s) from {len(manifest['sources'])} source(s) to {output}", file=sys.stderr)
+	return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	"""
+	Entry point for ``python -m sphinxcontrib.extras_require``.
+
+	:param argv: The command line arguments. Defaults to :py:obj:`sys.argv`.
+
+	:return: The exit code: ``0`` on success, or ``1`` if any problems were found.
+	"""
+
+	parser = argparse.ArgumentParser(prog="python -m sphinxcontrib.extras_require")
+	subparsers = parser.add_subparsers(dest="command", required=True)
+
+	check_parser = subparsers.add_parser(
+			"check",
+			help="Check the extras-require directives in a documentation project without building it.",
+			)
+	check_parser.add_argument("srcdir", help="The documentation source directory, containing conf.py.")
+	check_parser.add_argument(
+			"-j",
+			"--jobs",
+			type=int,
+			default=None,
+			help="The number of processes to use. Defaults to the number of CPUs.",
+			)
+	check_parser.set_defaults(func=_check)
+
+	manifest_parser = subparsers.add_parser(
+			"build-manifest",
+			help="Resolve every extra provided by a project into an extras manifest.",
+			)
+	manifest_parser.add_argument(
+			"project_root",
+			nargs='?',
+			default='.',
+			help="The directory containing the project's metadata files. Defaults to the current directory.",
+			)
+	manifest_parser.add_argument(
+			"-o",
+			"--output",
+			default=None,
+			help="The file to write the manifest to. Defaults to extras-manifest.json in the project root.",
+			)
+	manifest_parser.add_argument(
+			"-r",
+			"--requirements",
+			action="append",
+			default=[],
+			metavar="FILE",
+			help="A requirements file to include, relative to the project root. May be given several times.",
+			)
+	manifest_parser.set_defaults(func=_build_manifest)
+
+	args = parser.parse_args(argv)
+	return args.func(args)
+
+
+if __name__ == "__main__":
+	sys.exit(main())
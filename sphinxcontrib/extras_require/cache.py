@@ -0,0 +1,962 @@
+#!/usr/bin/env python3
+#
+#  cache.py
+"""
+Build-scoped caches for metadata parsed from requirements sources.
+
+.. versionadded:: 0.6.0
+"""
+#
+#  Copyright © 2020-2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Redistribution and use in source and binary forms, with or without modification,
+#  are permitted provided that the following conditions are met:
+#
+#      * Redistributions of source code must retain the above copyright notice,
+#        this list of conditions and the following disclaimer.
+#      * Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+#  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+#  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+#  A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER
+#  OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+
+# stdlib
+import hashlib
+import importlib.metadata
+import json
+import os
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import (
+		TYPE_CHECKING,
+		Any,
+		Callable,
+		Dict,
+		Hashable,
+		Iterator,
+		List,
+		NamedTuple,
+		Optional,
+		Tuple,
+		TypeVar
+		)
+
+# 3rd party
+from docutils import nodes
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.typing import PathLike
+from sphinx.application import Sphinx
+from sphinx.util import logging
+
+if TYPE_CHECKING:
+	# 3rd party
+	from shippinglabel.requirements import ComparableRequirement
+
+__all__ = [
+		"BaseCache",
+		"CacheStatistics",
+		"DatabaseCache",
+		"DigestCache",
+		"MetadataCache",
+		"NoticeCache",
+		"RequirementCache",
+		"RequirementsIndex",
+		"SharedCache",
+		"caches",
+		"clear_caches",
+		"file_digest",
+		"notice_cache",
+		"report_statistics",
+		"requirement_cache",
+		"requirements_index",
+		"shared_cache",
+		]
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class CacheStatistics(NamedTuple):
+	"""
+	Hit/miss counters for a :class:`~.BaseCache`.
+	"""
+
+	#: The name of the cache.
+	name: str
+
+	#: The number of lookups answered from memory.
+	hits: int
+
+	#: The number of lookups which required the source file to be parsed.
+	misses: int
+
+	#: The number of entries currently held in the cache.
+	entries: int
+
+	@property
+	def hit_rate(self) -> float:
+		"""
+		The proportion of lookups answered from memory.
+		"""
+
+		lookups = self.hits + self.misses
+		return self.hits / lookups if lookups else 0.0
+
+	def __str__(self) -> str:
+		return f"{self.name}: {self.hits} hits, {self.misses} misses, {self.entries} entries"
+
+
+def file_digest(filename: PathLike) -> str:
+	"""
+	Returns the SHA-256 hex digest of the given file's contents.
+
+	:param filename:
+	"""
+
+	with open(filename, "rb") as fp:
+		return hashlib.sha256(fp.read()).hexdigest()
+
+
+class _CacheEntry(NamedTuple):
+	signature: Tuple[int, int]
+	digest: str
+	value: Any
+
+
+class BaseCache:
+	"""
+	Base class for caches which are cleared at the start of each build.
+
+	Subclasses must store their entries in the ``_entries`` dictionary,
+	and increment :attr:`~.hits` and :attr:`~.misses` on lookups.
+
+	:param name: A short name for the cache, used when reporting statistics.
+	"""
+
+	def __init__(self, name: str):
+		self.name: str = name
+		self._entries: Dict[Any, Any] = {}
+		self.hits: int = 0
+		self.misses: int = 0
+
+		caches.append(self)
+
+	def clear(self) -> None:
+		"""
+		Remove all entries from the cache and reset the statistics.
+		"""
+
+		self._entries.clear()
+		self.hits = 0
+		self.misses = 0
+
+	@property
+	def statistics(self) -> CacheStatistics:
+		"""
+		The hit/miss statistics for the cache.
+		"""
+
+		return CacheStatistics(self.name, self.hits, self.misses, len(self._entries))
+
+	def summary(self) -> str:
+		"""
+		Returns a one-line summary of the cache, for the build log.
+		"""
+
+		statistics = self.statistics
+		return f"{statistics} ({statistics.hit_rate:.0%} hit rate)"
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def __repr__(self) -> str:
+		return f"<{type(self).__name__}({self.name!r})>"
+
+
+class MetadataCache(BaseCache):
+	"""
+	Caches the result of parsing a file for the duration of a build.
+
+	Entries are keyed on the resolved path of the file, and are only reused while the file's
+	modification time, size and SHA-256 digest are unchanged.
+	If the modification time or size differ but the digest does not the entry is still reused.
+
+	:param name: A short name for the cache, used when reporting statistics.
+	"""
+
+	_entries: Dict[str, _CacheEntry]
+
+	def __init__(self, name: str):
+		super().__init__(name)
+		self._locks: Dict[str, threading.Lock] = {}
+		self._locks_lock = threading.Lock()
+
+	def get(self, filename: PathLike, loader: Callable[[PathPlus], _T]) -> _T:
+		"""
+		Returns the parsed content of ``filename``, calling ``loader`` to parse it if required.
+
+		If several threads request the same file at once it is only parsed by one of them.
+
+		:param filename:
+		:param loader: A function which takes the path of the file and returns the parsed content.
+		"""
+
+		path = PathPlus(filename).resolve()
+		key = os.fspath(path)
+
+		with self._locks_lock:
+			lock = self._locks.setdefault(key, threading.Lock())
+
+		with lock:
+			return self._get(path, key, loader)
+
+	def _get(self, path: PathPlus, key: str, loader: Callable[[PathPlus], _T]) -> _T:
+		stat = path.stat()
+		signature = (stat.st_mtime_ns, stat.st_size)
+
+		entry = self._entries.get(key)
+
+		if entry is not None:
+			if entry.signature == signature:
+				self.hits += 1
+				return entry.value
+
+			digest = file_digest(path)
+			if entry.digest == digest:
+				self._entries[key] = entry._replace(signature=signature)
+				self.hits += 1
+				return entry.value
+		else:
+			digest = file_digest(path)
+
+		self.misses += 1
+		value = shared_cache.get(self.name, key, digest, lambda: loader(path))
+		self._entries[key] = _CacheEntry(signature, digest, value)
+
+		return value
+
+	def digest(self, filename: PathLike) -> Optional[str]:
+		"""
+		Returns the digest of ``filename`` at the time it was last parsed,
+		or :py:obj:`None` if it is not in the cache.
+
+		:param filename:
+		"""  # noqa: D400
+
+		entry = self._entries.get(os.fspath(PathPlus(filename).resolve()))
+
+		if entry is None:
+			return None
+
+		return entry.digest
+
+
+class DigestCache(BaseCache):
+	"""
+	Caches the SHA-256 digests of files for the duration of a build.
+
+	Entries are keyed on the resolved path of the file, and are only reused while the file's
+	modification time and size are unchanged.
+
+	:param name: A short name for the cache, used when reporting statistics.
+	"""
+
+	_entries: Dict[str, Tuple[Tuple[int, int], str]]
+
+	def get(self, filename: PathLike) -> str:
+		"""
+		Returns the digest of ``filename``, hashing the file if it has not been hashed or has been modified.
+
+		:param filename:
+		"""
+
+		path = PathPlus(filename).resolve()
+		key = os.fspath(path)
+		stat = path.stat()
+		signature = (stat.st_mtime_ns, stat.st_size)
+
+		entry = self._entries.get(key)
+
+		if entry is not None and entry[0] == signature:
+			self.hits += 1
+			return entry[1]
+
+		self.misses += 1
+		digest = file_digest(path)
+		self._entries[key] = (signature, digest)
+
+		return digest
+
+
+class RequirementCache(BaseCache):
+	"""
+	Interns parsed :pep:`508` requirements, and caches validated lists of requirements, for the duration of a build.
+
+	Each distinct requirement string is only parsed once,
+	and requirements which are equal once formatted share a single object.
+	"""
+
+	_entries: Dict[Hashable, Tuple[str, ...]]
+
+	def __init__(self):
+		super().__init__("requirements")
+		self._requirements: Dict[str, "ComparableRequirement"] = {}
+		self._interned: Dict[str, "ComparableRequirement"] = {}
+
+	def parse(self, requirement: str) -> "ComparableRequirement":
+		"""
+		Parse the given requirement, returning the interned object.
+
+		:param requirement:
+
+		:raises: :exc:`packaging.requirements.InvalidRequirement` if the requirement is invalid.
+		"""
+
+		key = requirement.strip()
+		parsed = self._requirements.get(key)
+
+		if parsed is None:
+			# 3rd party
+			from shippinglabel.requirements import ComparableRequirement
+
+			parsed = ComparableRequirement(key)
+			parsed = self._interned.setdefault(str(parsed), parsed)
+			self._requirements[key] = parsed
+
+		return parsed
+
+	def get(self, key: Hashable, validator: Callable[[], Tuple[str, ...]]) -> Tuple[str, ...]:
+		"""
+		Returns the validated requirements for ``key``, calling ``validator`` to produce them if required.
+
+		:param key: A hashable representation of the unvalidated requirements.
+		:param validator:
+		"""
+
+		if key in self._entries:
+			self.hits += 1
+			return self._entries[key]
+
+		self.misses += 1
+		value = self._entries[key] = validator()
+		return value
+
+	def memory_usage(self) -> int:
+		"""
+		Returns the approximate memory used by the cache, in bytes.
+
+		The requirement objects themselves are counted by their formatted size.
+		"""
+
+		size = sys.getsizeof(self._entries) + sys.getsizeof(self._requirements) + sys.getsizeof(self._interned)
+
+		for key, value in self._entries.items():
+			size += sys.getsizeof(key) + sys.getsizeof(value)
+			size += sum(map(sys.getsizeof, key)) if isinstance(key, tuple) else 0
+
+		for string in self._requirements:
+			size += sys.getsizeof(string)
+
+		for string in self._interned:
+			size += 2 * sys.getsizeof(string)
+
+		return size
+
+	def clear(self) -> None:
+		"""
+		Remove all entries from the cache and reset the statistics.
+		"""
+
+		super().clear()
+		self._requirements.clear()
+		self._interned.clear()
+
+	def summary(self) -> str:
+		"""
+		Returns a one-line summary of the cache, for the build log.
+		"""
+
+		return (
+				f"{super().summary()}, {len(self._interned)} unique requirements, "
+				f"~{self.memory_usage() / 1024:.1f} KiB"
+				)
+
+
+class NoticeCache(BaseCache):
+	"""
+	Least-recently-used cache of rendered notices, for the duration of a build.
+
+	The cache holds a prototype of each notice, and each lookup returns a deep copy of it.
+
+	:param maxsize: The maximum number of notices to hold.
+	"""
+
+	_entries: "OrderedDict[Hashable, nodes.Element]"
+
+	def __init__(self, maxsize: int = 256):
+		super().__init__("notices")
+		self._entries = OrderedDict()
+		self.maxsize: int = maxsize
+		self.evictions: int = 0
+
+	def get(self, key: Hashable, factory: Callable[[], nodes.Element]) -> nodes.Element:
+		"""
+		Returns a copy of the notice for ``key``, calling ``factory`` to create it if required.
+
+		:param key: A hashable representation of everything which affects the content of the notice.
+		:param factory:
+		"""
+
+		prototype = self._entries.get(key)
+
+		if prototype is not None:
+			self.hits += 1
+			self._entries.move_to_end(key)
+		else:
+			self.misses += 1
+			prototype = self._entries[key] = factory()
+
+			while len(self._entries) > max(self.maxsize, 0):
+				self._entries.popitem(last=False)
+				self.evictions += 1
+
+		return prototype.deepcopy()
+
+	def clear(self) -> None:
+		"""
+		Remove all entries from the cache and reset the statistics.
+		"""
+
+		super().clear()
+		self.evictions = 0
+
+	def summary(self) -> str:
+		"""
+		Returns a one-line summary of the cache, for the build log.
+		"""
+
+		return f"{super().summary()}, {self.evictions} evictions"
+
+
+class DatabaseCache(BaseCache):
+	"""
+	Base class for caches stored in an SQLite database, which can be used by several processes at once.
+
+	Concurrent access is coordinated by SQLite's own file locking.
+	Each process and thread uses its own connection,
+	and each group of statements which modifies the database is run in a single ``BEGIN IMMEDIATE`` transaction.
+	The database is not used until :meth:`~.DatabaseCache.open` is called.
+
+	:param name: A short name for the cache, used when reporting statistics.
+	"""
+
+	#: The statements used to create the tables of the database.
+	schema: Tuple[str, ...] = ()
+
+	#: The version of the schema. The tables are recreated if the database has a different version.
+	version: int = 1
+
+	def __init__(self, name: str):
+		super().__init__(name)
+		self.filename: Optional[str] = None
+		self._local = threading.local()
+
+	def open(self, filename: PathLike) -> None:
+		"""
+		Use the database at ``filename``.
+
+		:param filename:
+		"""
+
+		self.close()
+		self.filename = os.fspath(filename)
+		self._connect()
+
+	def close(self) -> None:
+		"""
+		Close the connection to the database.
+		"""
+
+		connection = getattr(self._local, "connection", None)
+
+		if connection is not None and self._local.pid == os.getpid():
+			connection.close()
+
+		self._local.connection = None
+		self.filename = None
+
+	def _connect(self) -> Optional[sqlite3.Connection]:
+		"""
+		Returns the connection to the database for the current process,
+		or :py:obj:`None` if the database is not in use.
+		"""  # noqa: D400
+
+		if self.filename is None:
+			return None
+
+		local = self._local
+
+		# Connections cannot be shared with other threads, or with processes created by fork().
+		if (
+				getattr(local, "connection", None) is None or local.pid != os.getpid()
+				or local.filename != self.filename
+				):
+			if getattr(local, "connection", None) is not None and local.pid == os.getpid():
+				local.connection.close()
+
+			try:
+				os.makedirs(os.path.dirname(self.filename) or os.curdir, exist_ok=True)
+				connection = sqlite3.connect(self.filename, timeout=60, isolation_level=None)
+				connection.execute("PRAGMA journal_mode=WAL")
+				self._create_tables(connection)
+			except (OSError, sqlite3.Error) as e:
+				logger.warning(f"[extras_require] Unable to use the {self.name} cache {self.filename!r}: {e}")
+				self.filename = None
+				return None
+
+			local.connection = connection
+			local.pid = os.getpid()
+			local.filename = self.filename
+
+		return local.connection
+
+	@staticmethod
+	@contextmanager
+	def _transaction(connection: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+		"""
+		Context manager which runs the statements within the ``with`` block in a single transaction.
+
+		The database is locked for writing when the transaction begins, rather than at the first write,
+		so another process cannot modify it between the statements.
+		The transaction is committed at the end of the block, or rolled back if an exception is raised.
+
+		:param connection:
+		"""
+
+		connection.execute("BEGIN IMMEDIATE")
+
+		try:
+			yield connection
+		except BaseException:
+			connection.execute("ROLLBACK")
+			raise
+
+		connection.execute("COMMIT")
+
+	def _create_tables(self, connection: sqlite3.Connection) -> None:
+		"""
+		Create the tables of the database, replacing them if the schema version has changed.
+
+		:param connection:
+		"""
+
+		with self._transaction(connection):
+			(version, ) = connection.execute("PRAGMA user_version").fetchone()
+
+			if version != self.version:
+				tables = connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+				for (table, ) in tables:
+					connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+
+				connection.execute(f"PRAGMA user_version = {int(self.version)}")
+
+			for statement in self.schema:
+				connection.execute(statement)
+
+	def _count(self, table: str) -> int:
+		connection = self._connect()
+
+		if connection is None:
+			return 0
+
+		return connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+class SharedCache(DatabaseCache):
+	"""
+	SQLite database, shared between the processes used to read documents in parallel,
+	which holds the content parsed by each :class:`~.MetadataCache`.
+
+	When ``sphinx-build`` is run with ``-j N`` the first process to parse a file stores the result,
+	and the other processes load it from the database rather than parsing the file again.
+
+	Entries are keyed on the name of the :class:`~.MetadataCache`, the path of the file, and its SHA-256 digest.
+	Only values which can be serialised to JSON are stored.
+	"""  # noqa: D400
+
+	schema = (
+			"CREATE TABLE IF NOT EXISTS metadata "
+			"(cache TEXT, path TEXT, digest TEXT, value TEXT, PRIMARY KEY (cache, path, digest))",
+			)
+
+	def __init__(self):
+		super().__init__("shared")
+
+	def open(self, filename: PathLike) -> None:
+		"""
+		Use the database at ``filename``, removing any entries left from a previous build.
+
+		:param filename:
+		"""
+
+		super().open(filename)
+
+		connection = self._connect()
+		if connection is not None:
+			with self._transaction(connection):
+				connection.execute("DELETE FROM metadata")
+
+	def get(self, cache: str, path: str, digest: str, loader: Callable[[], _T]) -> _T:
+		"""
+		Returns the value stored for the given file, calling ``loader`` to parse it if required.
+
+		:param cache: The name of the :class:`~.MetadataCache`.
+		:param path: The resolved path of the file.
+		:param digest: The SHA-256 digest of the file.
+		:param loader: A function which returns the parsed content of the file.
+		"""
+
+		connection = self._connect()
+
+		if connection is None:
+			return loader()
+
+		row = connection.execute(
+				"SELECT value FROM metadata WHERE cache = ? AND path = ? AND digest = ?",
+				(cache, path, digest),
+				).fetchone()
+
+		if row is not None:
+			self.hits += 1
+			return json.loads(row[0])
+
+		self.misses += 1
+		value = loader()
+
+		try:
+			serialised = json.dumps(value)
+		except (TypeError, ValueError):
+			return value
+
+		with self._transaction(connection):
+			connection.execute("DELETE FROM metadata WHERE cache = ? AND path = ?", (cache, path))
+			connection.execute(
+					"INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?)",
+					(cache, path, digest, serialised),
+					)
+
+		return value
+
+	def __len__(self) -> int:
+		return self._count("metadata")
+
+	@property
+	def statistics(self) -> CacheStatistics:
+		"""
+		The hit/miss statistics for the cache.
+		"""
+
+		return CacheStatistics(self.name, self.hits, self.misses, len(self))
+
+
+class RequirementsIndex(DatabaseCache):
+	"""
+	SQLite database of validated requirements, which persists between builds.
+
+	Each entry maps a requirements source, the value of its option and the name of an extra
+	to the validated requirements, together with the SHA-256 digests of the files the source read.
+	The entry is reused for as long as the digests of those files match the ones stored with it,
+	so neither the source nor :func:`~.validate_requirements` need to be run again.
+
+	The current digest of each file is also stored, with its modification time and size,
+	so unmodified files are not read again to check them.
+
+	Entries for files which no longer exist are removed when the database is opened,
+	and the whole index is discarded if the configuration it was created with changes,
+	or if this extension, :mod:`packaging` or :mod:`shippinglabel` are upgraded.
+	"""
+
+	schema = (
+			"CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)",
+			"CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, digest TEXT, mtime_ns INTEGER, size INTEGER)",
+			"CREATE TABLE IF NOT EXISTS extras (key TEXT PRIMARY KEY, files TEXT, requirements TEXT)",
+			)
+
+	# The digests of the files read for each extra are stored with it, rather than shared between entries.
+	version = 2
+
+	def __init__(self):
+		super().__init__("index")
+
+	def open(self, filename: PathLike, fingerprint: str = '') -> None:
+		"""
+		Use the database at ``filename``.
+
+		:param filename:
+		:param fingerprint: A string identifying the configuration and versions which affect the requirements.
+			If it differs from the one the index was created with the index is emptied.
+		"""
+
+		super().open(filename)
+
+		connection = self._connect()
+		if connection is None:
+			return
+
+		with self._transaction(connection):
+			row = connection.execute("SELECT value FROM meta WHERE name = 'fingerprint'").fetchone()
+
+			if row is None or row[0] != fingerprint:
+				connection.execute("DELETE FROM files")
+				connection.execute("DELETE FROM extras")
+				connection.execute("INSERT OR REPLACE INTO meta VALUES ('fingerprint', ?)", (fingerprint, ))
+
+			self._collect_garbage(connection)
+
+	@staticmethod
+	def _collect_garbage(connection: sqlite3.Connection) -> None:
+		"""
+		Remove the entries for files which no longer exist.
+
+		:param connection:
+		"""
+
+		missing = {path for (path, ) in connection.execute("SELECT path FROM files") if not os.path.isfile(path)}
+
+		if not missing:
+			return
+
+		connection.executemany("DELETE FROM files WHERE path = ?", [(path, ) for path in missing])
+
+		for key, files in connection.execute("SELECT key, files FROM extras").fetchall():
+			if missing.intersection(json.loads(files)):
+				connection.execute("DELETE FROM extras WHERE key = ?", (key, ))
+
+	@staticmethod
+	def _key(package_root: PathLike, option_name: str, value: Any, extra: str) -> str:
+		return json.dumps([os.fspath(package_root), option_name, value, extra])
+
+	def _current_digest(self, connection: sqlite3.Connection, path: str) -> Optional[str]:
+		"""
+		Returns the SHA-256 digest of ``path``, or :py:obj:`None` if it cannot be read.
+
+		The stored digest is used if the file's modification time and size are unchanged.
+
+		:param connection:
+		:param path:
+		"""
+
+		try:
+			stat = os.stat(path)
+		except OSError:
+			return None
+
+		row = connection.execute("SELECT digest, mtime_ns, size FROM files WHERE path = ?", (path, )).fetchone()
+
+		if row is not None and (stat.st_mtime_ns, stat.st_size) == (row[1], row[2]):
+			return row[0]
+
+		try:
+			digest = file_digest(path)
+		except OSError:
+			return None
+
+		with self._transaction(connection):
+			connection.execute(
+					"INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+					(path, digest, stat.st_mtime_ns, stat.st_size),
+					)
+
+		return digest
+
+	def get(
+			self,
+			package_root: PathLike,
+			option_name: str,
+			value: Any,
+			extra: str,
+			) -> Optional[Tuple[List[str], List[str]]]:
+		"""
+		Returns the files read by the source and the validated requirements,
+		or :py:obj:`None` if they are not in the index or any of the files have changed.
+
+		:param package_root: The path to the package root.
+		:param option_name: The name of the directive option for the source.
+		:param value: The value of the option.
+		:param extra: The name of the "extra".
+		"""  # noqa: D400
+
+		connection = self._connect()
+
+		if connection is None:
+			return None
+
+		row = connection.execute(
+				"SELECT files, requirements FROM extras WHERE key = ?",
+				(self._key(package_root, option_name, value, extra), ),
+				).fetchone()
+
+		if row is not None:
+			digests: Dict[str, str] = json.loads(row[0])
+			if all(self._current_digest(connection, path) == digest for path, digest in digests.items()):
+				self.hits += 1
+				return list(digests), json.loads(row[1])
+
+		self.misses += 1
+		return None
+
+	def set(  # noqa: A003
+			self,
+			package_root: PathLike,
+			option_name: str,
+			value: Any,
+			extra: str,
+			files: List[str],
+			requirements: List[str],
+			) -> None:
+		"""
+		Store the validated requirements obtained from a source.
+
+		:param package_root: The path to the package root.
+		:param option_name: The name of the directive option for the source.
+		:param value: The value of the option.
+		:param extra: The name of the "extra".
+		:param files: The files read by the source. Must not be empty.
+		:param requirements: The validated requirements.
+		"""
+
+		connection = self._connect()
+
+		if connection is None or not files:
+			return
+
+		rows = []
+		digests = {}
+
+		for path in files:
+			try:
+				stat = os.stat(path)
+				digests[path] = file_digest(path)
+			except OSError:
+				return
+
+			rows.append((path, digests[path], stat.st_mtime_ns, stat.st_size))
+
+		with self._transaction(connection):
+			connection.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", rows)
+			connection.execute(
+					"INSERT OR REPLACE INTO extras VALUES (?, ?, ?)",
+					(self._key(package_root, option_name, value, extra), json.dumps(digests), json.dumps(requirements)),
+					)
+
+	def __len__(self) -> int:
+		return self._count("extras")
+
+	@property
+	def statistics(self) -> CacheStatistics:
+		"""
+		The hit/miss statistics for the cache.
+		"""
+
+		return CacheStatistics(self.name, self.hits, self.misses, len(self))
+
+
+#: List of all caches which have been created.
+caches: List[BaseCache] = []
+
+
+def clear_caches(app: Optional[Sphinx] = None) -> None:
+	"""
+	Clear all caches.
+
+	This is connected to the :event:`builder-inited` event, so each build starts with empty caches.
+	The databases in the doctree directory are also opened, and :data:`~.requirements_index`
+	keeps its entries from previous builds.
+
+	:param app: The Sphinx application.
+	"""
+
+	for cache in caches:
+		cache.clear()
+
+	if app is not None:
+		notice_cache.maxsize = app.config.extras_require_notice_cache_size
+		shared_cache.open(os.path.join(app.doctreedir, "extras_require.sqlite"))
+
+		# this package
+		from sphinxcontrib.extras_require import __version__
+
+		# The entries were validated and normalised by this extension, packaging and shippinglabel,
+		# so they are discarded when any of those are upgraded.
+		fingerprint = json.dumps([
+				__version__,
+				importlib.metadata.version("packaging"),
+				importlib.metadata.version("shippinglabel"),
+				os.fspath(app.srcdir),
+				app.config.package_root,
+				sorted((app.config.package_roots or {}).items()),
+				app.config.pypi_name,
+				app.config.project,
+				app.config.extras_require_site_packages,
+				app.config.extras_require_manifest,
+				])
+		requirements_index.open(os.path.join(app.doctreedir, "extras_require_index.sqlite"), fingerprint)
+
+
+def report_statistics(app: Sphinx, exception: Optional[Exception] = None) -> None:
+	"""
+	Log the hit/miss statistics of all caches which were used during the build.
+
+	This is connected to the :event:`build-finished` event. The statistics are shown when
+	``sphinx-build`` is run with ``-v``.
+
+	:param app: The Sphinx application.
+	:param exception:
+	"""
+
+	for cache in caches:
+		statistics = cache.statistics
+		if statistics.hits or statistics.misses:
+			logger.verbose(f"[extras_require] {cache.summary()}")
+
+
+#: Instance of :class:`~.NoticeCache` used by :class:`~.ExtrasRequireDirective`.
+#:
+#: The size is set from :confval:`extras_require_notice_cache_size` at the start of each build.
+#:
+#: .. versionadded:: 0.6.0
+notice_cache = NoticeCache()
+
+#: Instance of :class:`~.SharedCache` used by each :class:`~.MetadataCache`.
+#:
+#: The database is stored in the doctree directory, and is emptied at the start of each build.
+#:
+#: .. versionadded:: 0.6.0
+shared_cache = SharedCache()
+
+#: Instance of :class:`~.RequirementsIndex` used by :func:`~.get_requirements`.
+#:
+#: The database is stored in the doctree directory.
+#:
+#: .. versionadded:: 0.6.0
+requirements_index = RequirementsIndex()
+
+#: Instance of :class:`~.RequirementCache` used by :func:`~.validate_requirements`.
+#:
+#: .. versionadded:: 0.6.0
+requirement_cache = RequirementCache()
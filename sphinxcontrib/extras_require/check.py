@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+#
+#  check.py
+"""
+Check the :rst:dir:`extras-require` directives in a documentation project without building it.
+
+.. versionadded:: 0.6.0
+"""
+#
+#  Copyright © 2020-2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Redistribution and use in source and binary forms, with or without modification,
+#  are permitted provided that the following conditions are met:
+#
+#      * Redistributions of source code must retain the above copyright notice,
+#        this list of conditions and the following disclaimer.
+#      * Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+#  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+#  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+#  A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER
+#  OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+
+# stdlib
+import importlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, cast
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.typing import PathLike
+from sphinx.config import eval_config_file
+from sphinx.util.matching import Matcher
+from sphinx.util.tags import Tags
+
+# this package
+from sphinxcontrib.extras_require.directive import ExtrasRequireDirective, add_source_options, get_requirements
+from sphinxcontrib.extras_require.prefetch import extract_directives
+from sphinxcontrib.extras_require.sources import sources
+
+__all__ = ["CheckEnvironment", "CheckError", "check_directory", "check_file", "find_documents"]
+
+#: The default values of the configuration values used by the sources.
+_config_defaults: Dict[str, Any] = {
+		"project": "Python",
+		"package_root": None,
+		"package_roots": {},
+		"pypi_name": None,
+		"extras_require_site_packages": None,
+		"extras_require_manifest": "extras-manifest.json",
+		"exclude_patterns": [],
+		"extensions": [],
+		}
+
+
+class CheckError(NamedTuple):
+	"""
+	A problem with an :rst:dir:`extras-require` directive.
+	"""
+
+	#: The path to the file containing the directive.
+	filename: str
+
+	#: The line number of the directive.
+	lineno: int
+
+	#: A description of the problem.
+	message: str
+
+	def __str__(self) -> str:
+		return f"{self.filename}:{self.lineno}: {self.message}"
+
+
+class CheckEnvironment:
+	"""
+	Stands in for the Sphinx build environment when obtaining requirements outside of a build.
+
+	:param srcdir: The documentation source directory, containing ``conf.py``.
+	"""
+
+	def __init__(self, srcdir: PathLike):
+		self.srcdir = os.fspath(os.path.abspath(srcdir))
+
+		config = dict(_config_defaults)
+		conf_py = os.path.join(self.srcdir, "conf.py")
+
+		if os.path.isfile(conf_py):
+			config.update(eval_config_file(conf_py, Tags()))
+
+		#: The values from ``conf.py``, with the defaults for those which are not set.
+		self.config = SimpleNamespace(**config)
+
+	def import_extensions(self) -> None:
+		"""
+		Import the extensions listed in ``conf.py``, so any requirements sources they provide are registered,
+		along with those provided by entry points.
+
+		Extensions which cannot be imported are ignored.
+		"""
+
+		for extension in self.config.extensions:
+			try:
+				importlib.import_module(extension)
+			except Exception:  # pylint: disable=broad-except
+				pass
+
+		sources.load_entry_points()
+		add_source_options(ExtrasRequireDirective.option_spec)
+
+
+def find_documents(srcdir: PathLike) -> List[PathPlus]:
+	"""
+	Returns the reStructuredText files in ``srcdir``, excluding those matching ``exclude_patterns`` in ``conf.py``.
+
+	:param srcdir: The documentation source directory.
+	"""
+
+	srcdir = PathPlus(srcdir)
+	excluded = Matcher(CheckEnvironment(srcdir).config.exclude_patterns)
+
+	return sorted(
+			filename for filename in srcdir.rglob("*.rst")
+			if not excluded(filename.relative_to(srcdir).as_posix())
+			)
+
+
+def check_file(env: CheckEnvironment, filename: PathLike) -> Tuple[int, List[CheckError]]:
+	"""
+	Check the :rst:dir:`extras-require` directives in a file.
+
+	:param env:
+	:param filename:
+
+	:return: The number of directives checked, and the problems found with them.
+	"""
+
+	filename = os.fspath(filename)
+	errors: List[CheckError] = []
+	n_directives = 0
+
+	try:
+		with open(filename, encoding="UTF-8") as fp:
+			directives = list(extract_directives(fp))
+	except (OSError, UnicodeDecodeError) as e:
+		return 0, [CheckError(filename, 0, str(e))]
+
+	for directive in directives:
+		n_directives += 1
+		options = {}
+
+		try:
+			for name, value in directive.options.items():
+				if name not in ExtrasRequireDirective.option_spec:
+					raise ValueError(f"Unknown option {name!r}")
+
+				# As with docutils, options without a value are passed to the validator as None,
+				# which flags accept and the other validators reject.
+				validator = cast(Callable[[Optional[str]], Any], ExtrasRequireDirective.option_spec[name])
+
+				try:
+					options[name] = validator(value)
+				except (ValueError, TypeError) as e:
+					raise ValueError(f"Invalid value for the {name!r} option: {e}") from None
+
+			requirements = get_requirements(env, directive.extra, options, directive.content)  # type: ignore[arg-type]
+
+		except Exception as e:  # pylint: disable=broad-except
+			errors.append(CheckError(filename, directive.lineno, str(e)))
+		else:
+			if not requirements:
+				errors.append(CheckError(filename, directive.lineno, "No requirements specified"))
+
+	return n_directives, errors
+
+
+_worker_env: Optional[CheckEnvironment] = None
+
+
+def _init_worker(srcdir: str) -> None:
+	global _worker_env
+
+	_worker_env = CheckEnvironment(srcdir)
+	_worker_env.import_extensions()
+
+
+def _check_file_in_worker(filename: str) -> Tuple[int, List[CheckError]]:
+	assert _worker_env is not None
+	return check_file(_worker_env, filename)
+
+
+def check_directory(srcdir: PathLike, jobs: Optional[int] = None) -> Tuple[int, List[CheckError]]:
+	"""
+	Check the :rst:dir:`extras-require` directives in every reStructuredText file in a documentation project.
+
+	The files are checked in a pool of processes.
+
+	:param srcdir: The documentation source directory, containing ``conf.py``.
+	:param jobs: The number of processes to use. Defaults to the number of CPUs.
+		If ``1`` the files are checked in the current process.
+
+	:return: The number of directives checked, and the problems found with them,
+		sorted by filename and line number.
+	"""
+
+	srcdir = os.fspath(os.path.abspath(srcdir))
+	filenames = list(map(os.fspath, find_documents(srcdir)))
+
+	if jobs is None:
+		jobs = os.cpu_count() or 1
+
+	if jobs == 1 or len(filenames) < 2:
+		_init_worker(srcdir)
+		results = list(map(_check_file_in_worker, filenames))
+	else:
+		with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(srcdir, )) as executor:
+			results = list(executor.map(_check_file_in_worker, filenames, chunksize=8))
+
+	n_directives = sum(result[0] for result in results)
+	errors = sorted(error for result in results for error in result[1])
+
+	return n_directives, errors
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+#
+#  deferred.py
+"""
+Batched resolution of the requirements for notices after all documents have been read.
+
+.. versionadded:: 0.6.0
+"""
+#
+#  Copyright © 2020-2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Redistribution and use in source and binary forms, with or without modification,
+#  are permitted provided that the following conditions are met:
+#
+#      * Redistributions of source code must retain the above copyright notice,
+#        this list of conditions and the following disclaimer.
+#      * Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+#  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+#  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+#  A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER
+#  OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+
+# stdlib
+from collections import defaultdict
+from typing import Any, DefaultDict, Dict, List, Optional, Tuple, Union
+
+# 3rd party
+from docutils import nodes
+from sphinx.application import Sphinx
+from sphinx.environment import BuildEnvironment
+from sphinx.transforms.post_transforms import SphinxPostTransform
+from sphinx.util import logging
+
+# this package
+from sphinxcontrib.extras_require.dependencies import record_files, record_requirements
+from sphinxcontrib.extras_require.directive import resolve_requirements
+from sphinxcontrib.extras_require.notice import findall, pending_extras_require
+from sphinxcontrib.extras_require.purger import extras_require_purger
+
+__all__ = ["ResolvePendingNoticesTransform", "resolve_pending_notices"]
+
+logger = logging.getLogger(__name__)
+
+
+def _resolve(
+		env: BuildEnvironment,
+		option_name: str,
+		options: Dict[str, Any],
+		extras: List[str],
+		) -> Dict[str, Tuple[Union[List[str], Exception], List[str]]]:
+	"""
+	Obtain the requirements for several extras from a source.
+
+	If they cannot all be obtained at once each extra is obtained separately,
+	so one which cannot be obtained does not prevent the others from being shown.
+
+	:param env: The Sphinx build environment.
+	:param option_name: The name of the directive option for the source.
+	:param options: The source's option, and the ``:package:`` option if it was given.
+	:param extras: The names of the extras.
+
+	:return: A mapping of the names of the extras to their requirements, or the exception raised
+		when obtaining them, and the files read by the source.
+	"""
+
+	with record_files() as recorder:
+		try:
+			requirements = resolve_requirements(env, option_name, options, extras)
+		except Exception as e:  # pylint: disable=broad-except
+			if len(extras) == 1:
+				return {extras[0]: (e, recorder.files)}
+		else:
+			return {extra: (requirements[extra], recorder.files) for extra in extras}
+
+	resolved = {}
+
+	for extra in extras:
+		resolved.update(_resolve(env, option_name, options, [extra]))
+
+	return resolved
+
+
+def resolve_pending_notices(app: Sphinx, env: BuildEnvironment) -> List[str]:
+	"""
+	Obtain the requirements for all :class:`~.pending_extras_require` nodes created while reading the documents.
+
+	The nodes are grouped by source, option value and package, and the requirements for each group are
+	obtained at once using :func:`~.resolve_requirements`. The requirements for each extra are
+	only obtained and validated once however many documents show the notice.
+	The requirements are stored in the records kept by :data:`~.extras_require_purger`.
+
+	If the requirements for an extra cannot be obtained, or there are none,
+	a warning is emitted for each directive showing it, and the notice is not shown.
+
+	This is connected to the :event:`env-updated` event.
+
+	:param app: The Sphinx application.
+	:param env: The Sphinx build environment.
+	"""
+
+	records = extras_require_purger.get_records(env)
+	pending: DefaultDict[Tuple[str, Any, Optional[str]], Dict[str, List[Tuple[str, int]]]] = defaultdict(dict)
+
+	for docname, document_records in records.items():
+		for idx, record in enumerate(document_records):
+			if record.requirements is None and record.source is not None:
+				pending[record.source].setdefault(record.extra, []).append((docname, idx))
+
+	for (option_name, value, package), extras in sorted(pending.items(), key=repr):
+		options = {option_name: value}
+		if package is not None:
+			options["package"] = package
+
+		resolved = _resolve(env, option_name, options, list(extras))
+
+		for extra, locations in extras.items():
+			requirements, files = resolved[extra]
+
+			for docname, idx in locations:
+				record = records[docname][idx]
+
+				if isinstance(requirements, Exception):
+					# Read the document again when the files are changed.
+					env.dependencies[docname].update(files)
+					logger.warning(str(requirements), location=(docname, record.lineno))
+					records[docname][idx] = record._replace(requirements=())
+					continue
+
+				if not requirements:
+					logger.warning(
+							"No requirements specified! No notice will be shown in the documentation.",
+							location=(docname, record.lineno),
+							)
+
+				records[docname][idx] = record._replace(requirements=tuple(requirements))
+				record_requirements(
+						env,
+						option_name,
+						value,
+						extra,
+						requirements,
+						docname=docname,
+						files=files,
+						package=package,
+						)
+
+	if pending:
+		n_extras = sum(len(extras) for extras in pending.values())
+		logger.verbose(f"[extras_require] resolved {n_extras} deferred extras from {len(pending)} sources")
+
+	return []
+
+
+class ResolvePendingNoticesTransform(SphinxPostTransform):
+	"""
+	Replaces :class:`~.pending_extras_require` nodes with :class:`~.extras_require` nodes,
+	using the requirements obtained by :func:`~.resolve_pending_notices`.
+
+	If there are no requirements the node and its target are replaced with a
+	:class:`docutils.nodes.problematic` node, as when the requirements are obtained while reading.
+	"""  # noqa: D400
+
+	# Before ExpandNoticesTransform
+	default_priority = 100
+
+	def run(self, **kwargs: Any) -> None:  # noqa: D102
+		records = {
+				record.target: record
+				for record in extras_require_purger.get_records(self.env).get(self.env.docname, ())
+				}
+
+		for node in list(findall(self.document, pending_extras_require)):
+			record = records.get(node["target"])
+
+			if record is not None and record.requirements:
+				node.replace_self(node.resolve(record.requirements))
+				continue
+
+			# The warning was emitted by resolve_pending_notices().
+			parent = node.parent
+			index = parent.index(node)
+			previous = parent[index - 1] if index else None
+
+			# The target's ID has usually been moved to the pending node, which now refers to it.
+			if isinstance(previous, nodes.target) and node["target"] in {*previous["ids"], previous.get("refid")}:
+				parent.remove(previous)
+
+			# Not replace_self(), which would copy the ID.
+			block_text = node.get("block_text", '')
+			parent.replace(node, nodes.problematic(block_text, block_text))
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+#
+#  dependencies.py
+"""
+Tracking of the files read by the requirements sources, for incremental builds.
+
+.. versionadded:: 0.6.0
+"""
+#
+#  Copyright © 2020-2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Redistribution and use in source and binary forms, with or without modification,
+#  are permitted provided that the following conditions are met:
+#
+#      * Redistributions of source code must retain the above copyright notice,
+#        this list of conditions and the following disclaimer.
+#      * Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+#  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+#  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+#  A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER
+#  OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+
+# stdlib
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+# 3rd party
+from domdf_python_tools.typing import PathLike
+from sphinx.application import Sphinx
+from sphinx.environment import BuildEnvironment
+from sphinx.util import logging
+
+# The modification time of a file, in the units Sphinx uses for BuildEnvironment.all_docs.
+_last_modified_time: Callable[[str], float]
+
+try:
+	# 3rd party
+	from sphinx.environment import _last_modified_time
+except ImportError:  # pragma: no cover (sphinx>=7.2)
+	# stdlib
+	from os.path import getmtime as _last_modified_time
+
+__all__ = [
+		"DocumentDependencies",
+		"FileRecorder",
+		"check_outdated",
+		"get_dependencies",
+		"merge_dependencies",
+		"note_dependency",
+		"note_volatile",
+		"purge_dependencies",
+		"record_files",
+		"record_package_name",
+		"record_requirements",
+		"requirements_digest",
+		]
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentDependencies:
+	"""
+	The files read by the requirements sources for a document,
+	and digests of the requirements obtained from each source.
+	"""  # noqa: D400
+
+	def __init__(self):
+		#: The files read by the requirements sources, as passed to :meth:`~.BuildEnvironment.note_dependency`.
+		self.files: Set[str] = set()
+
+		#: Mapping of ``(option name, option value, extra, package)`` to the digest of the requirements.
+		#: An extra of :py:obj:`None` refers to the names of all the extras provided by the source.
+		self.digests: Dict[Tuple[str, Hashable, Optional[str], Optional[str]], str] = {}
+
+		#: Mapping of the packages in :confval:`package_roots` to the distribution names shown for them.
+		self.package_names: Dict[str, str] = {}
+
+	def __repr__(self) -> str:
+		return (
+				f"<{type(self).__name__}(files={sorted(self.files)!r}, digests={self.digests!r}, "
+				f"package_names={self.package_names!r})>"
+				)
+
+
+def get_dependencies(env: BuildEnvironment) -> Dict[str, DocumentDependencies]:
+	"""
+	Returns the mapping of document names to :class:`~.DocumentDependencies` stored on the environment.
+
+	:param env: The Sphinx build environment.
+	"""
+
+	if not hasattr(env, "extras_require_dependencies"):
+		env.extras_require_dependencies = {}  # type: ignore[attr-defined]
+
+	return env.extras_require_dependencies  # type: ignore[attr-defined]
+
+
+def _current_docname(env: Optional[BuildEnvironment]) -> Optional[str]:
+	"""
+	Returns the name of the document being read, or :py:obj:`None` outside of the read phase.
+
+	:param env: The Sphinx build environment.
+	"""
+
+	if env is None:
+		return None
+
+	return getattr(env, "temp_data", {}).get("docname")
+
+
+def note_dependency(env: Optional[BuildEnvironment], filename: PathLike) -> None:
+	"""
+	Record that the document currently being read depends on ``filename``.
+
+	Requirements sources should call this for each file they read.
+	It has no effect outside of the read phase.
+
+	:param env: The Sphinx build environment.
+	:param filename:
+	"""
+
+	filename = os.fspath(filename)
+
+	for recorder in _active_recorders():
+		recorder.files.append(filename)
+
+	docname = _current_docname(env)
+
+	if docname is None:
+		return
+
+	env.note_dependency(filename)  # type: ignore[union-attr]
+	get_dependencies(env).setdefault(docname, DocumentDependencies()).files.add(filename)  # type: ignore[arg-type]
+
+
+class FileRecorder:
+	"""
+	Collects the files passed to :func:`~.note_dependency` while it is active.
+
+	.. seealso:: :func:`~.record_files`
+	"""
+
+	def __init__(self):
+		#: The files read by the requirements source.
+		self.files: List[str] = []
+
+		#: Whether the requirements depend on more than the content of :attr:`~.files`.
+		self.volatile: bool = False
+
+
+_recorders = threading.local()
+
+
+def _active_recorders() -> List[FileRecorder]:
+	"""
+	Returns the active :class:`~.FileRecorder` objects for the current thread.
+	"""
+
+	if not hasattr(_recorders, "stack"):
+		_recorders.stack = []
+
+	return _recorders.stack
+
+
+@contextmanager
+def record_files() -> Iterator[FileRecorder]:
+	"""
+	Context manager which collects the files read by requirements sources within the ``with`` block.
+
+	Recording is local to the current thread.
+	"""
+
+	recorder = FileRecorder()
+	stack = _active_recorders()
+	stack.append(recorder)
+
+	try:
+		yield recorder
+	finally:
+		stack.remove(recorder)
+
+
+def note_volatile() -> None:
+	"""
+	Record that the requirements obtained by the current source depend on more than the content
+	of the files it read, for example on which files match a wildcard.
+
+	Such requirements are not stored in :data:`~.requirements_index`.
+	"""  # noqa: D400
+
+	for recorder in _active_recorders():
+		recorder.volatile = True
+
+
+def requirements_digest(requirements: List[str]) -> str:
+	"""
+	Returns the SHA-256 hex digest of a list of requirements.
+
+	:param requirements:
+	"""
+
+	return hashlib.sha256('\n'.join(requirements).encode("UTF-8")).hexdigest()
+
+
+def record_requirements(
+		env: Optional[BuildEnvironment],
+		option_name: str,
+		value: Hashable,
+		extra: Optional[str],
+		requirements: List[str],
+		docname: Optional[str] = None,
+		files: Iterable[str] = (),
+		package: Optional[str] = None,
+		) -> None:
+	"""
+	Record the requirements obtained from a source for the document currently being read.
+
+	:param env: The Sphinx build environment.
+	:param option_name: The name of the directive option for the source.
+	:param value: The value of the option.
+	:param extra: The name of the "extra", or :py:obj:`None` to record the names of the extras provided by the source.
+	:param requirements: The validated requirements, or the names of the extras.
+	:param docname: The name of the document, if the requirements were obtained after it was read.
+	:param files: The files read by the source, if the requirements were obtained after the document was read.
+	:param package: The package in :confval:`package_roots` the requirements were obtained for.
+	"""
+
+	if docname is None:
+		docname = _current_docname(env)
+
+	if docname is None:
+		return
+
+	record = get_dependencies(env).setdefault(docname, DocumentDependencies())  # type: ignore[arg-type]
+	record.digests[option_name, value, extra, package] = requirements_digest(requirements)
+
+	for filename in files:
+		env.dependencies[docname].add(filename)  # type: ignore[union-attr]
+		record.files.add(filename)
+
+
+def record_package_name(env: Optional[BuildEnvironment], package: str, name: str) -> None:
+	"""
+	Record the distribution name shown for a package in :confval:`package_roots`
+	by the document currently being read.
+
+	.. versionadded:: 0.6.0
+
+	:param env: The Sphinx build environment.
+	:param package: The key of the package in :confval:`package_roots`.
+	:param name: The name of the distribution.
+	"""  # noqa: D400
+
+	docname = _current_docname(env)
+
+	if docname is not None:
+		record = get_dependencies(env).setdefault(docname, DocumentDependencies())  # type: ignore[arg-type]
+		record.package_names[package] = name
+
+
+def purge_dependencies(app: Sphinx, env: BuildEnvironment, docname: str) -> None:
+	"""
+	Remove the dependencies recorded for ``docname``.
+
+	This is connected to the :event:`env-purge-doc` event.
+
+	:param app: The Sphinx application.
+	:param env: The Sphinx build environment.
+	:param docname: The name of the document being purged.
+	"""
+
+	get_dependencies(env).pop(docname, None)
+
+
+def merge_dependencies(app: Sphinx, env: BuildEnvironment, docnames: Set[str], other: BuildEnvironment) -> None:
+	"""
+	Merge the dependencies recorded for ``docnames`` from a build environment used to read documents in parallel.
+
+	This is connected to the :event:`env-merge-info` event.
+
+	:param app: The Sphinx application.
+	:param env: The Sphinx build environment.
+	:param docnames: The names of the documents read by the other environment.
+	:param other: The build environment from the subprocess.
+	"""
+
+	dependencies = get_dependencies(env)
+	other_dependencies = get_dependencies(other)
+
+	for docname in docnames:
+		if docname in other_dependencies:
+			dependencies[docname] = other_dependencies[docname]
+
+
+def _only_sources_changed(env: BuildEnvironment, docname: str, files: Set[str]) -> bool:
+	"""
+	Returns whether the only reason for ``docname`` being outdated is that files read by
+	the requirements sources have been modified.
+
+	This mirrors the checks in :meth:`sphinx.environment.BuildEnvironment.get_outdated_files`.
+
+	:param env: The Sphinx build environment.
+	:param docname:
+	:param files: The files read by the requirements sources for the document.
+	"""  # noqa: D400
+
+	if docname not in env.all_docs or docname in env.reread_always:
+		return False
+
+	if not os.path.isfile(os.path.join(env.doctreedir, docname + ".doctree")):
+		return False
+
+	mtime = env.all_docs[docname]
+
+	if _last_modified_time(env.doc2path(docname)) > mtime:
+		return False
+
+	for dependency in env.dependencies.get(docname, ()):
+		if dependency in files:
+			continue
+
+		dependency_path = os.path.join(env.srcdir, dependency)
+		if not os.path.isfile(dependency_path) or _last_modified_time(dependency_path) > mtime:
+			return False
+
+	return True
+
+
+def _requirements_unchanged(env: BuildEnvironment, record: DocumentDependencies) -> bool:
+	"""
+	Returns whether the requirements obtained from each source match the recorded digests,
+	and the distribution name of each package is unchanged.
+
+	:param env: The Sphinx build environment.
+	:param record:
+	"""  # noqa: D400
+
+	# this package
+	from sphinxcontrib.extras_require.directive import get_requirements, list_extras
+	from sphinxcontrib.extras_require.sources import package_index
+
+	for (option_name, value, extra, package), digest in record.digests.items():
+		options = {option_name: value}
+		if package is not None:
+			options["package"] = package
+
+		try:
+			if extra is None:
+				requirements = list_extras(env, option_name, options)
+			else:
+				requirements = get_requirements(env, extra, options, [])
+		except Exception:  # pylint: disable=broad-except
+			# The error is reported when the document is read again.
+			return False
+
+		if requirements_digest(requirements) != digest:
+			return False
+
+	for package, name in record.package_names.items():
+		try:
+			if package_index.get(env, package) != name:
+				return False
+		except ValueError:
+			return False
+
+	return True
+
+
+def check_outdated(
+		app: Sphinx,
+		env: BuildEnvironment,
+		added: Set[str],
+		changed: Set[str],
+		removed: Set[str],
+		) -> List[str]:
+	"""
+	Keep documents from being read again when the files read by their requirements sources
+	were modified, but the requirements for the extras they show are unchanged.
+
+	This is connected to the :event:`env-get-outdated` event.
+	Documents returned by the handlers of that event are only ever added to the documents to read,
+	so unaffected documents are removed from ``changed`` instead. ``Builder.read()`` passes the handlers
+	the same set it then reads ``added | changed`` from, as it has in every version since Sphinx 3.4.
+
+	:param app: The Sphinx application.
+	:param env: The Sphinx build environment.
+	:param added: The names of the documents which have been added.
+	:param changed: The names of the outdated documents. Unaffected documents are removed from this set.
+	:param removed: The names of the documents which have been removed.
+	"""  # noqa: D400
+
+	dependencies = get_dependencies(env)
+
+	for docname in sorted(changed):
+		record = dependencies.get(docname)
+
+		if record is None or not (record.digests or record.package_names):
+			continue
+
+		if _only_sources_changed(env, docname, record.files) and _requirements_unchanged(env, record):
+			logger.debug("[extras_require] requirements for %r are unchanged", docname)
+			changed.discard(docname)
+
+	return []
@@ -30,25 +30,44 @@ The :rst:dir:`extras-require` directive.
 #
 
 # stdlib
-from typing import Any, Dict, Iterable, List, Union
+from typing import Any, Callable, ClassVar, Dict, Iterable, List, Optional, Tuple, Union
 
 # 3rd party
 import docutils
 from docutils import nodes
+from docutils.parsers.rst import directives
+from docutils.statemachine import StringList as DocutilsStringList
 from docutils.statemachine import ViewList
 from domdf_python_tools.paths import PathPlus
 from domdf_python_tools.stringlist import StringList
 from domdf_python_tools.words import Plural
-from packaging.requirements import InvalidRequirement
-from shippinglabel.requirements import ComparableRequirement
 from sphinx.environment import BuildEnvironment
 from sphinx.util.docutils import SphinxDirective
 
 # this package
+from sphinxcontrib.extras_require.cache import requirement_cache, requirements_index
+from sphinxcontrib.extras_require.dependencies import (
+		note_dependency,
+		record_files,
+		record_package_name,
+		record_requirements
+		)
+from sphinxcontrib.extras_require.notice import extras_require, pending_extras_require
 from sphinxcontrib.extras_require.purger import extras_require_purger
-from sphinxcontrib.extras_require.sources import sources
-
-__all__ = ["ExtrasRequireDirective", "validate_requirements", "make_node_content", "get_requirements"]
+from sphinxcontrib.extras_require.sources import get_project_root, package_index, sources
+
+__all__ = [
+		"ExtrasRequireDirective",
+		"validate_requirements",
+		"make_node_content",
+		"get_requirements",
+		"select_source",
+		"resolve_requirements",
+		"list_extras",
+		"add_source_options",
+		"get_package_root",
+		"get_package_name",
+		]
 
 _requirement = Plural("requirement", "requirements")
 
@@ -58,13 +77,14 @@ class ExtrasRequireDirective(SphinxDirective):
 	Directive to show a notice to users that a module, class or function has additional requirements.
 	"""
 
-	has_content: bool = True
+	has_content: ClassVar[bool] = True
 
 	#: One argument is required, the name of the extra (e.g. "testing", "docs")
-	required_arguments: int = 1
+	required_arguments: ClassVar[int] = 1
 
-	option_spec = {source[0]: source[2] for source in sources}
+	option_spec: ClassVar[Dict[str, Callable[[str], Any]]] = {source[0]: source[2] for source in sources}
 	option_spec["scope"] = str
+	option_spec["package"] = directives.unchanged_required
 
 	def _problematic(self, message: str) -> List[docutils.nodes.Node]:  # docutils.nodes.Node
 		"""
@@ -87,6 +107,15 @@ class ExtrasRequireDirective(SphinxDirective):
 		targetid = f'extras_require-{self.env.new_serialno("extras_require"):d}'
 		targetnode = nodes.target('', '', ids=[targetid])
 
+		if self.env.config.extras_require_deferred:
+			source = select_source(extra, self.options, self.content)
+
+			if source is not None:
+				pending_node = self.make_pending_notice(source[0], self.options[source[0]], extra)
+				pending_node["target"] = targetid
+				extras_require_purger.add_node(self.env, pending_node, targetnode, self.lineno)
+				return [targetnode, pending_node]
+
 		valid_requirements = get_requirements(
 				env=self.env,
 				extra=extra,
@@ -99,40 +128,165 @@ class ExtrasRequireDirective(SphinxDirective):
 
 		scope = self.options.get("scope", "module")
 
-		pypi_name = self.env.config.pypi_name or self.env.config.project
-		content = make_node_content(valid_requirements, pypi_name, extra, scope=scope)
-		view = ViewList(content.split('\n'))
-
-		extras_require_node = nodes.attention(rawsource=content)
-		self.state.nested_parse(view, self.content_offset, extras_require_node)  # type: ignore[arg-type]
+		pypi_name = get_package_name(self.env, self.options)
+		extras_require_node = self.make_notice(valid_requirements, pypi_name, extra, scope=scope)
 
 		extras_require_purger.add_node(self.env, extras_require_node, targetnode, self.lineno)
 
 		return [targetnode, extras_require_node]
 
+	def make_notice(
+			self,
+			requirements: List[str],
+			package_name: str,
+			extra: str,
+			scope: str = "module",
+			) -> extras_require:
+		"""
+		Create the extras_require node.
+
+		The node only stores the information needed to render the notice.
+		It is expanded into the full notice by :func:`~.expand_notice` when the output is written.
+
+		.. versionadded:: 0.6.0
+
+		:param requirements: List of additional :pep:`508` requirements.
+		:param package_name: The name of the module/package on PyPI.
+		:param extra: The name of the "extra".
+		:param scope: The scope of the additional requirements, e.g. ``"module"``, ``"package"``.
+		"""
+
+		node = extras_require(
+				requirements=list(requirements),
+				package_name=package_name,
+				extra=extra,
+				scope=scope,
+				**self._get_prompt(f"python -m pip install {package_name}[{extra}]"),
+				)
+		self.set_source_info(node)
+
+		return node
+
+	def make_pending_notice(self, option_name: str, value: Any, extra: str) -> pending_extras_require:
+		"""
+		Create a node for a notice whose requirements are obtained after all documents have been read.
+
+		.. versionadded:: 0.6.0
+
+		:param option_name: The name of the directive option for the source.
+		:param value: The value of the option.
+		:param extra: The name of the "extra".
+		"""
+
+		get_package_root(self.env, self.options)
+		package_name = get_package_name(self.env, self.options)
+
+		node = pending_extras_require(
+				source=option_name,
+				value=value,
+				package=self.options.get("package"),
+				package_name=package_name,
+				extra=extra,
+				scope=self.options.get("scope", "module"),
+				block_text=self.block_text,
+				**self._get_prompt(f"python -m pip install {package_name}[{extra}]"),
+				)
+		self.set_source_info(node)
+
+		return node
+
+	def _get_prompt(self, install_command: str) -> Dict[str, str]:
+		"""
+		Returns the output of the ``prompt`` directive for the install command.
+
+		The directive is run for every notice, as sphinx-prompt only emits the CSS for the prompt
+		the first time it is used in each document.
+
+		:param install_command:
+
+		:return: The ``prompt_html`` and ``prompt_latex`` attributes for the node.
+		"""
+
+		html, latex = '', ''
+
+		for raw in self._run_directive("prompt", ["bash"], [install_command]):
+			if isinstance(raw, nodes.raw) and raw.get("format") == "html":
+				html = raw.astext()
+			elif isinstance(raw, nodes.raw) and raw.get("format") == "latex":
+				latex = raw.astext()
+
+		return {"prompt_html": html, "prompt_latex": latex}
+
+	def _run_directive(self, name: str, arguments: List[str], content: List[str]) -> List[nodes.Node]:
+		"""
+		Run the directive registered as ``name`` with the given arguments and content.
+
+		:param name:
+		:param arguments:
+		:param content:
+		"""
+
+		directive_class, messages = directives.directive(name, self.state.memo.language, self.state.document)
+
+		if directive_class is None:
+			raise ValueError(f"Unknown directive {name!r}")
+
+		directive = directive_class(
+				name,
+				arguments,
+				{},
+				DocutilsStringList(content, source=self.get_source_info()[0]),
+				self.lineno,
+				self.content_offset,
+				self.block_text,
+				self.state,
+				self.state_machine,
+				)
+
+		return list(directive.run())
+
 
 def validate_requirements(requirements_list: List[str]) -> List[str]:
 	"""
 	Validate a list of :pep:`508` requirements and format them consistently.
 
+	.. versionchanged:: 0.6.0
+
+		Results are cached for the duration of the build,
+		and each distinct requirement is only parsed once.
+
 	:param requirements_list: List of :pep:`508` requirements.
 
 	:return: List of :pep:`508` requirements with consistent formatting.
 	"""
 
+	requirements = tuple(requirements_list)
+	return list(requirement_cache.get(requirements, lambda: _validate_requirements(requirements)))
+
+
+def _validate_requirements(requirements_list: Iterable[str]) -> Tuple[str, ...]:
+	"""
+	Validate a list of :pep:`508` requirements and format them consistently, without caching the result.
+
+	:param requirements_list: List of :pep:`508` requirements.
+	"""
+
+	# 3rd party
+	from packaging.requirements import InvalidRequirement
+
 	valid_requirements = []
 
 	for req in requirements_list:
 		if req:
 			try:
-				valid_requirements.append(ComparableRequirement(req))
+				valid_requirements.append(requirement_cache.parse(req))
 			except (InvalidRequirement, DeprecationWarning) as e:
 				# Deprecation warning due to LegacyVersion or LegacySpecifier
 				raise ValueError(f"Invalid requirement '{req}': {str(e)}") from None
 
 	valid_requirements.sort()
 
-	return [str(x) for x in valid_requirements]
+	return tuple(str(x) for x in valid_requirements)
 
 
 def make_node_content(
@@ -186,6 +340,47 @@ def make_node_content(
 	return str(content)
 
 
+def select_source(
+		extra: str,
+		options: Dict[str, Any],
+		content: Union[Iterable, ViewList],
+		) -> Optional[Tuple[str, Callable, Callable]]:
+	"""
+	Returns the source selected by the directive's options,
+	or :py:obj:`None` if the requirements are given in the content of the directive.
+
+	.. versionadded:: 0.6.0
+
+	:param extra:
+	:param options:
+	:param content:
+
+	:raises: :exc:`ValueError` if no source, or more than one source, is given.
+	"""  # noqa: D400
+
+	selected_sources = []
+
+	for option_name, value in options.items():
+		source = sources.get(option_name)
+		if source is not None and value:
+			selected_sources.append(source)
+
+	n_sources = len(selected_sources)
+
+	if list(content):
+		n_sources += 1
+
+	if n_sources > 1:
+		raise ValueError("Please specify only one source for the extra requirements")
+	elif n_sources == 0:
+		raise ValueError(f"Please specify a source for the extra requirements {extra}")
+
+	if selected_sources:
+		return selected_sources[0]
+	else:
+		return None
+
+
 def get_requirements(
 		env: BuildEnvironment,
 		extra: str,
@@ -195,41 +390,193 @@ def get_requirements(
 	"""
 	Get the requirements for the extras_require node.
 
+	.. versionchanged:: 0.6.0
+
+		Requirements are obtained from a source using :func:`~.resolve_requirements`.
+		They are stored in :data:`~.requirements_index`,
+		and reused in later builds while the files read by the source are unchanged.
+
 	:param env:
 	:param extra:
 	:param options:
 	:param content:
 	"""
 
-	n_sources = 0
+	source = select_source(extra, options, content)
+	get_package_root(env, options)
+
+	if source is None:
+		return validate_requirements(list(content))
+
+	option_name = source[0]
+	valid_requirements = resolve_requirements(env, option_name, options, [extra])[extra]
+
+	record_requirements(
+			env,
+			option_name,
+			options[option_name],
+			extra,
+			valid_requirements,
+			package=options.get("package"),
+			)
+
+	return valid_requirements
+
+
+def resolve_requirements(
+		env: BuildEnvironment,
+		option_name: str,
+		options: Dict[str, Any],
+		extras: Iterable[str],
+		) -> Dict[str, List[str]]:
+	"""
+	Obtain and validate the requirements for several extras from the same source and option value.
+
+	Requirements found in :data:`~.requirements_index` are reused.
+	For the remaining extras, getters registered with :meth:`Sources.register_batch() <.Sources.register_batch>`
+	are called once with all of them, and other getters are called once for each extra.
+
+	.. versionadded:: 0.6.0
+
+	:param env: The Sphinx build environment.
+	:param option_name: The name of the directive option for the source.
+	:param options: The directive's options.
+	:param extras: The names of the extras.
+
+	:return: A mapping of the names of the extras to their validated requirements.
+
+	:raises: :exc:`ValueError` if the source does not provide one of the extras.
+	"""
+
+	package_root = get_package_root(env, options)
+	source = sources.get(option_name)
+
+	if source is None:
+		raise ValueError(f"Unknown requirements source {option_name!r}")
+
+	getter_function = source[1]
+	value = options[option_name]
+	resolved: Dict[str, List[str]] = {}
+	missing: List[str] = []
+
+	for extra in dict.fromkeys(extras):
+		indexed = requirements_index.get(package_root, option_name, value, extra)
+
+		if indexed is None:
+			missing.append(extra)
+		else:
+			files, resolved[extra] = indexed
+			for filename in files:
+				note_dependency(env, filename)
+
+	if not missing:
+		return resolved
+
+	batch_function = getattr(getter_function, "batch", None)
+
+	if batch_function is None:
+		batches = [[extra] for extra in missing]
+	else:
+		batches = [missing]
+
+	for batch in batches:
+		with record_files() as recorder:
+			if batch_function is None:
+				requirements = {batch[0]: getter_function(package_root, options, env, batch[0])}
+			else:
+				requirements = batch_function(package_root, options, env, batch)
+
+		for extra in batch:
+			if extra not in requirements:
+				raise ValueError(f"'{extra}' not found by the {option_name!r} source")
+
+			resolved[extra] = validate_requirements(list(requirements[extra]))
+
+			if not recorder.volatile:
+				requirements_index.set(package_root, option_name, value, extra, recorder.files, resolved[extra])
+
+	return resolved
 
-	if list(content):
-		n_sources += 1
+
+def list_extras(env: BuildEnvironment, option_name: str, options: Dict[str, Any]) -> List[str]:
+	"""
+	Returns the names of the extras provided by a source, in the order they are defined by the source.
+
+	.. versionadded:: 0.6.0
+
+	:param env: The Sphinx build environment.
+	:param option_name: The name of the directive option for the source.
+	:param options: The directive's options.
+
+	:raises: :exc:`ValueError` if the source cannot list its extras.
+	"""
+
+	package_root = get_package_root(env, options)
+	lister = sources.get_extras(option_name)
+
+	if lister is None:
+		raise ValueError(f"The {option_name!r} source cannot list its extras")
+
+	return list(lister(package_root, options, env))
+
+
+def add_source_options(option_spec: Dict[str, Callable[[str], Any]]) -> None:
+	"""
+	Add the options for sources registered after a directive was defined,
+	such as those provided by entry points, to the directive's option spec.
+
+	.. versionadded:: 0.6.0
+
+	:param option_spec: The option spec, which is updated in place.
+	"""
 
 	for source in sources:
-		if (source[0] in options) and options[source[0]]:
-			n_sources += 1
+		option_spec.setdefault(source[0], source[2])
 
-	if n_sources > 1:
-		raise ValueError("Please specify only one source for the extra requirements")
-	elif n_sources == 0:
-		raise ValueError(f"Please specify a source for the extra requirements {extra}")
+
+def get_package_root(env: BuildEnvironment, options: Dict[str, Any]) -> PathPlus:
+	"""
+	Returns the package root for a directive.
+
+	This is the directory given for the ``:package:`` option in :confval:`package_roots`, if that option is given,
+	and otherwise the directory given by :confval:`package_root`.
+
+	.. versionadded:: 0.6.0
+
+	:param env: The Sphinx build environment.
+	:param options: The directive's options.
+
+	:raises: :exc:`ValueError` if neither is configured.
+	"""
+
+	if options.get("package"):
+		return get_project_root(env, options)
 
 	if env.config.package_root is None:
 		raise ValueError("Please provide a value for 'package_root' in conf.py")
 
-	src_dir = PathPlus(env.srcdir)
-	package_root = src_dir.parent / env.config.package_root
+	return PathPlus(env.srcdir).parent / env.config.package_root
 
-	requirements: List[str]
 
-	for option_name, getter_function, validator_function in sources:
-		if option_name in options:
-			requirements = getter_function(package_root, options, env, extra)
-			break
-	else:
-		requirements = list(content)
+def get_package_name(env: BuildEnvironment, options: Dict[str, Any]) -> str:
+	"""
+	Returns the name of the distribution to show in the install command for a directive.
 
-	valid_requirements = validate_requirements(requirements)
+	This is read from the metadata of the package given by the ``:package:`` option, if that option is given,
+	and otherwise is :confval:`pypi_name`, or the project name if that is not set.
 
-	return valid_requirements
+	.. versionadded:: 0.6.0
+
+	:param env: The Sphinx build environment.
+	:param options: The directive's options.
+	"""
+
+	package = options.get("package")
+
+	if not package:
+		return env.config.pypi_name or env.config.project
+
+	name = package_index.get(env, package)
+	record_package_name(env, package, name)
+
+	return name
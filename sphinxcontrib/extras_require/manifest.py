@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+#
+#  manifest.py
+"""
+Build the extras manifest read by the :rst:dir:`extras-require:manifest` source.
+
+The manifest is a JSON file containing the validated requirements for every extra
+provided by a project's ``pyproject.toml``, ``setup.cfg`` and ``__pkginfo__.py``,
+and optionally by requirements files, along with the SHA-256 digests of those files.
+Documentation builds can then read the manifest without importing :mod:`setuptools` or executing ``__pkginfo__.py``.
+
+.. versionadded:: 0.6.0
+"""
+#
+#  Copyright © 2020-2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Redistribution and use in source and binary forms, with or without modification,
+#  are permitted provided that the following conditions are met:
+#
+#      * Redistributions of source code must retain the above copyright notice,
+#        this list of conditions and the following disclaimer.
+#      * Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+#  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+#  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+#  A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER
+#  OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+
+# stdlib
+import json
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.typing import PathLike
+
+# this package
+from sphinxcontrib.extras_require.cache import file_digest
+from sphinxcontrib.extras_require.directive import validate_requirements
+from sphinxcontrib.extras_require.sources import (
+		MANIFEST_VERSION,
+		_load_pkginfo_extras,
+		_parse_pyproject_extras,
+		_parse_requirements_file,
+		_parse_setup_cfg_extras
+		)
+
+__all__ = ["build_manifest", "write_manifest"]
+
+
+def _pyproject_sources(pyproject_file: PathPlus) -> Iterable[Tuple[str, Dict[str, List[str]]]]:
+	parsed_extras = _parse_pyproject_extras(pyproject_file)
+	yield "pyproject", parsed_extras["pep621"]
+	yield "flit", parsed_extras["flit"]
+
+
+def _setup_cfg_sources(setup_cfg_file: PathPlus) -> Iterable[Tuple[str, Dict[str, List[str]]]]:
+	extras_require = _parse_setup_cfg_extras(setup_cfg_file)[0]
+
+	if extras_require is not None:
+		yield "setup.cfg", extras_require
+
+
+def _pkginfo_sources(pkginfo_file: PathPlus) -> Iterable[Tuple[str, Dict[str, List[str]]]]:
+	yield "__pkginfo__", _load_pkginfo_extras(pkginfo_file)[0]
+
+
+#: The files read by :func:`~.build_manifest`, and functions returning the sources they provide.
+_metadata_files: Dict[str, Callable[[PathPlus], Iterable[Tuple[str, Dict[str, List[str]]]]]] = {
+		"pyproject.toml": _pyproject_sources,
+		"setup.cfg": _setup_cfg_sources,
+		"__pkginfo__.py": _pkginfo_sources,
+		}
+
+
+def build_manifest(project_root: PathLike, requirements_files: Iterable[str] = ()) -> Dict[str, Any]:
+	"""
+	Resolve every extra provided by the project in ``project_root`` into an extras manifest.
+
+	Sources whose files are not present, or which provide no extras, are omitted.
+
+	:param project_root: The directory containing the project's metadata files.
+	:param requirements_files: The paths of requirements files to include, relative to ``project_root``.
+		Each is added to the manifest as a source named by its path.
+
+	:raises: :exc:`ValueError` if any of the requirements are invalid.
+	"""
+
+	project_root = PathPlus(project_root)
+	manifest_sources: Dict[str, Dict[str, Any]] = {}
+
+	for filename, get_sources in _metadata_files.items():
+		metadata_file = project_root / filename
+
+		if not metadata_file.is_file():
+			continue
+
+		files = {filename: file_digest(metadata_file)}
+
+		for source_name, extras_require in get_sources(metadata_file):
+			if extras_require:
+				extras = {extra: validate_requirements(list(reqs)) for extra, reqs in extras_require.items()}
+				manifest_sources[source_name] = {"files": files, "extras": extras}
+
+	for filename in requirements_files:
+		filename = PathPlus(filename).as_posix()
+		requirements_file = project_root / filename
+
+		if not requirements_file.is_file():
+			raise FileNotFoundError(f"Cannot find requirements file '{requirements_file}'")
+
+		manifest_sources[filename] = {
+				"files": {filename: file_digest(requirements_file)},
+				"requirements": validate_requirements(_parse_requirements_file(requirements_file)),
+				}
+
+	return {"version": MANIFEST_VERSION, "sources": manifest_sources}
+
+
+def write_manifest(manifest: Dict[str, Any], filename: PathLike) -> None:
+	"""
+	Write an extras manifest to ``filename`` as compact JSON.
+
+	:param manifest: The manifest, as returned by :func:`~.build_manifest`.
+	:param filename:
+	"""
+
+	filename = PathPlus(filename)
+	filename.parent.maybe_make(parents=True)
+	filename.write_clean(json.dumps(manifest, sort_keys=True, separators=(',', ':')))
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+#
+#  notice.py
+"""
+The compact node used to store notices in the doctree, and its expansion at write time.
+
+.. versionadded:: 0.6.0
+"""
+#
+#  Copyright © 2020-2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Redistribution and use in source and binary forms, with or without modification,
+#  are permitted provided that the following conditions are met:
+#
+#      * Redistributions of source code must retain the above copyright notice,
+#        this list of conditions and the following disclaimer.
+#      * Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+#  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+#  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+#  A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER
+#  OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+
+# stdlib
+from typing import Any, Callable, Iterable, List, Optional, Type, TypeVar, cast, overload
+
+# 3rd party
+from docutils import nodes
+from domdf_python_tools.words import Plural
+from sphinx.application import Sphinx
+from sphinx.transforms.post_transforms import SphinxPostTransform
+from sphinx.util.docutils import SphinxTranslator
+
+# this package
+from sphinxcontrib.extras_require.cache import notice_cache
+
+__all__ = [
+		"ExpandNoticesTransform",
+		"expand_notice",
+		"extras_require",
+		"findall",
+		"pending_extras_require",
+		"reset_prompt_cache",
+		"visit_extras_require",
+		]
+
+_requirement = Plural("requirement", "requirements")
+_N = TypeVar("_N", bound=nodes.Node)
+
+
+class extras_require(nodes.General, nodes.Element):
+	"""
+	Compact node representing a notice.
+
+	Only the information needed to render the notice is stored in the doctree:
+
+	* ``requirements`` -- the list of validated :pep:`508` requirements.
+	* ``package_name`` -- the name of the package on PyPI.
+	* ``extra`` -- the name of the extra.
+	* ``scope`` -- the scope of the requirements, e.g. ``'module'``.
+	* ``prompt_html`` and ``prompt_latex`` -- the output of the ``prompt`` directive from sphinx-prompt
+	  for the install command.
+	"""
+
+
+class pending_extras_require(extras_require):
+	"""
+	Node representing a notice whose requirements have not yet been obtained.
+
+	Used when :confval:`extras_require_deferred` is :py:obj:`True`.
+	Instead of ``requirements`` the node has ``source`` and ``value`` attributes,
+	giving the directive option used to specify the requirements source and its value,
+	a ``package`` attribute giving the value of the ``:package:`` option, if any,
+	a ``target`` attribute giving the ID of the target node before it,
+	and a ``block_text`` attribute giving the text of the directive, which is shown if there are no requirements.
+
+	The node is replaced with an :class:`~.extras_require` node by :class:`~.ResolvePendingNoticesTransform`.
+	"""
+
+	def resolve(self, requirements: Iterable[str]) -> extras_require:
+		"""
+		Returns an :class:`~.extras_require` node with the given requirements.
+
+		:param requirements:
+		"""
+
+		attributes = {
+				key: value
+				for key, value in self.attributes.items()
+				if key not in {"source", "value", "package", "target", "block_text"}
+				}
+		node = extras_require(requirements=list(requirements), **attributes)
+		node.source, node.line = self.source, self.line
+
+		return node
+
+
+@overload
+def findall(node: nodes.Node, condition: Type[_N]) -> Iterable[_N]: ...
+
+
+@overload
+def findall(node: nodes.Node, condition: Optional[Callable[[nodes.Node], bool]] = None) -> Iterable[nodes.Node]: ...
+
+
+def findall(node: nodes.Node, condition: Optional[Any] = None) -> Iterable[nodes.Node]:
+	"""
+	Iterate over ``node`` and its descendants, optionally filtered by ``condition``.
+
+	Uses :meth:`docutils.nodes.Node.findall` where available (docutils 0.18.1 and above).
+
+	:param node:
+	:param condition: A node class, or a function taking a node and returning a boolean.
+		If a class is given only instances of that class are returned.
+	"""
+
+	if hasattr(node, "findall"):
+		return node.findall(condition)
+	else:  # pragma: no cover (docutils>=0.18.1)
+		return node.traverse(condition)
+
+
+def reset_prompt_cache(app: Sphinx, docname: str, source: List[str]) -> None:
+	"""
+	Reset sphinx-prompt's record of the prompts used in the document, before the document is read.
+
+	sphinx-prompt resets it on the :event:`env-purge-doc` event, but when reading in parallel
+	all documents are purged before any are read, so only the first document read by
+	each process would contain the CSS for the prompt.
+
+	This is connected to the :event:`source-read` event.
+
+	:param app: The Sphinx application.
+	:param docname: The name of the document being read.
+	:param source: The content of the document.
+	"""
+
+	# 3rd party
+	import sphinx_prompt
+
+	prompt_cache = getattr(sphinx_prompt, "_cache", None)
+
+	if prompt_cache is not None:
+		prompt_cache.clear()
+
+
+def _build_notice(
+		requirements: List[str],
+		package_name: str,
+		extra: str,
+		scope: str,
+		prompt: List[nodes.raw],
+		) -> nodes.attention:
+	"""
+	Build the node tree for a notice.
+
+	:param requirements: List of additional :pep:`508` requirements.
+	:param package_name: The name of the module/package on PyPI.
+	:param extra: The name of the "extra".
+	:param scope: The scope of the additional requirements, e.g. ``"module"``, ``"package"``.
+	:param prompt: The nodes for the install command.
+	"""
+
+	notice = nodes.attention()
+
+	intro = f"This {scope} has the following additional {_requirement(len(requirements))}:"
+	notice += nodes.paragraph(intro, intro)
+
+	code = '\n'.join(requirements)
+	literal = nodes.literal_block(code, code, language="text", force=False, highlight_args={}, linenos=False)
+	notice += nodes.block_quote('', literal)
+
+	if len(requirements) > 1:
+		outro = "These can be installed as follows:"
+	else:
+		outro = "This can be installed as follows:"
+
+	notice += nodes.paragraph(outro, outro)
+	notice += nodes.block_quote('', *prompt)
+
+	return notice
+
+
+def expand_notice(node: extras_require) -> nodes.attention:
+	"""
+	Expand an :class:`~.extras_require` node into the full node tree for the notice.
+
+	The trees are cached in :data:`~.notice_cache`.
+
+	:param node:
+	"""
+
+	requirements = list(node["requirements"])
+	package_name = node["package_name"]
+	extra = node["extra"]
+	scope = node["scope"]
+	prompt_html = node.get("prompt_html", '')
+	prompt_latex = node.get("prompt_latex", '')
+
+	def factory() -> nodes.attention:
+		command = f"python -m pip install {package_name}[{extra}]"
+		prompt = [nodes.raw(command, prompt_html, format="html"), nodes.raw(command, prompt_latex, format="latex")]
+		return _build_notice(requirements, package_name, extra, scope, prompt)
+
+	key = (tuple(requirements), package_name, extra, scope, prompt_html, prompt_latex)
+	notice = cast(nodes.attention, notice_cache.get(key, factory))
+
+	notice["ids"] = list(node["ids"])
+	notice["classes"] = list(node["classes"])
+
+	for child in findall(notice):
+		if isinstance(child, nodes.Element):
+			child.source, child.line = node.source, node.line
+
+	return notice
+
+
+def visit_extras_require(translator: SphinxTranslator, node: extras_require) -> None:
+	"""
+	Visit an :class:`~.extras_require` node, by expanding it and visiting the resulting nodes.
+
+	This is registered for the ``html``, ``latex``, ``text`` and ``man`` formats.
+
+	:param translator:
+	:param node:
+	"""
+
+	notice = expand_notice(node)
+	notice.parent = node.parent
+	if node.document is not None:
+		notice.document = node.document
+	notice.walkabout(translator)
+
+	raise nodes.SkipNode
+
+
+class ExpandNoticesTransform(SphinxPostTransform):
+	"""
+	Replaces :class:`~.extras_require` nodes with the full node tree for builders without a visitor.
+
+	The nodes are also replaced for builders which produce a search index, such as the HTML builder,
+	as the index is built from the doctree rather than from the output of the visitor.
+	"""
+
+	default_priority = 200
+
+	def run(self, **kwargs: Any) -> None:  # noqa: D102
+		builder = self.app.builder
+		handlers = self.app.registry.translation_handlers.get(builder.name)
+
+		if handlers is None:
+			handlers = self.app.registry.translation_handlers.get(builder.format, {})
+
+		if extras_require.__name__ in handlers and getattr(builder, "indexer", None) is None:
+			return
+
+		for node in list(findall(self.document, extras_require)):
+			node.replace_self(expand_notice(node))
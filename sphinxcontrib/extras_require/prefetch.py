@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+#
+#  prefetch.py
+"""
+Resolution of the requirements for all documents before they are read.
+
+.. versionadded:: 0.6.0
+"""
+#
+#  Copyright © 2020-2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Redistribution and use in source and binary forms, with or without modification,
+#  are permitted provided that the following conditions are met:
+#
+#      * Redistributions of source code must retain the above copyright notice,
+#        this list of conditions and the following disclaimer.
+#      * Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+#  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+#  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+#  A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER
+#  OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+
+# stdlib
+import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+# 3rd party
+from sphinx.application import Sphinx
+from sphinx.environment import BuildEnvironment
+from sphinx.util import logging
+
+# this package
+from sphinxcontrib.extras_require.sources import sources
+
+__all__ = ["ScannedDirective", "extract_directives", "prefetch_requirements", "scan_directives"]
+
+logger = logging.getLogger(__name__)
+
+_directive_re = re.compile(r"^(?P<indent>[ \t]*)\.\.[ \t]+extras-require::[ \t]*(?P<extra>\S+)[ \t]*$")
+_option_re = re.compile(r"^(?P<indent>[ \t]+):(?P<name>[^:\s]+):(?:[ \t]+(?P<value>.*?))?[ \t]*$")
+
+
+class ScannedDirective(NamedTuple):
+	"""
+	An ``extras-require`` directive found by :func:`~.extract_directives`.
+
+	.. versionadded:: 0.6.0
+	"""
+
+	#: The line number of the directive, starting from 1.
+	lineno: int
+
+	#: The name of the extra.
+	extra: str
+
+	#: Mapping of option names to their unvalidated values, or :py:obj:`None` for options without a value.
+	options: Dict[str, Optional[str]]
+
+	#: The non-blank lines of the content of the directive, with leading and trailing whitespace removed.
+	content: List[str]
+
+
+def extract_directives(lines: Iterable[str]) -> Iterator[ScannedDirective]:
+	"""
+	Find the ``extras-require`` directives in reStructuredText source, without parsing it.
+
+	The lines are read one at a time, and each directive is returned as soon as it ends.
+
+	.. versionadded:: 0.6.0
+
+	:param lines: The lines of the document.
+	"""
+
+	current: Optional[ScannedDirective] = None
+	indent = 0
+	in_options = False
+
+	for lineno, line in enumerate(lines, start=1):
+		line = line.rstrip("\r\n")
+
+		if current is not None:
+			line_indent = len(line.expandtabs()) - len(line.expandtabs().lstrip())
+
+			if in_options:
+				match = _option_re.match(line)
+
+				if match and len(match.group("indent").expandtabs()) > indent:
+					current.options[match.group("name")] = match.group("value")
+					continue
+
+				in_options = False
+
+			if not line.strip():
+				continue
+			elif line_indent > indent and not _directive_re.match(line):
+				current.content.append(line.strip())
+				continue
+
+			yield current
+			current = None
+
+		match = _directive_re.match(line)
+
+		if match:
+			current = ScannedDirective(lineno, match.group("extra"), {}, [])
+			indent = len(match.group("indent").expandtabs())
+			in_options = True
+
+	if current is not None:
+		yield current
+
+
+def scan_directives(lines: Iterable[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+	"""
+	Find the ``extras-require`` directives in reStructuredText source which take their requirements from a source.
+
+	Options which are not valid for the source are ignored.
+
+	:param lines: The lines of the document.
+
+	:return: An iterator of the name of the extra and the source's option, as passed to the directive.
+		The ``:package:`` option is included if it is given.
+	"""
+
+	for directive in extract_directives(lines):
+		package = directive.options.get("package")
+
+		for name, raw_value in directive.options.items():
+			source = sources.get(name)
+
+			if source is None:
+				continue
+
+			try:
+				value = source[2](raw_value)
+			except (ValueError, TypeError):
+				continue
+
+			if value:
+				options = {source[0]: value}
+				if package:
+					options["package"] = package
+
+				yield directive.extra, options
+
+
+def _resolve(env: BuildEnvironment, options: Dict[str, Any], extras: List[str]) -> int:
+	"""
+	Obtain the requirements for several extras from a source, returning the number which were found.
+
+	:param env: The Sphinx build environment.
+	:param options: The source's option, and the ``:package:`` option if it was given.
+	:param extras: The names of the extras.
+	"""
+
+	# this package
+	from sphinxcontrib.extras_require.directive import resolve_requirements
+
+	option_name = next(iter(options))
+
+	try:
+		return len(resolve_requirements(env, option_name, options, extras))
+	except Exception:  # pylint: disable=broad-except
+		if len(extras) == 1:
+			# The error is reported when the document is read.
+			return 0
+
+	# Obtain the requirements for the other extras.
+	return sum(_resolve(env, options, [extra]) for extra in extras)
+
+
+def prefetch_requirements(app: Sphinx, env: BuildEnvironment, docnames: List[str]) -> None:
+	"""
+	Scan the documents which are about to be read for ``extras-require`` directives,
+	and obtain their requirements using a pool of threads.
+
+	The extras using the same source and option value are resolved together
+	with :func:`~.resolve_requirements`, and the sources are read concurrently.
+	The results are stored in the caches used by the directive. When reading in parallel this happens in the main process,
+	so each subprocess starts with the caches populated.
+
+	This is connected to the :event:`env-before-read-docs` event
+	if :confval:`extras_require_prefetch` is :py:obj:`True`.
+
+	:param app: The Sphinx application.
+	:param env: The Sphinx build environment.
+	:param docnames: The names of the documents which will be read.
+	"""  # noqa: D400
+
+	if not app.config.extras_require_prefetch:
+		return
+	elif app.config.package_root is None and not app.config.package_roots:
+		return
+
+	found: Dict[Tuple[Tuple[str, Any], ...], Set[str]] = defaultdict(set)
+
+	for docname in docnames:
+		try:
+			with open(env.doc2path(docname), encoding=app.config.source_encoding) as fp:
+				for extra, options in scan_directives(fp):
+					found[tuple(options.items())].add(extra)
+		except (OSError, UnicodeDecodeError):
+			continue
+
+	if not found:
+		return
+
+	with ThreadPoolExecutor(thread_name_prefix="extras_require") as executor:
+		resolved = list(
+				executor.map(
+						lambda item: _resolve(env, dict(item[0]), sorted(item[1])),
+						sorted(found.items(), key=repr),
+						)
+				)
+
+	n_extras = sum(len(extras) for extras in found.values())
+	logger.verbose(f"[extras_require] prefetched the requirements for {sum(resolved)} of {n_extras} extras")
@@ -29,7 +29,206 @@ Purger for docutils nodes.
 #  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 #
 
+# stdlib
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
 # 3rd party
-from sphinx_toolbox.utils import Purger
+from docutils import nodes
+from sphinx.application import Sphinx
+from sphinx.environment import BuildEnvironment
+
+# this package
+from sphinxcontrib.extras_require.notice import extras_require, findall, pending_extras_require
+
+__all__ = ["ExtrasRequirePurger", "NoticeRecord", "extras_require_purger"]
+
+_install_command_re = re.compile(r"\[([^\]]+)\]\s*$")
+
+
+class NoticeRecord(NamedTuple):
+	"""
+	Compact record of a notice in a document.
+
+	.. versionadded:: 0.6.0
+	"""
+
+	#: The line number of the directive.
+	lineno: int
+
+	#: The ID of the target node before the notice.
+	target: str
+
+	#: The name of the extra.
+	extra: str
+
+	#: The validated requirements.
+	#: :py:obj:`None` if the requirements of a :class:`~.pending_extras_require` node have not yet been obtained.
+	requirements: Optional[Tuple[str, ...]]
+
+	#: The directive option used to specify the source of the requirements, its value,
+	#: and the value of the ``:package:`` option, for :class:`~.pending_extras_require` nodes.
+	source: Optional[Tuple[str, Any, Optional[str]]] = None
+
+
+class ExtrasRequirePurger:
+	"""
+	Keeps track of the notices in each document, and removes them when the document is purged.
+
+	The records are stored in a dictionary on the build environment, keyed by document name,
+	so purging a document does not require the records for every other document to be checked.
+
+	Environments pickled by earlier versions stored a flat list of nodes
+	in the ``legacy_attr_name`` attribute. That list is converted the first time it is used.
+
+	.. versionadded:: 0.6.0
+
+	:param attr_name: The name of the build environment's attribute that stores the records.
+	:param legacy_attr_name: The name of the attribute used by :class:`sphinx_toolbox.utils.Purger`.
+	"""
+
+	def __init__(self, attr_name: str, legacy_attr_name: Optional[str] = None):
+		self.attr_name = str(attr_name)
+		self.legacy_attr_name = legacy_attr_name
+
+	def __repr__(self) -> str:
+		return f"{self.__class__.__name__}({self.attr_name!r})"
+
+	def get_records(self, env: BuildEnvironment) -> Dict[str, List[NoticeRecord]]:
+		"""
+		Returns the mapping of document names to the records of the notices in them.
+
+		:param env: The Sphinx build environment.
+		"""
+
+		if not hasattr(env, self.attr_name):
+			setattr(env, self.attr_name, {})
+
+		if self.legacy_attr_name is not None and hasattr(env, self.legacy_attr_name):
+			self.migrate(env)
+
+		return getattr(env, self.attr_name)
+
+	def migrate(self, env: BuildEnvironment) -> None:
+		"""
+		Convert the flat list of nodes stored by earlier versions into records.
+
+		:param env: The Sphinx build environment.
+		"""
+
+		legacy_entries = getattr(env, self.legacy_attr_name) or []  # type: ignore[arg-type]
+		delattr(env, self.legacy_attr_name)  # type: ignore[arg-type]
+
+		records = self.get_records(env)
+
+		for entry in legacy_entries:
+			records.setdefault(entry["docname"], []).append(_record_from_legacy(entry))
+
+	def purge_nodes(self, app: Sphinx, env: BuildEnvironment, docname: str) -> None:
+		"""
+		Remove the records for the given document.
+
+		This function can be configured for the :event:`env-purge-doc` event.
+
+		:param app: The Sphinx application.
+		:param env: The Sphinx build environment.
+		:param docname: The name of the document to remove nodes for.
+		"""
+
+		self.get_records(env).pop(docname, None)
+
+	def merge_info(self, app: Sphinx, env: BuildEnvironment, docnames: Set[str], other: BuildEnvironment) -> None:
+		"""
+		Merge the records for ``docnames`` from a build environment used to read documents in parallel.
+
+		This function can be configured for the :event:`env-merge-info` event.
+
+		:param app: The Sphinx application.
+		:param env: The Sphinx build environment.
+		:param docnames: The names of the documents read by the other environment.
+		:param other: The build environment from the subprocess.
+		"""
+
+		records = self.get_records(env)
+		other_records = self.get_records(other)
+
+		for docname in docnames:
+			if docname in other_records:
+				records[docname] = other_records[docname]
+
+	def get_outdated_docnames(
+			self,
+			app: Sphinx,
+			env: BuildEnvironment,
+			added: Set[str],
+			changed: Set[str],
+			removed: Set[str],
+			) -> List[str]:
+		"""
+		Returns a list of all docnames containing one or more notices.
+
+		This function can be configured for the :event:`env-get-outdated` event.
+
+		:param app: The Sphinx application.
+		:param env: The Sphinx build environment.
+		:param added: A set of newly added documents.
+		:param changed: A set of document names whose content has changed.
+		:param removed: A set of document names which have been removed.
+		"""
+
+		return list(self.get_records(env))
+
+	def add_node(self, env: BuildEnvironment, node: extras_require, targetnode: nodes.target, lineno: int) -> None:
+		"""
+		Add a record for a notice in the document currently being read.
+
+		:param env: The Sphinx build environment.
+		:param node:
+		:param targetnode:
+		:param lineno:
+		"""
+
+		target = targetnode["ids"][0] if targetnode["ids"] else ''
+
+		if isinstance(node, pending_extras_require):
+			record = NoticeRecord(lineno, target, node["extra"], None, (node["source"], node["value"], node.get("package")))
+		else:
+			record = NoticeRecord(lineno, target, node["extra"], tuple(node["requirements"]))
+
+		self.get_records(env).setdefault(env.docname, []).append(record)
+
+
+def _record_from_legacy(entry: Dict[str, Any]) -> NoticeRecord:
+	"""
+	Create a record from an entry stored by :class:`sphinx_toolbox.utils.Purger`.
+
+	:param entry:
+	"""
+
+	node = entry["installation_node"]
+	target = entry.get("target")
+	target_id = target["ids"][0] if target is not None and target["ids"] else ''
+
+	if isinstance(node, extras_require):
+		return NoticeRecord(entry["lineno"], target_id, node["extra"], tuple(node["requirements"]))
+
+	# Notices created by earlier versions contain the requirements in a literal block,
+	# and the name of the extra at the end of the install command.
+	requirements: Tuple[str, ...] = ()
+	extra = ''
+
+	for literal in findall(node, nodes.literal_block):
+		requirements = tuple(literal.astext().splitlines())
+		break
+
+	for raw in findall(node, nodes.raw):
+		match = _install_command_re.search(raw.rawsource)
+		if match:
+			extra = match.group(1)
+			break
+
+	return NoticeRecord(entry["lineno"], target_id, extra, requirements)
+
 
-extras_require_purger = Purger("all_extras_requires")
+#: Instance of :class:`~.ExtrasRequirePurger` used by :class:`~.ExtrasRequireDirective`.
+extras_require_purger = ExtrasRequirePurger("extras_require_records", legacy_attr_name="all_extras_requires")
@@ -4,8 +4,6 @@
 """
 Supported sources for the requirements are implemented here.
 
-.. TODO:: From .dist-info
-
 **Data:**
 
 .. autosummary::
@@ -39,21 +37,38 @@ Supported sources for the requirements are implemented here.
 #
 
 # stdlib
+import ast
+import codecs
+import configparser
+import email.parser
+import importlib.metadata
 import importlib.util
 import inspect
-import mimetypes
+import json
+import os
 import pathlib
-from typing import Callable, Dict, List, Tuple
+import re
+import sys
+import zipfile
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 # 3rd party
 import sphinx.environment
 from docutils.parsers.rst import directives
 from domdf_python_tools.paths import PathPlus
-from setuptools.config import read_configuration  # type: ignore[import-untyped]
-from shippinglabel import normalize_keep_dot
-from shippinglabel.requirements import combine_requirements, parse_pyproject_extras, read_requirements
 from sphinx_toolbox.utils import flag
 
+# this package
+from sphinxcontrib.extras_require.cache import BaseCache, DigestCache, MetadataCache
+from sphinxcontrib.extras_require.dependencies import note_dependency, note_volatile
+
+if TYPE_CHECKING:
+	# 3rd party
+	from shippinglabel.requirements import ComparableRequirement
+
+# The parsers used by the sources (setuptools, dom_toml, shippinglabel, packaging, tarfile)
+# are imported the first time they are needed, so they don't slow down the start of every build.
+
 __all__ = [
 		"requirements_from_file",
 		"requirements_from_pkginfo",
@@ -62,9 +77,251 @@ __all__ = [
 		"requirements_from_pyproject",
 		"sources",
 		"Sources",
+		"pyproject_cache",
+		"setup_cfg_cache",
+		"pkginfo_cache",
+		"requirements_file_cache",
+		"requirements_from_dist_info",
+		"DistributionIndex",
+		"distribution_index",
+		"requirements_from_wheel",
+		"wheel_cache",
+		"requirements_from_sdist",
+		"sdist_cache",
+		"get_project_root",
+		"PackageIndex",
+		"package_index",
+		"requirements_from_manifest",
+		"manifest_cache",
+		"manifest_digest_cache",
+		"MANIFEST_VERSION",
 		]
 
 
+_normalize_pattern = re.compile(r"[-_.]+")
+
+
+def _normalize(name: str) -> str:
+	"""
+	Normalize the name of a distribution or extra, as per :pep:`503`.
+
+	This is equivalent to :func:`shippinglabel.normalize`, without the cost of importing it.
+
+	:param name:
+	"""
+
+	return _normalize_pattern.sub('-', name).lower()
+
+
+def _optional_argument(argument: Optional[str]) -> Union[str, bool]:
+	"""
+	Validator for options which take an optional string argument.
+
+	:param argument:
+
+	:return: The argument, or :py:obj:`True` if no argument was given.
+	"""
+
+	return directives.unchanged(argument).strip() or True
+
+
+def get_project_root(env: sphinx.environment.BuildEnvironment, options: Dict) -> PathPlus:
+	"""
+	Returns the directory containing the project's metadata files, such as ``pyproject.toml``.
+
+	This is the directory given for the ``:package:`` option in :confval:`package_roots`, if that option is given,
+	and otherwise the parent of the documentation source directory.
+
+	.. versionadded:: 0.6.0
+
+	:param env:
+	:param options: The directive's options.
+
+	:raises: :exc:`ValueError` if the package is not in :confval:`package_roots`.
+	"""
+
+	root = PathPlus(env.srcdir).parent
+	package = options.get("package")
+
+	if package:
+		package_roots = getattr(env.config, "package_roots", None) or {}
+
+		if package not in package_roots:
+			raise ValueError(f"Unknown package {package!r}. Please add it to 'package_roots' in conf.py")
+
+		root = root / package_roots[package]
+
+	return root
+
+
+def _read_package_name(root: PathPlus) -> Optional[Tuple[str, PathPlus]]:
+	"""
+	Read the name of the distribution in ``root`` from ``pyproject.toml`` or ``setup.cfg``.
+
+	:param root:
+
+	:return: The name and the file it was read from, or :py:obj:`None` if neither file gives a name.
+	"""
+
+	pyproject_file = root / "pyproject.toml"
+
+	if pyproject_file.is_file():
+		# 3rd party
+		import dom_toml
+
+		config = dom_toml.load(pyproject_file)
+		flit_metadata = config.get("tool", {}).get("flit", {}).get("metadata", {})
+		name = config.get("project", {}).get("name") or flit_metadata.get("dist-name") or flit_metadata.get("module")
+
+		if name:
+			return name, pyproject_file
+
+	setup_cfg_file = root / "setup.cfg"
+
+	if setup_cfg_file.is_file():
+		parser = configparser.ConfigParser(interpolation=None)
+		parser.read_string(setup_cfg_file.read_text(), source=str(setup_cfg_file))
+		name = parser.get("metadata", "name", fallback=None)
+
+		if name:
+			return name, setup_cfg_file
+
+	return None
+
+
+class PackageIndex(BaseCache):
+	"""
+	Index of the distribution names of the packages in :confval:`package_roots`.
+
+	The metadata of each root is read once per build, the first time a directive uses it.
+
+	.. versionadded:: 0.6.0
+	"""
+
+	def __init__(self):
+		super().__init__("package roots")
+
+	def get(self, env: sphinx.environment.BuildEnvironment, package: str) -> str:
+		"""
+		Returns the name of the distribution for ``package``.
+
+		The name is read from the ``[project]`` table of ``pyproject.toml``, the flit metadata,
+		or the ``[metadata]`` section of ``setup.cfg``, in that order.
+		If none of those give a name the key in :confval:`package_roots` is used.
+
+		:param env:
+		:param package: The key of the package in :confval:`package_roots`.
+		"""
+
+		key = os.fspath(get_project_root(env, {"package": package}).resolve())
+
+		if key in self._entries:
+			self.hits += 1
+			entry = self._entries[key]
+		else:
+			self.misses += 1
+			entry = self._entries[key] = _read_package_name(PathPlus(key))
+
+		if entry is None:
+			return package
+
+		name, metadata_file = entry
+		note_dependency(env, metadata_file)
+
+		return name
+
+
+#: Index of the distribution names of the packages in :confval:`package_roots`.
+#:
+#: .. versionadded:: 0.6.0
+package_index = PackageIndex()
+
+
+class _EntryPointGetter:
+	"""
+	Getter function for a source provided by an entry point, which is loaded the first time it is called.
+
+	:param entry_point:
+	:param args: The arguments the function must take.
+	"""
+
+	def __init__(self, entry_point: importlib.metadata.EntryPoint, args: List[str]):
+		self.entry_point = entry_point
+		self._args = args
+		self._function: Optional[Callable] = None
+
+	def load(self) -> Callable:
+		"""
+		Load the entry point and check the signature of the function.
+		"""
+
+		if self._function is None:
+			function = self.entry_point.load()
+
+			arguments = list(inspect.signature(function).parameters.keys())
+
+			if arguments == Sources._batch_args:
+				function = _BatchGetter(function)
+			elif arguments != self._args:
+				raise SyntaxError(
+						f"The function for the {self.entry_point.name!r} source must take only the following arguments: "
+						"'package_root', 'options', 'env', and 'extra'",
+						)
+
+			self._function = function
+
+		return self._function
+
+	@property
+	def batch(self) -> Optional[Callable]:
+		"""
+		The batch getter function, if the entry point refers to one.
+		"""
+
+		return getattr(self.load(), "batch", None)
+
+	def __call__(
+			self,
+			package_root: pathlib.Path,
+			options: Dict,
+			env: sphinx.environment.BuildEnvironment,
+			extra: str,
+			) -> List[str]:
+		return self.load()(package_root, options, env, extra)
+
+	def __repr__(self) -> str:
+		return f"<{type(self).__name__}({self.entry_point.value!r})>"
+
+
+class _BatchGetter:
+	"""
+	Getter function for a source registered with :meth:`Sources.register_batch`,
+	which obtains the requirements for a single extra.
+
+	:param batch: The batch getter function.
+	"""  # noqa: D400
+
+	def __init__(self, batch: Callable):
+		self.batch = batch
+
+	def __call__(
+			self,
+			package_root: pathlib.Path,
+			options: Dict,
+			env: sphinx.environment.BuildEnvironment,
+			extra: str,
+			) -> List[str]:
+		requirements = self.batch(package_root, options, env, [extra])
+
+		if extra not in requirements:
+			raise ValueError(f"'{extra}' not found")
+
+		return list(requirements[extra])
+
+	def __repr__(self) -> str:
+		return f"<{type(self).__name__}({self.batch!r})>"
+
+
 class Sources(List[Tuple[str, Callable, Callable]]):
 	"""
 	Class to store functions that provide requirements sources.
@@ -77,12 +334,61 @@ class Sources(List[Tuple[str, Callable, Callable]]):
 	* the function that returns the list of additional requirements,
 	* a function to validate the option value provided by the user.
 
+	Entries are looked up by option name with :meth:`~.Sources.get`.
+	If several entries have the same option name the first takes precedence.
+
+	Getter functions registered with :meth:`~.Sources.register_batch` are stored
+	as a function taking a single extra, with the batch function as its ``batch`` attribute.
+
+	.. versionchanged:: 0.6.0
+
+		Added :meth:`~.Sources.get`, :meth:`~.Sources.load_entry_points`, :meth:`~.Sources.register_batch`,
+		:meth:`~.Sources.register_extras` and :meth:`~.Sources.get_extras`.
+
 	.. latex:clearpage::
 	"""
 
 	_args = ["package_root", "options", "env", "extra"]
+	_batch_args = ["package_root", "options", "env", "extras"]
+	_extras_args = ["package_root", "options", "env"]
 	_directive_name = "extras_require"
 
+	#: The entry point group searched by :meth:`~.Sources.load_entry_points`.
+	entry_point_group: str = "sphinxcontrib.extras_require.sources"
+
+	def __init__(self, *args: Any):
+		super().__init__(*args)
+		self._extras: Dict[str, Callable] = dict(getattr(args[0], "_extras", {})) if args else {}
+		self._entry_points_loaded = False
+
+	def get(self, option_name: str) -> Optional[Tuple[str, Callable, Callable]]:
+		"""
+		Returns the source with the given option name, or :py:obj:`None` if there is no such source.
+
+		.. versionadded:: 0.6.0
+
+		:param option_name:
+		"""
+
+		# There are few enough sources that a side index isn't worth keeping in step with the list.
+		for source in self:
+			if source[0] == option_name:
+				return source
+
+		return None
+
+	def get_extras(self, option_name: str) -> Optional[Callable]:
+		"""
+		Returns the function which lists the extras provided by the source with the given option name,
+		or :py:obj:`None` if the source cannot list its extras.
+
+		.. versionadded:: 0.6.0
+
+		:param option_name:
+		"""
+
+		return self._extras.get(option_name)
+
 	def register(
 			self,
 			option_name: str,
@@ -102,6 +408,9 @@ class Sources(List[Tuple[str, Callable, Callable]]):
 				extra: str,
 				) -> List[str]: ...
 
+		The function should call :func:`~.note_dependency` with each file it reads,
+		so documents are read again when those files change.
+
 		:param option_name: A string to use in the directive to specify the source to use.
 		:param validator: A function to validate the option value provided by the user.
 
@@ -127,36 +436,184 @@ class Sources(List[Tuple[str, Callable, Callable]]):
 
 		return _decorator
 
+	def register_batch(
+			self,
+			option_name: str,
+			validator: Callable = directives.unchanged,
+			) -> Callable:
+		"""
+		Decorator to register a function which obtains the requirements for several extras at once.
+
+		The function must have the following signature:
+
+		.. code-block:: python
+
+			def function(
+				package_root: pathlib.Path,
+				options: Dict,
+				env: sphinx.environment.BuildEnvironment,
+				extras: List[str],
+				) -> Dict[str, List[str]]: ...
+
+		It is called with the names of all the extras requested with the same option value,
+		and returns a mapping of the names of those extras to their requirements.
+		Extras which the source does not provide should be omitted from the mapping.
+
+		.. versionadded:: 0.6.0
+
+		:param option_name: A string to use in the directive to specify the source to use.
+		:param validator: A function to validate the option value provided by the user.
+
+		:return: The registered function.
+
+		:raises: :exc:`SyntaxError` if the decorated function does not take the correct arguments.
+		"""
+
+		def _decorator(function: Callable) -> Callable:
+			signature = inspect.signature(function)
+
+			if list(signature.parameters.keys()) != self._batch_args:
+				raise SyntaxError(
+						"The decorated function must take only the following arguments: "
+						"'package_root', 'options', 'env', and 'extras'",
+						)
+
+			self.append((option_name, _BatchGetter(function), validator))
+
+			setattr(function, f"_{self._directive_name}_registered", True)
+
+			return function
+
+		return _decorator
+
+	def register_extras(self, option_name: str) -> Callable:
+		"""
+		Decorator to register a function which lists the extras provided by a source.
+
+		The function must have the following signature:
+
+		.. code-block:: python
+
+			def function(
+				package_root: pathlib.Path,
+				options: Dict,
+				env: sphinx.environment.BuildEnvironment,
+				) -> Iterable[str]: ...
+
+		It returns the names of the extras, in the order they are defined by the source.
+		Like the getter function, it should call :func:`~.note_dependency` with each file it reads.
+
+		.. versionadded:: 0.6.0
+
+		:param option_name: The option name of the source.
+
+		:return: The registered function.
+
+		:raises: :exc:`SyntaxError` if the decorated function does not take the correct arguments.
+		"""
+
+		def _decorator(function: Callable) -> Callable:
+			signature = inspect.signature(function)
+
+			if list(signature.parameters.keys()) != self._extras_args:
+				raise SyntaxError(
+						"The decorated function must take only the following arguments: "
+						"'package_root', 'options', and 'env'",
+						)
+
+			self._extras.setdefault(option_name, function)
+
+			return function
+
+		return _decorator
+
+	def load_entry_points(self, path: Optional[List[str]] = None) -> None:
+		"""
+		Register the sources provided by other distributions through entry points.
+
+		The name of each entry point in the :attr:`~.Sources.entry_point_group` group is the option name,
+		and the object it refers to is the getter function.
+		Only the name is read here; the function is imported the first time the option is used.
+		The function may take either a single extra, as with :meth:`~.Sources.register`,
+		or a list of extras, as with :meth:`~.Sources.register_batch`.
+		Options provided by entry points take an optional string argument.
+		Sources which have already been registered take precedence.
+
+		.. code-block:: ini
+
+			[sphinxcontrib.extras_require.sources]
+			lockfile = my_package.sources:requirements_from_lockfile
+
+		.. versionadded:: 0.6.0
+
+		:param path: The directories to search for distributions. Defaults to :py:obj:`sys.path`,
+			which is only searched the first time.
+		"""
+
+		if path is None:
+			if self._entry_points_loaded:
+				return
+
+			self._entry_points_loaded = True
+
+		registered = {source[0] for source in self}
+
+		for distribution in importlib.metadata.distributions(path=sys.path if path is None else path):
+			for entry_point in distribution.entry_points:
+				if entry_point.group != self.entry_point_group or entry_point.name in registered:
+					continue
+
+				self.append((entry_point.name, _EntryPointGetter(entry_point, self._args), _optional_argument))
+				registered.add(entry_point.name)
+
 
 #: Instance of :class:`~.Sources`.
 sources = Sources()
 
 
-@sources.register("file", directives.unchanged)
-def requirements_from_file(
-		package_root: pathlib.Path,
-		options: Dict,
-		env: sphinx.environment.BuildEnvironment,
-		extra: str,
-		) -> List[str]:
+#: Cache of the requirements parsed from requirements files.
+#:
+#: .. versionadded:: 0.6.0
+requirements_file_cache = MetadataCache("requirements file")
+
+
+def _is_text_file(filename: PathPlus, blocksize: int = 8192) -> bool:
 	"""
-	Load requirements from the specified file.
+	Returns whether the file appears to be a UTF-8 encoded text file.
 
-	:param package_root: The path to the package root
-	:param options:
-	:param env:
-	:param extra: The name of the "extra" that the requirements are for
+	Only the first ``blocksize`` bytes are checked, for NUL bytes and invalid UTF-8.
 
-	:return: List of requirements
+	:param filename:
+	:param blocksize:
 	"""
 
-	requirements_file = package_root / options["file"]
+	with filename.open("rb") as fp:
+		block = fp.read(blocksize)
 
-	if not requirements_file.is_file():
-		raise FileNotFoundError(f"Cannot find requirements file '{requirements_file}'")
+	if b"\0" in block:
+		return False
 
-	mime_type = mimetypes.guess_type(str(requirements_file))[0]
-	if not mime_type or not mime_type.startswith("text/"):
+	try:
+		# Incremental so a multibyte character split at the end of the block isn't an error.
+		codecs.getincrementaldecoder("UTF-8")().decode(block, final=False)
+	except UnicodeDecodeError:
+		return False
+
+	return True
+
+
+def _parse_requirements_file(requirements_file: PathPlus) -> List[str]:
+	"""
+	Parse the requirements from a requirements file, combining and sorting them.
+
+	:param requirements_file:
+	"""
+
+	# 3rd party
+	from shippinglabel import normalize_keep_dot
+	from shippinglabel.requirements import combine_requirements, read_requirements
+
+	if not _is_text_file(requirements_file):
 		raise ValueError(f"'{requirements_file}' is not a text file.")
 
 	requirements, comments = read_requirements(
@@ -167,15 +624,15 @@ def requirements_from_file(
 	return list(map(str, sorted(combine_requirements(requirements))))
 
 
-@sources.register("__pkginfo__", flag)
-def requirements_from_pkginfo(
+@sources.register("file", directives.unchanged)
+def requirements_from_file(
 		package_root: pathlib.Path,
 		options: Dict,
 		env: sphinx.environment.BuildEnvironment,
 		extra: str,
 		) -> List[str]:
 	"""
-	Load requirements from a ``__pkginfo__.py`` file in the root of the repository.
+	Load requirements from the specified file.
 
 	:param package_root: The path to the package root
 	:param options:
@@ -185,37 +642,249 @@ def requirements_from_pkginfo(
 	:return: List of requirements
 	"""
 
-	__pkginfo___file = PathPlus(env.srcdir).parent / "__pkginfo__.py"
+	requirements_file = package_root / options["file"]
 
-	if not __pkginfo___file.is_file():
-		raise FileNotFoundError(f"Cannot find __pkginfo__.py in '{__pkginfo___file.parent}'")
+	if not requirements_file.is_file():
+		raise FileNotFoundError(f"Cannot find requirements file '{requirements_file}'")
 
-	try:
-		spec = importlib.util.spec_from_file_location("__pkginfo__", str(__pkginfo___file))
+	note_dependency(env, requirements_file)
+	return list(requirements_file_cache.get(requirements_file, _parse_requirements_file))
 
-		if spec is not None:
-			__pkginfo__ = importlib.util.module_from_spec(spec)
 
-			if spec.loader:
-				spec.loader.exec_module(__pkginfo__)
-				requirements = __pkginfo__.extras_require[extra]
-				return requirements
-				# TODO: handle extra not found
+#: Cache of the ``extras_require`` dictionaries loaded from ``__pkginfo__.py`` files.
+#:
+#: .. versionadded:: 0.6.0
+pkginfo_cache = MetadataCache("__pkginfo__.py")
 
-	except ValueError:
-		pass
-	except SyntaxError as e:
-		if e.msg != "source code string cannot contain null bytes":
-			raise e
 
-	raise ImportError("Could not import __pkginfo__.py")
+def _literal_extras_require(module: ast.Module) -> Optional[Dict[str, List[str]]]:
+	"""
+	Returns the value of ``extras_require`` if it is assigned a literal exactly once,
+	and is not referenced anywhere else in the module.
 
+	:param module:
+	"""  # noqa: D400
 
-requirements_from___pkginfo__ = requirements_from_pkginfo
+	value = None
+	n_references = 0
 
+	for node in ast.walk(module):
+		if isinstance(node, ast.Name) and node.id == "extras_require":
+			n_references += 1
 
-@sources.register("setup.cfg", flag)
-def requirements_from_setup_cfg(
+	if n_references != 1:
+		return None
+
+	for statement in module.body:
+		if isinstance(statement, ast.Assign):
+			targets = statement.targets
+		elif isinstance(statement, ast.AnnAssign) and statement.value is not None:
+			targets = [statement.target]
+		else:
+			continue
+
+		if any(isinstance(target, ast.Name) and target.id == "extras_require" for target in targets):
+			value = statement.value
+			break
+	else:
+		return None
+
+	if value is None:
+		return None
+
+	try:
+		extras_require = ast.literal_eval(value)
+	except ValueError:
+		return None
+
+	if not isinstance(extras_require, dict):
+		return None
+
+	return extras_require
+
+
+def _load_pkginfo_extras(pkginfo_file: PathPlus) -> Tuple[Dict[str, Any], bool]:
+	"""
+	Returns the ``extras_require`` dictionary from ``__pkginfo__.py``.
+
+	If ``extras_require`` is a literal it is evaluated statically without executing the file.
+	Otherwise the module is executed.
+
+	:param pkginfo_file:
+
+	:return: The ``extras_require`` dictionary, and whether the module was executed.
+	"""
+
+	module = ast.parse(pkginfo_file.read_bytes(), filename=str(pkginfo_file))
+	extras_require = _literal_extras_require(module)
+
+	if extras_require is not None:
+		return extras_require, False
+
+	spec = importlib.util.spec_from_file_location("__pkginfo__", str(pkginfo_file))
+
+	if spec is None or not spec.loader:
+		raise ImportError("Could not import __pkginfo__.py")
+
+	__pkginfo__ = importlib.util.module_from_spec(spec)
+	spec.loader.exec_module(__pkginfo__)
+
+	return __pkginfo__.extras_require, True
+
+
+@sources.register_extras("__pkginfo__")
+def _pkginfo_extras(
+		package_root: pathlib.Path,
+		options: Dict,
+		env: sphinx.environment.BuildEnvironment,
+		) -> Dict[str, List[str]]:
+	"""
+	Returns the extras from the ``__pkginfo__.py`` file in the root of the repository.
+
+	:param package_root: The path to the package root.
+	:param options:
+	:param env:
+	"""
+
+	__pkginfo___file = get_project_root(env, options) / "__pkginfo__.py"
+
+	if not __pkginfo___file.is_file():
+		raise FileNotFoundError(f"Cannot find __pkginfo__.py in '{__pkginfo___file.parent}'")
+
+	note_dependency(env, __pkginfo___file)
+
+	try:
+		extras_require, executed = pkginfo_cache.get(__pkginfo___file, _load_pkginfo_extras)
+	except ValueError:
+		pass
+	except SyntaxError as e:
+		if e.msg != "source code string cannot contain null bytes":
+			raise e
+	else:
+		if executed:
+			# The module may import other files, which are not recorded.
+			note_volatile()
+
+		return extras_require
+
+	raise ImportError("Could not import __pkginfo__.py")
+
+
+@sources.register("__pkginfo__", flag)
+def requirements_from_pkginfo(
+		package_root: pathlib.Path,
+		options: Dict,
+		env: sphinx.environment.BuildEnvironment,
+		extra: str,
+		) -> List[str]:
+	"""
+	Load requirements from a ``__pkginfo__.py`` file in the root of the repository.
+
+	:param package_root: The path to the package root
+	:param options:
+	:param env:
+	:param extra: The name of the "extra" that the requirements are for
+
+	:return: List of requirements
+	"""
+
+	extras_require = _pkginfo_extras(package_root, options, env)
+
+	if extra not in extras_require:
+		raise ValueError(f"'{extra}' not found in '__pkginfo__.extras_require'")
+
+	return list(extras_require[extra])
+
+
+requirements_from___pkginfo__ = requirements_from_pkginfo
+
+
+#: Cache of the extras parsed from ``setup.cfg`` files.
+#:
+#: .. versionadded:: 0.6.0
+setup_cfg_cache = MetadataCache("setup.cfg")
+
+# Directives which require setuptools to evaluate.
+_setuptools_directives = ("file:", "attr:")
+
+
+def _parse_setup_cfg_extras(setup_cfg_file: PathPlus) -> Tuple[Optional[Dict[str, List[str]]], bool]:
+	"""
+	Parse the ``[options.extras_require]`` section of ``setup.cfg``.
+
+	Only that section is read, using :mod:`configparser`.
+	If any value uses a ``file:`` or ``attr:`` directive the whole file is instead
+	evaluated with :func:`setuptools.config.read_configuration`.
+
+	:param setup_cfg_file:
+
+	:return: A mapping of extras to requirements, or :py:obj:`None` if the section is not present,
+		and whether the file was evaluated by setuptools.
+	"""
+
+	parser = configparser.ConfigParser(interpolation=None)
+	parser.optionxform = str  # type: ignore[assignment,method-assign]
+	parser.read_string(setup_cfg_file.read_text(), source=str(setup_cfg_file))
+
+	if not parser.has_section("options.extras_require"):
+		return None, False
+
+	section = parser["options.extras_require"]
+
+	if any(value.strip().startswith(_setuptools_directives) for value in section.values()):
+		# 3rd party
+		from setuptools.config import read_configuration  # type: ignore[import-untyped]
+
+		setup_cfg = read_configuration(setup_cfg_file)
+		return setup_cfg.get("options", {}).get("extras_require"), True
+
+	extras_require = {}
+
+	for extra, value in section.items():
+		# The same rules as setuptools: split on newlines if present, otherwise on semicolons.
+		if '\n' in value:
+			chunks = value.splitlines()
+		else:
+			chunks = value.split(';')
+
+		requirements = [chunk.strip() for chunk in chunks]
+		extras_require[extra] = [req for req in requirements if req and not req.startswith('#')]
+
+	return extras_require, False
+
+
+@sources.register_extras("setup.cfg")
+def _setup_cfg_extras(
+		package_root: pathlib.Path,
+		options: Dict,
+		env: sphinx.environment.BuildEnvironment,
+		) -> Dict[str, List[str]]:
+	"""
+	Returns the extras from the ``setup.cfg`` file in the root of the repository.
+
+	:param package_root: The path to the package root.
+	:param options:
+	:param env:
+	"""
+
+	setup_cfg_file = get_project_root(env, options) / "setup.cfg"
+	assert setup_cfg_file.is_file()
+	note_dependency(env, setup_cfg_file)
+
+	extras_require, evaluated = setup_cfg_cache.get(setup_cfg_file, _parse_setup_cfg_extras)
+
+	if evaluated:
+		# ``file:`` and ``attr:`` directives read other files, which are not recorded.
+		note_volatile()
+
+	if extras_require is None:
+		raise ValueError("'options.extras_require' section not found in 'setup.cfg")
+
+	return extras_require
+
+
+@sources.register("setup.cfg", flag)
+def requirements_from_setup_cfg(
 		package_root: pathlib.Path,
 		options: Dict,
 		env: sphinx.environment.BuildEnvironment,
@@ -232,18 +901,107 @@ def requirements_from_setup_cfg(
 	:return: List of requirements.
 	"""
 
-	setup_cfg_file = PathPlus(env.srcdir).parent / "setup.cfg"
-	assert setup_cfg_file.is_file()
+	extras_require = _setup_cfg_extras(package_root, options, env)
 
-	setup_cfg = read_configuration(setup_cfg_file)
-
-	if "options" in setup_cfg and "extras_require" in setup_cfg["options"]:
-		if extra in setup_cfg["options"]["extras_require"]:
-			return setup_cfg["options"]["extras_require"][extra]
-		else:
-			raise ValueError(f"'{extra}' not found in '[options.extras_require]'")
+	if extra in extras_require:
+		return list(extras_require[extra])
 	else:
-		raise ValueError("'options.extras_require' section not found in 'setup.cfg")
+		raise ValueError(f"'{extra}' not found in '[options.extras_require]'")
+
+
+#: Cache of the extras parsed from ``pyproject.toml`` files.
+#:
+#: .. versionadded:: 0.6.0
+pyproject_cache = MetadataCache("pyproject.toml")
+
+
+def _parse_pyproject_extras(pyproject_file: PathPlus) -> Dict[str, Dict[str, List[str]]]:
+	"""
+	Parse the extras from both the flit and :pep:`621` tables of ``pyproject.toml``.
+
+	The TOML is only parsed once, and the requirements for each extra are combined and sorted.
+
+	:param pyproject_file:
+
+	:return: A mapping of flavour (``'flit'`` or ``'pep621'``) to a mapping of extras to requirements.
+	"""
+
+	# 3rd party
+	import dom_toml
+	from shippinglabel import normalize_keep_dot
+	from shippinglabel.requirements import combine_requirements, parse_requirements
+
+	config = dom_toml.load(pyproject_file)
+
+	tables = {
+			"flit": config.get("tool", {}).get("flit", {}).get("metadata", {}).get("requires-extra", {}),
+			"pep621": config.get("project", {}).get("optional-dependencies", {}),
+			}
+
+	parsed_extras: Dict[str, Dict[str, List[str]]] = {}
+
+	for flavour, dependencies in tables.items():
+		parsed_extras[flavour] = {}
+
+		for extra, requirements in dependencies.items():
+			parsed = parse_requirements(requirements, include_invalid=True, normalize_func=normalize_keep_dot)[0]
+			parsed_extras[flavour][extra] = list(map(str, sorted(combine_requirements(parsed))))
+
+	return parsed_extras
+
+
+def _load_pyproject_extras(
+		options: Dict,
+		env: sphinx.environment.BuildEnvironment,
+		) -> Dict[str, Dict[str, List[str]]]:
+	"""
+	Returns the extras from the ``pyproject.toml`` file in the root of the repository.
+
+	:param options:
+	:param env:
+	"""
+
+	pyproject_file = get_project_root(env, options) / "pyproject.toml"
+
+	if not pyproject_file.is_file():
+		raise FileNotFoundError(f"Cannot find pyproject.toml in '{pyproject_file.parent}'")
+
+	note_dependency(env, pyproject_file)
+	return pyproject_cache.get(pyproject_file, _parse_pyproject_extras)
+
+
+@sources.register_extras("flit")
+def _flit_extras(
+		package_root: pathlib.Path,
+		options: Dict,
+		env: sphinx.environment.BuildEnvironment,
+		) -> Dict[str, List[str]]:
+	"""
+	Returns the extras from the ``[tool.flit.metadata.requires-extra]`` section of ``pyproject.toml``.
+
+	:param package_root: The path to the package root.
+	:param options:
+	:param env:
+	"""
+
+	return _load_pyproject_extras(options, env)["flit"]
+
+
+@sources.register_extras("pyproject")
+def _pep621_extras(
+		package_root: pathlib.Path,
+		options: Dict,
+		env: sphinx.environment.BuildEnvironment,
+		) -> Dict[str, List[str]]:
+	"""
+	Returns the extras from the ``[project.optional-dependencies]`` section of ``pyproject.toml``.
+
+	:param package_root: The path to the package root.
+	:param options:
+	:param env:
+	"""
+
+	return _load_pyproject_extras(options, env)["pep621"]
 
 
 @sources.register("flit", flag)
@@ -265,19 +1023,12 @@ def requirements_from_flit(
 	:return: List of requirements.
 	"""  # noqa: D400
 
-	pyproject_file = PathPlus(env.srcdir).parent / "pyproject.toml"
-
-	if not pyproject_file.is_file():
-		raise FileNotFoundError(f"Cannot find pyproject.toml in '{pyproject_file.parent}'")
-
-	flit_extras = parse_pyproject_extras(pyproject_file, flavour="flit", normalize_func=normalize_keep_dot)
+	flit_extras = _flit_extras(package_root, options, env)
 
 	if extra not in flit_extras:
 		raise ValueError(f"'{extra}' not found in '[tool.flit.metadata.requires-extra]'")
 
-	requirements = flit_extras[extra]
-
-	return list(map(str, sorted(combine_requirements(requirements))))
+	return list(flit_extras[extra])
 
 
 @sources.register("pyproject", flag)
@@ -303,16 +1054,632 @@ def requirements_from_pyproject(
 	:return: List of requirements.
 	"""  # noqa: D400
 
-	pyproject_file = PathPlus(env.srcdir).parent / "pyproject.toml"
+	pep621_extras = _pep621_extras(package_root, options, env)
 
-	if not pyproject_file.is_file():
-		raise FileNotFoundError(f"Cannot find pyproject.toml in '{pyproject_file.parent}'")
+	if extra not in pep621_extras:
+		raise ValueError(f"'{extra}' not found in '[project.optional-dependencies]'")
 
-	flit_extras = parse_pyproject_extras(pyproject_file, flavour="pep621", normalize_func=normalize_keep_dot)
+	return list(pep621_extras[extra])
 
-	if extra not in flit_extras:
-		raise ValueError(f"'{extra}' not found in '[project.optional-dependencies]'")
 
-	requirements = flit_extras[extra]
+_extra_marker = r'extra == "(?P<extra>[^"]+)"'
+_extra_marker_patterns = (
+		re.compile(rf"^{_extra_marker}$"),
+		re.compile(rf"^(?P<marker>.+) and {_extra_marker}$"),
+		re.compile(rf"^{_extra_marker} and (?P<marker>.+)$"),
+		)
 
-	return list(map(str, sorted(combine_requirements(requirements))))
+
+def _is_parenthesized(marker: str) -> bool:
+	"""
+	Returns whether the whole of ``marker`` is enclosed in a single pair of parentheses.
+
+	:param marker:
+	"""
+
+	if not (marker.startswith('(') and marker.endswith(')')):
+		return False
+
+	depth = 0
+
+	for idx, char in enumerate(marker):
+		if char == '(':
+			depth += 1
+		elif char == ')':
+			depth -= 1
+			if depth == 0 and idx != len(marker) - 1:
+				return False
+
+	return True
+
+
+def _split_extra_marker(requirement: str) -> Iterable[Tuple[str, str]]:
+	"""
+	Determine which extra(s) a ``Requires-Dist`` entry belongs to.
+
+	Where possible the ``extra == "..."`` clause is removed from the requirement's marker.
+
+	:param requirement:
+
+	:return: An iterable of ``(extra, requirement)`` tuples.
+	"""
+
+	# 3rd party
+	from packaging.markers import Marker
+	from shippinglabel.requirements import ComparableRequirement
+
+	req = ComparableRequirement(requirement)
+
+	if req.marker is None:
+		return
+
+	marker = str(req.marker)
+
+	for pattern in _extra_marker_patterns:
+		match = pattern.match(marker)
+		if match is None:
+			continue
+
+		remaining = match.groupdict().get("marker")
+
+		if remaining is None:
+			req.marker = None
+		elif " or " not in remaining or _is_parenthesized(remaining):
+			req.marker = Marker(remaining)
+		else:
+			break
+
+		yield match.group("extra"), str(req)
+		return
+
+	# Too complex to simplify; show the requirement with its full marker.
+	for extra in re.findall(_extra_marker, marker):
+		yield extra, requirement
+
+
+def _extras_from_metadata(
+		provides_extra: Iterable[str],
+		requires_dist: Iterable[str],
+		) -> Dict[str, List[str]]:
+	"""
+	Construct a mapping of extras to requirements from core metadata.
+
+	:param provides_extra: The values of the ``Provides-Extra`` fields.
+	:param requires_dist: The values of the ``Requires-Dist`` fields.
+
+	:return: A mapping of normalized extra names to sorted lists of requirements.
+	"""
+
+	# 3rd party
+	from shippinglabel.requirements import ComparableRequirement, combine_requirements
+
+	extras: Dict[str, List["ComparableRequirement"]] = {_normalize(extra): [] for extra in provides_extra}
+
+	for requirement in requires_dist:
+		for extra, extra_requirement in _split_extra_marker(requirement):
+			extras.setdefault(_normalize(extra), []).append(ComparableRequirement(extra_requirement))
+
+	return {extra: list(map(str, sorted(combine_requirements(reqs)))) for extra, reqs in extras.items()}
+
+
+class DistributionIndex(BaseCache):
+	"""
+	Index of the distributions installed in a set of directories.
+
+	The directories are scanned once, the first time they are used, and the extras
+	of each distribution are parsed the first time that distribution is looked up.
+
+	.. versionadded:: 0.6.0
+	"""
+
+	def __init__(self):
+		super().__init__("dist-info")
+		self._indexes: Dict[Tuple[str, ...], Dict[str, importlib.metadata.Distribution]] = {}
+
+	def get(self, name: str, path: Optional[List[str]] = None) -> Optional[Dict[str, List[str]]]:
+		"""
+		Returns the extras of the distribution called ``name``.
+
+		:param name: The name of the distribution.
+		:param path: The directories to search for distributions. Defaults to :py:obj:`sys.path`.
+
+		:return: A mapping of normalized extra names to sorted lists of requirements,
+			or :py:obj:`None` if the distribution cannot be found.
+		"""
+
+		key = tuple(sys.path if path is None else path)
+		name = _normalize(name)
+
+		if (key, name) in self._entries:
+			self.hits += 1
+			return self._entries[key, name]
+
+		self.misses += 1
+
+		if key not in self._indexes:
+			index: Dict[str, importlib.metadata.Distribution] = {}
+
+			for dist in importlib.metadata.distributions(path=list(key)):
+				# As with importlib.metadata, the first distribution on the path takes precedence.
+				index.setdefault(_normalize(dist.metadata["Name"] or ''), dist)
+
+			self._indexes[key] = index
+
+		distribution = self._indexes[key].get(name)
+
+		if distribution is None:
+			extras = None
+		else:
+			extras = _extras_from_metadata(
+					distribution.metadata.get_all("Provides-Extra") or (),
+					distribution.requires or (),
+					)
+
+		self._entries[key, name] = extras
+		return extras
+
+	def metadata_file(self, name: str, path: Optional[List[str]] = None) -> Optional[PathPlus]:
+		"""
+		Returns the path to the metadata file of the distribution called ``name``.
+
+		:param name: The name of the distribution.
+		:param path: The directories to search for distributions. Defaults to :py:obj:`sys.path`.
+
+		:return: The path to the ``METADATA`` or ``PKG-INFO`` file, or :py:obj:`None` if the distribution
+			cannot be found or its metadata is not stored in a file.
+		"""
+
+		key = tuple(sys.path if path is None else path)
+		distribution = self._indexes.get(key, {}).get(_normalize(name))
+		directory = getattr(distribution, "_path", None)
+
+		if directory is None:
+			return None
+
+		for filename in ("METADATA", "PKG-INFO"):
+			if (PathPlus(directory) / filename).is_file():
+				return PathPlus(directory) / filename
+
+		return None
+
+	def clear(self) -> None:
+		"""
+		Remove all entries from the cache and reset the statistics.
+		"""
+
+		super().clear()
+		self._indexes.clear()
+
+
+#: Index of installed distributions used by :func:`~.requirements_from_dist_info`.
+#:
+#: .. versionadded:: 0.6.0
+distribution_index = DistributionIndex()
+
+
+def _dist_info_name(options: Dict, env: sphinx.environment.BuildEnvironment) -> str:
+	"""
+	Returns the name of the distribution given by the ``dist-info`` option.
+
+	:param options:
+	:param env:
+	"""
+
+	name = options["dist-info"]
+	if name is True and options.get("package"):
+		name = package_index.get(env, options["package"])
+	elif name is True:
+		name = env.config.pypi_name or env.config.project
+
+	return name
+
+
+@sources.register_extras("dist-info")
+def _dist_info_extras(
+		package_root: pathlib.Path,
+		options: Dict,
+		env: sphinx.environment.BuildEnvironment,
+		) -> Dict[str, List[str]]:
+	"""
+	Returns the extras from the metadata of the installed distribution named by the ``dist-info`` option.
+
+	:param package_root: The path to the package root.
+	:param options:
+	:param env:
+	"""
+
+	name = _dist_info_name(options, env)
+	site_packages = getattr(env.config, "extras_require_site_packages", None)
+
+	if site_packages:
+		path = [os.fspath(PathPlus(env.srcdir).parent / site_packages)]
+	else:
+		path = None
+
+	extras = distribution_index.get(name, path)
+
+	if extras is None:
+		raise FileNotFoundError(f"Cannot find an installed distribution named '{name}'")
+
+	metadata_file = distribution_index.metadata_file(name, path)
+	if metadata_file is not None:
+		note_dependency(env, metadata_file)
+
+	return extras
+
+
+@sources.register("dist-info", _optional_argument)
+def requirements_from_dist_info(
+		package_root: pathlib.Path,
+		options: Dict,
+		env: sphinx.environment.BuildEnvironment,
+		extra: str,
+		) -> List[str]:
+	"""
+	Load requirements from the metadata of an installed distribution.
+
+	The name of the distribution is given as the value of the option, and defaults to :confval:`pypi_name`.
+	Distributions are searched for in :confval:`extras_require_site_packages` if set,
+	otherwise in the directories on :py:obj:`sys.path`.
+
+	.. versionadded:: 0.6.0
+
+	:param package_root: The path to the package root.
+	:param options:
+	:param env:
+	:param extra: The name of the "extra" that the requirements are for.
+
+	:return: List of requirements.
+	"""
+
+	extras = _dist_info_extras(package_root, options, env)
+
+	if _normalize(extra) not in extras:
+		name = _dist_info_name(options, env)
+		raise ValueError(f"'{extra}' not found in the 'Provides-Extra' metadata for '{name}'")
+
+	return list(extras[_normalize(extra)])
+
+
+def _find_archive(root: PathPlus, pattern: str) -> PathPlus:
+	"""
+	Returns the file matching ``pattern``, relative to ``root``.
+
+	If the pattern matches several files the most recently modified one is used.
+
+	:param root:
+	:param pattern: A filename, which may contain glob-style wildcards.
+	"""
+
+	if any(char in pattern for char in "*?["):
+		note_volatile()
+
+	matches = [filename for filename in root.glob(pattern) if filename.is_file()]
+
+	if not matches:
+		raise FileNotFoundError(f"Cannot find '{pattern}' in '{root}'")
+
+	return max(matches, key=lambda filename: filename.stat().st_mtime_ns)
+
+
+def _parse_wheel_extras(wheel_file: PathPlus) -> Dict[str, List[str]]:
+	"""
+	Parse the extras from the ``METADATA`` file of a wheel.
+
+	Only the central directory and the ``METADATA`` member of the wheel are read.
+
+	:param wheel_file:
+
+	:return: A mapping of normalized extra names to sorted lists of requirements.
+	"""
+
+	metadata = None
+
+	try:
+		# Not mmap: zipfile cannot read from one before Python 3.13, and only seeks to the parts it needs anyway.
+		with zipfile.ZipFile(wheel_file) as wheel:
+			for member in wheel.namelist():
+				directory, _, filename = member.partition('/')
+				if directory.endswith(".dist-info") and filename == "METADATA":
+					metadata = email.parser.BytesHeaderParser().parsebytes(wheel.read(member))
+					break
+
+	except zipfile.BadZipFile as e:
+		raise ValueError(f"'{wheel_file}' is not a valid wheel: {e}") from None
+
+	if metadata is None:
+		raise ValueError(f"Cannot find the METADATA file in '{wheel_file}'")
+
+	return _extras_from_metadata(metadata.get_all("Provides-Extra") or (), metadata.get_all("Requires-Dist") or ())
+
+
+#: Cache of the extras parsed from wheels.
+#:
+#: .. versionadded:: 0.6.0
+wheel_cache = MetadataCache("wheel")
+
+
+@sources.register_extras("wheel")
+def _wheel_extras(
+		package_root: pathlib.Path,
+		options: Dict,
+		env: sphinx.environment.BuildEnvironment,
+		) -> Dict[str, List[str]]:
+	"""
+	Returns the extras from the ``METADATA`` file of the wheel given by the ``wheel`` option.
+
+	:param package_root: The path to the package root.
+	:param options:
+	:param env:
+	"""
+
+	wheel_file = _find_archive(get_project_root(env, options), options["wheel"])
+	note_dependency(env, wheel_file)
+	return wheel_cache.get(wheel_file, _parse_wheel_extras)
+
+
+@sources.register("wheel", directives.unchanged_required)
+def requirements_from_wheel(
+		package_root: pathlib.Path,
+		options: Dict,
+		env: sphinx.environment.BuildEnvironment,
+		extra: str,
+		) -> List[str]:
+	"""
+	Load requirements from the ``METADATA`` file of a wheel.
+
+	The path to the wheel is relative to the parent directory of the documentation,
+	and may contain glob-style wildcards (e.g. ``dist/*.whl``).
+	If several files match the most recently modified one is used.
+
+	.. versionadded:: 0.6.0
+
+	:param package_root: The path to the package root.
+	:param options:
+	:param env:
+	:param extra: The name of the "extra" that the requirements are for.
+
+	:return: List of requirements.
+	"""
+
+	wheel_file = _find_archive(get_project_root(env, options), options["wheel"])
+	note_dependency(env, wheel_file)
+	extras = wheel_cache.get(wheel_file, _parse_wheel_extras)
+
+	if _normalize(extra) not in extras:
+		raise ValueError(f"'{extra}' not found in the 'Provides-Extra' metadata of '{wheel_file.name}'")
+
+	return list(extras[_normalize(extra)])
+
+
+def _parse_sdist_extras(sdist_file: PathPlus) -> Dict[str, List[str]]:
+	"""
+	Parse the extras from the ``PKG-INFO`` file of a source distribution.
+
+	The archive is streamed, and reading stops as soon as the top-level ``PKG-INFO`` member is found.
+
+	:param sdist_file:
+
+	:return: A mapping of normalized extra names to sorted lists of requirements.
+	"""
+
+	# stdlib
+	import tarfile
+
+	metadata = None
+
+	try:
+		with tarfile.open(sdist_file, mode="r|*") as sdist:
+			for member in sdist:
+				if member.name.partition('/')[2] == "PKG-INFO" and member.isfile():
+					pkg_info = sdist.extractfile(member)
+					assert pkg_info is not None
+					metadata = email.parser.BytesHeaderParser().parsebytes(pkg_info.read())
+					break
+
+	except tarfile.TarError as e:
+		raise ValueError(f"'{sdist_file}' is not a valid sdist: {e}") from None
+
+	if metadata is None:
+		raise ValueError(f"Cannot find the PKG-INFO file in '{sdist_file}'")
+
+	return _extras_from_metadata(metadata.get_all("Provides-Extra") or (), metadata.get_all("Requires-Dist") or ())
+
+
+#: Cache of the extras parsed from source distributions.
+#:
+#: .. versionadded:: 0.6.0
+sdist_cache = MetadataCache("sdist")
+
+
+@sources.register_extras("sdist")
+def _sdist_extras(
+		package_root: pathlib.Path,
+		options: Dict,
+		env: sphinx.environment.BuildEnvironment,
+		) -> Dict[str, List[str]]:
+	"""
+	Returns the extras from the ``PKG-INFO`` file of the source distribution given by the ``sdist`` option.
+
+	:param package_root: The path to the package root.
+	:param options:
+	:param env:
+	"""
+
+	sdist_file = _find_archive(get_project_root(env, options), options["sdist"])
+	note_dependency(env, sdist_file)
+	return sdist_cache.get(sdist_file, _parse_sdist_extras)
+
+
+@sources.register("sdist", directives.unchanged_required)
+def requirements_from_sdist(
+		package_root: pathlib.Path,
+		options: Dict,
+		env: sphinx.environment.BuildEnvironment,
+		extra: str,
+		) -> List[str]:
+	"""
+	Load requirements from the ``PKG-INFO`` file of a source distribution.
+
+	The path to the sdist is relative to the parent directory of the documentation,
+	and may contain glob-style wildcards (e.g. ``dist/*.tar.gz``).
+	If several files match the most recently modified one is used.
+
+	.. versionadded:: 0.6.0
+
+	:param package_root: The path to the package root.
+	:param options:
+	:param env:
+	:param extra: The name of the "extra" that the requirements are for.
+
+	:return: List of requirements.
+	"""
+
+	sdist_file = _find_archive(get_project_root(env, options), options["sdist"])
+	note_dependency(env, sdist_file)
+	extras = sdist_cache.get(sdist_file, _parse_sdist_extras)
+
+	if _normalize(extra) not in extras:
+		raise ValueError(f"'{extra}' not found in the 'Provides-Extra' metadata of '{sdist_file.name}'")
+
+	return list(extras[_normalize(extra)])
+
+
+#: The version of the extras manifest format.
+#:
+#: .. versionadded:: 0.6.0
+MANIFEST_VERSION = 1
+
+#: Cache of the extras manifests written by ``python -m sphinxcontrib.extras_require build-manifest``.
+#:
+#: .. versionadded:: 0.6.0
+manifest_cache = MetadataCache("extras manifest")
+
+#: Cache of the digests of the files the entries in extras manifests were built from,
+#: so each file is only hashed once however many directives use the manifest.
+#:
+#: .. versionadded:: 0.6.0
+manifest_digest_cache = DigestCache("manifest sources")
+
+
+def _load_manifest(manifest_file: PathPlus) -> Dict[str, Any]:
+	"""
+	Parse an extras manifest.
+
+	:param manifest_file:
+	"""
+
+	manifest = json.loads(manifest_file.read_text())
+
+	if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+		raise ValueError(f"'{manifest_file}' is not a version {MANIFEST_VERSION} extras manifest")
+
+	return manifest
+
+
+def _manifest_entry(options: Dict, env: sphinx.environment.BuildEnvironment) -> Dict[str, Any]:
+	"""
+	Returns the entry in the extras manifest for the source named by the ``manifest`` option.
+
+	The digests of the files the entry was built from are compared with those files, if they exist,
+	and an error is raised if any have changed since the manifest was built.
+
+	:param options:
+	:param env:
+	"""
+
+	project_root = get_project_root(env, options)
+	manifest_file = project_root / getattr(env.config, "extras_require_manifest", "extras-manifest.json")
+
+	if not manifest_file.is_file():
+		raise FileNotFoundError(f"Cannot find the extras manifest '{manifest_file}'")
+
+	note_dependency(env, manifest_file)
+	manifest_sources = manifest_cache.get(manifest_file, _load_manifest)["sources"]
+
+	name = options["manifest"]
+	if name is True:
+		names = [source_name for source_name, entry in manifest_sources.items() if "extras" in entry]
+		if len(names) != 1:
+			choices = ", ".join(map(repr, names))
+			raise ValueError(f"Please give the name of a source in '{manifest_file.name}': {choices}")
+		name = names[0]
+
+	if name not in manifest_sources:
+		raise ValueError(f"'{name}' not found in '{manifest_file.name}'")
+
+	entry = manifest_sources[name]
+
+	for filename, digest in entry["files"].items():
+		source_file = project_root / filename
+
+		if not source_file.is_file():
+			# The source files need not be present, e.g. in a documentation-only checkout.
+			continue
+
+		note_dependency(env, source_file)
+
+		if manifest_digest_cache.get(source_file) != digest:
+			raise ValueError(
+					f"The extras manifest '{manifest_file}' is out of date, as '{filename}' has changed. "
+					"Rebuild it with 'python -m sphinxcontrib.extras_require build-manifest'."
+					)
+
+	return entry
+
+
+@sources.register_extras("manifest")
+def _manifest_extras(
+		package_root: pathlib.Path,
+		options: Dict,
+		env: sphinx.environment.BuildEnvironment,
+		) -> Dict[str, List[str]]:
+	"""
+	Returns the extras from the source named by the ``manifest`` option in the extras manifest.
+
+	:param package_root: The path to the package root.
+	:param options:
+	:param env:
+	"""
+
+	entry = _manifest_entry(options, env)
+
+	if "extras" not in entry:
+		raise ValueError(f"The requirements file {options['manifest']!r} does not provide the names of any extras")
+
+	return entry["extras"]
+
+
+@sources.register("manifest", _optional_argument)
+def requirements_from_manifest(
+		package_root: pathlib.Path,
+		options: Dict,
+		env: sphinx.environment.BuildEnvironment,
+		extra: str,
+		) -> List[str]:
+	"""
+	Load requirements from an extras manifest written by ``python -m sphinxcontrib.extras_require build-manifest``.
+
+	The manifest is given by :confval:`extras_require_manifest`.
+	The value of the option is the name of a source in the manifest,
+	and may be omitted if the manifest contains a single source other than requirements files.
+
+	.. versionadded:: 0.6.0
+
+	:param package_root: The path to the package root.
+	:param options:
+	:param env:
+	:param extra: The name of the "extra" that the requirements are for.
+
+	:return: List of requirements.
+	"""
+
+	entry = _manifest_entry(options, env)
+
+	if "extras" not in entry:
+		return list(entry["requirements"])
+
+	if extra not in entry["extras"]:
+		raise ValueError(f"'{extra}' not found in the {options['manifest']!r} entry of the extras manifest")
+
+	return list(entry["extras"][extra])
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+#
+#  table.py
+"""
+The :rst:dir:`extras-require-table` directive.
+
+.. versionadded:: 0.6.0
+"""
+#
+#  Copyright © 2020-2021 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Redistribution and use in source and binary forms, with or without modification,
+#  are permitted provided that the following conditions are met:
+#
+#      * Redistributions of source code must retain the above copyright notice,
+#        this list of conditions and the following disclaimer.
+#      * Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+#  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+#  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+#  A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER
+#  OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+
+# stdlib
+from typing import Any, Callable, ClassVar, Dict, List, Optional
+
+# 3rd party
+from docutils import nodes
+from docutils.parsers.rst import directives
+from sphinx.util.docutils import SphinxDirective
+
+# this package
+from sphinxcontrib.extras_require.dependencies import record_requirements
+from sphinxcontrib.extras_require.directive import (
+		ExtrasRequireDirective,
+		get_package_name,
+		list_extras,
+		resolve_requirements,
+		select_source
+		)
+
+__all__ = ["ExtrasRequireTableDirective", "extras_list", "make_table"]
+
+
+def extras_list(argument: Optional[str]) -> List[str]:
+	"""
+	Validator for a comma or whitespace separated list of extras.
+
+	:param argument:
+	"""
+
+	if argument is None:
+		raise ValueError("argument required but none supplied")
+
+	return directives.unchanged_required(argument).replace(',', ' ').split()
+
+
+def _sort_order(argument: Optional[str]) -> str:
+	"""
+	Validator for the ``:sort:`` option.
+
+	:param argument:
+	"""
+
+	values = ("name", "source")
+
+	if argument is None:
+		raise ValueError(f"must supply an argument; choose from {directives.format_values(values)}")
+
+	return directives.choice(argument, values)
+
+
+def make_table(requirements: Dict[str, List[str]], package_name: str) -> nodes.table:
+	"""
+	Create a table of extras, their requirements, and the commands to install them.
+
+	:param requirements: Mapping of the names of the extras to their requirements, in the order they should be shown.
+	:param package_name: The name of the module/package on PyPI.
+	"""
+
+	table = nodes.table(classes=["extras-require-table"])
+	tgroup = nodes.tgroup(cols=3)
+	table += tgroup
+
+	for width in (20, 40, 40):
+		tgroup += nodes.colspec(colwidth=width)
+
+	def make_row(*cells: nodes.Node) -> nodes.row:
+		return nodes.row('', *(nodes.entry('', cell) for cell in cells))
+
+	thead = nodes.thead()
+	thead += make_row(
+			nodes.paragraph(text="Extra"),
+			nodes.paragraph(text="Requirements"),
+			nodes.paragraph(text="Installation"),
+			)
+	tgroup += thead
+
+	tbody = nodes.tbody()
+	tgroup += tbody
+
+	for extra, extra_requirements in requirements.items():
+		tbody += make_row(
+				nodes.paragraph('', '', nodes.literal(text=extra)),
+				nodes.line_block('', *(nodes.line('', '', nodes.literal(text=req)) for req in extra_requirements)),
+				nodes.paragraph('', '', nodes.literal(text=f"python -m pip install {package_name}[{extra}]")),
+				)
+
+	return table
+
+
+class ExtrasRequireTableDirective(SphinxDirective):
+	"""
+	Directive to show a table of the extras provided by a source, with their requirements.
+
+	The source is read once for all the extras.
+	Only the extras given in the ``:extras:`` option are shown, if it is given,
+	and the extras given in the ``:exclude:`` option are omitted.
+	The extras are sorted by name, unless the ``:sort:`` option is ``source``,
+	in which case they are shown in the order the source (or the ``:extras:`` option) defines them.
+	"""
+
+	has_content: ClassVar[bool] = False
+
+	option_spec: ClassVar[Dict[str, Callable[[str], Any]]] = {
+			name: validator
+			for name, validator in ExtrasRequireDirective.option_spec.items() if name != "scope"
+			}
+	option_spec["extras"] = extras_list
+	option_spec["exclude"] = extras_list
+	option_spec["sort"] = _sort_order
+
+	def run(self) -> List[nodes.Node]:
+		"""
+		Create the table.
+		"""
+
+		source = select_source("table", self.options, [])
+		assert source is not None
+		option_name = source[0]
+		value = self.options[option_name]
+
+		if "extras" in self.options:
+			extras = list(self.options["extras"])
+		else:
+			extras = list_extras(self.env, option_name, self.options)
+			record_requirements(self.env, option_name, value, None, extras, package=self.options.get("package"))
+
+		extras = [extra for extra in extras if extra not in self.options.get("exclude", ())]
+
+		if self.options.get("sort", "name") == "name":
+			extras.sort()
+
+		if not extras:
+			msg = self.state.reporter.warning("No extras to show in the table.", line=self.lineno)
+			return [msg]
+
+		requirements = resolve_requirements(self.env, option_name, self.options, extras)
+
+		for extra in extras:
+			record_requirements(
+					self.env,
+					option_name,
+					value,
+					extra,
+					requirements[extra],
+					package=self.options.get("package"),
+					)
+
+		table = make_table(
+				{extra: requirements[extra] for extra in extras},
+				get_package_name(self.env, self.options),
+				)
+		self.set_source_info(table)
+
+		return [table]
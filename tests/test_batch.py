@@ -0,0 +1,103 @@
+# stdlib
+import pathlib
+from types import SimpleNamespace
+from typing import Dict, List
+
+# 3rd party
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from sphinxcontrib.extras_require import directive
+from sphinxcontrib.extras_require.sources import Sources, sources
+
+
+@pytest.fixture()
+def the_sources(monkeypatch: MonkeyPatch) -> Sources:
+	the_sources = Sources(sources)
+	monkeypatch.setattr(directive, "sources", the_sources)
+	return the_sources
+
+
+def test_register_batch(the_sources: Sources) -> None:
+	calls: List[List[str]] = []
+
+	@the_sources.register_batch("lockfile")
+	def requirements_from_lockfile(package_root, options, env, extras):  # noqa: MAN001,MAN002
+		calls.append(extras)
+		return {extra: [f"{extra}-requirement"] for extra in extras if extra != "missing"}
+
+	source = the_sources.get("lockfile")
+	assert source is not None
+
+	option_name, getter, validator = source
+	assert getter.batch is requirements_from_lockfile  # type: ignore[attr-defined]
+
+	# The getter can still be called for a single extra.
+	assert getter(pathlib.Path('.'), {}, None, "docs") == ["docs-requirement"]
+	assert calls == [["docs"]]
+
+	with pytest.raises(ValueError, match="'missing' not found"):
+		getter(pathlib.Path('.'), {}, None, "missing")
+
+
+def test_register_batch_bad_signature(the_sources: Sources) -> None:
+	with pytest.raises(SyntaxError, match="'package_root', 'options', 'env', and 'extras'"):
+
+		@the_sources.register_batch("lockfile")
+		def requirements_from_lockfile(package_root, options, env, extra):  # noqa: MAN001,MAN002
+			return {}
+
+	# The existing form still checks for a single extra.
+	with pytest.raises(SyntaxError, match="'package_root', 'options', 'env', and 'extra'"):
+
+		@the_sources.register("lockfile")
+		def requirements_from_lockfile_batch(package_root, options, env, extras):  # noqa: MAN001,MAN002
+			return []
+
+
+def test_resolve_requirements(tmp_pathplus: PathPlus, the_sources: Sources) -> None:
+	env = SimpleNamespace(srcdir=tmp_pathplus / "docs", config=SimpleNamespace(package_root='.'))
+	batch_calls: List[List[str]] = []
+	single_calls: List[str] = []
+
+	@the_sources.register_batch("lockfile")
+	def requirements_from_lockfile(package_root, options, env, extras):  # noqa: MAN001,MAN002
+		batch_calls.append(extras)
+		return {extra: [f"{extra}>=1.0", "shared"] for extra in extras if extra != "missing"}
+
+	@the_sources.register("single")
+	def requirements_from_single(package_root, options, env, extra):  # noqa: MAN001,MAN002
+		single_calls.append(extra)
+		return [extra]
+
+	options: Dict[str, str] = {"lockfile": "poetry"}
+	resolved = directive.resolve_requirements(env, "lockfile", options, ["test", "doc", "test"])  # type: ignore[arg-type]
+	assert resolved == {"test": ["shared", "test>=1.0"], "doc": ["doc>=1.0", "shared"]}
+	assert batch_calls == [["test", "doc"]]
+
+	resolved = directive.resolve_requirements(env, "single", {"single": True}, ["test", "doc"])  # type: ignore[arg-type]
+	assert resolved == {"test": ["test"], "doc": ["doc"]}
+	assert single_calls == ["test", "doc"]
+
+	with pytest.raises(ValueError, match="'missing' not found by the 'lockfile' source"):
+		directive.resolve_requirements(env, "lockfile", options, ["test", "missing"])  # type: ignore[arg-type]
+
+
+def test_register_extras(the_sources: Sources) -> None:
+	assert the_sources.get_extras("pyproject") is sources.get_extras("pyproject")
+	assert the_sources.get_extras("file") is None
+
+	@the_sources.register_extras("lockfile")
+	def lockfile_extras(package_root, options, env):  # noqa: MAN001,MAN002
+		return ["test", "docs"]
+
+	assert the_sources.get_extras("lockfile") is lockfile_extras
+	assert sources.get_extras("lockfile") is None
+
+	with pytest.raises(SyntaxError, match="'package_root', 'options', and 'env'"):
+
+		@the_sources.register_extras("lockfile")
+		def bad_signature(env):  # noqa: MAN001,MAN002
+			return []
@@ -0,0 +1,266 @@
+# stdlib
+import multiprocessing
+import os
+import sqlite3
+
+# 3rd party
+import pytest
+from docutils import nodes
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from sphinxcontrib.extras_require.cache import (
+		MetadataCache,
+		NoticeCache,
+		RequirementsIndex,
+		clear_caches,
+		SharedCache,
+		file_digest,
+		requirement_cache
+		)
+from sphinxcontrib.extras_require.directive import validate_requirements
+from sphinxcontrib.extras_require.sources import pyproject_cache, requirements_from_flit, requirements_from_pyproject
+
+
+class MockBuildEnvironment:
+
+	def __init__(self, tmpdir: PathPlus):
+		self.srcdir = tmpdir / "docs"
+
+
+def test_metadata_cache(tmp_pathplus: PathPlus) -> None:
+	the_file = tmp_pathplus / "file.txt"
+	the_file.write_text("hello")
+
+	calls = []
+
+	def loader(filename: PathPlus) -> str:
+		calls.append(filename)
+		return filename.read_text()
+
+	cache = MetadataCache("test")
+	assert cache.get(the_file, loader) == "hello"
+	assert cache.get(the_file, loader) == "hello"
+	assert len(calls) == 1
+	assert cache.statistics == ("test", 1, 1, 1)
+	assert cache.digest(the_file) == file_digest(the_file)
+
+	# Touching the file without changing its content does not invalidate the entry.
+	os.utime(the_file, ns=(0, 0))
+	assert cache.get(the_file, loader) == "hello"
+	assert len(calls) == 1
+
+	the_file.write_text("world")
+	assert cache.get(the_file, loader) == "world"
+	assert len(calls) == 2
+	assert cache.statistics == ("test", 2, 2, 1)
+	assert str(cache.statistics) == "test: 2 hits, 2 misses, 1 entries"
+
+	clear_caches()
+	assert cache.statistics == ("test", 0, 0, 0)
+	assert cache.digest(the_file) is None
+
+
+def test_pyproject_cache(tmp_pathplus: PathPlus) -> None:
+	(tmp_pathplus / "pyproject.toml").write_lines([
+			"[tool.flit.metadata.requires-extra]",
+			'test = ["pytest >=2.7.3", "pytest-cov"]',
+			'',
+			"[project.optional-dependencies]",
+			'doc = ["sphinx"]',
+			])
+
+	clear_caches()
+	env = MockBuildEnvironment(tmp_pathplus)
+
+	for _ in range(5):
+		assert requirements_from_flit(tmp_pathplus, {}, env, "test") == ["pytest>=2.7.3", "pytest-cov"]
+		assert requirements_from_pyproject(tmp_pathplus, {}, env, "doc") == ["sphinx"]
+
+	assert pyproject_cache.statistics == ("pyproject.toml", 9, 1, 1)
+
+
+def test_requirement_cache() -> None:
+	clear_caches()
+
+	for _ in range(3):
+		assert validate_requirements(["pytz<1.2", "numpy >=1.0"]) == ["numpy>=1.0", "pytz<1.2"]
+		assert validate_requirements(["numpy>=1.0"]) == ["numpy>=1.0"]
+
+	assert requirement_cache.statistics == ("requirements", 4, 2, 2)
+	assert requirement_cache.statistics.hit_rate == 4 / 6
+
+	# Equal requirements share one object.
+	assert requirement_cache.parse("numpy >=1.0") is requirement_cache.parse("numpy>=1.0")
+
+	assert requirement_cache.memory_usage() > 0
+	assert requirement_cache.summary().startswith("requirements: 4 hits, 2 misses, 2 entries (67% hit rate), ")
+	assert "2 unique requirements" in requirement_cache.summary()
+
+
+def test_notice_cache() -> None:
+	cache = NoticeCache(maxsize=2)
+
+	def factory(text: str) -> nodes.Element:
+		return nodes.paragraph(text, text)
+
+	first = cache.get('a', lambda: factory('a'))
+	second = cache.get('a', lambda: factory("not used"))
+
+	assert first.astext() == second.astext() == 'a'
+	assert first is not second
+
+	# Copies can be modified without affecting later copies.
+	first["ids"].append("extras_require-0")
+	assert cache.get('a', lambda: factory("not used"))["ids"] == []
+
+	cache.get('b', lambda: factory('b'))
+	cache.get('c', lambda: factory('c'))
+	assert cache.get('a', lambda: factory("new a")).astext() == "new a"
+
+	assert cache.statistics == ("notices", 2, 4, 2)
+	assert cache.evictions == 2
+	assert cache.summary() == "notices: 2 hits, 4 misses, 2 entries (33% hit rate), 2 evictions"
+
+
+def _load_in_subprocess(shared: SharedCache, filename: str, queue: "multiprocessing.Queue[object]") -> None:
+	queue.put(shared.get("test", filename, file_digest(filename), lambda: ["parsed", "in", "subprocess"]))
+
+
+def test_shared_cache(tmp_pathplus: PathPlus) -> None:
+	shared = SharedCache()
+	(tmp_pathplus / "pyproject.toml").write_text("[project]")
+	filename = os.fspath(tmp_pathplus / "pyproject.toml")
+	digest = file_digest(filename)
+
+	# Not used until opened.
+	assert shared.get("test", filename, digest, lambda: ["a"]) == ["a"]
+	assert shared.statistics == ("shared", 0, 0, 0)
+
+	shared.open(tmp_pathplus / ".doctrees" / "extras_require.sqlite")
+	assert shared.get("test", filename, digest, lambda: {"test": ["pytest"]}) == {"test": ["pytest"]}
+	assert shared.get("test", filename, digest, lambda: {"test": ["not used"]}) == {"test": ["pytest"]}
+	assert shared.get("test", filename, digest, lambda: None) == {"test": ["pytest"]}
+	assert shared.get("other", filename, digest, lambda: None) is None
+	assert shared.get("other", filename, digest, lambda: ["not used"]) is None
+	assert shared.statistics == ("shared", 3, 2, 2)
+
+	# Values which cannot be stored are still returned.
+	assert shared.get("objects", filename, digest, lambda: {object}) == {object}
+	assert len(shared) == 2
+
+	# Other processes use the stored values.
+	if "fork" in multiprocessing.get_all_start_methods():
+		context = multiprocessing.get_context("fork")
+		queue = context.Queue()
+		process = context.Process(target=_load_in_subprocess, args=(shared, filename, queue))
+		process.start()
+		assert queue.get(timeout=30) == {"test": ["pytest"]}
+		process.join()
+
+	# A new digest replaces the old entry for the file.
+	assert shared.get("test", filename, "0" * 64, lambda: ["new"]) == ["new"]
+	assert len(shared) == 2
+
+	# Reopening the database starts afresh.
+	shared.open(tmp_pathplus / ".doctrees" / "extras_require.sqlite")
+	assert len(shared) == 0
+	shared.close()
+
+
+def test_requirements_index(tmp_pathplus: PathPlus) -> None:
+	index = RequirementsIndex()
+	database = tmp_pathplus / ".doctrees" / "extras_require_index.sqlite"
+	setup_cfg = tmp_pathplus / "setup.cfg"
+	setup_cfg.write_text("[options.extras_require]\ntest = pytest\n")
+	files = [os.fspath(setup_cfg)]
+
+	# Not used until opened.
+	index.set(tmp_pathplus, "setup.cfg", True, "test", files, ["pytest"])
+	assert index.get(tmp_pathplus, "setup.cfg", True, "test") is None
+
+	index.open(database, fingerprint="a")
+	assert index.get(tmp_pathplus, "setup.cfg", True, "test") is None
+	index.set(tmp_pathplus, "setup.cfg", True, "test", files, ["pytest"])
+	assert index.get(tmp_pathplus, "setup.cfg", True, "test") == (files, ["pytest"])
+	assert index.get(tmp_pathplus / "other", "setup.cfg", True, "test") is None
+	assert index.statistics == ("index", 1, 2, 1)
+
+	# Persists between builds, and survives the file being touched.
+	index.open(database, fingerprint="a")
+	os.utime(setup_cfg, ns=(0, 0))
+	assert index.get(tmp_pathplus, "setup.cfg", True, "test") == (files, ["pytest"])
+
+	# The content changes.
+	setup_cfg.write_text("[options.extras_require]\ntest = pytest; coverage\n")
+	assert index.get(tmp_pathplus, "setup.cfg", True, "test") is None
+
+	# The configuration changes.
+	index.set(tmp_pathplus, "setup.cfg", True, "test", files, ["coverage", "pytest"])
+	index.open(database, fingerprint='b')
+	assert len(index) == 0
+
+	# The file is removed.
+	index.set(tmp_pathplus, "setup.cfg", True, "test", files, ["coverage", "pytest"])
+	setup_cfg.unlink()
+	index.open(database, fingerprint='b')
+	assert len(index) == 0
+
+	# The format of the database changes.
+	index.set(tmp_pathplus, "file", "requirements.txt", "test", [os.fspath(database)], ["pytest"])
+	index.version += 1
+	index.open(database, fingerprint='b')
+	assert len(index) == 0
+	index.close()
+
+
+def test_requirements_index_shared_file(tmp_pathplus: PathPlus) -> None:
+	index = RequirementsIndex()
+	index.open(tmp_pathplus / ".doctrees" / "extras_require_index.sqlite")
+	pyproject = tmp_pathplus / "pyproject.toml"
+	pyproject.write_text("a")
+	files = [os.fspath(pyproject)]
+
+	index.set(tmp_pathplus, "pyproject", True, "test", files, ["pytest"])
+	index.set(tmp_pathplus, "flit", True, "test", files, ["pytest"])
+
+	# Only one of the entries which read the file is updated.
+	pyproject.write_text("b")
+	index.set(tmp_pathplus, "flit", True, "test", files, ["pytest>=6"])
+
+	assert index.get(tmp_pathplus, "flit", True, "test") == (files, ["pytest>=6"])
+	assert index.get(tmp_pathplus, "pyproject", True, "test") is None
+	index.close()
+
+
+def test_database_transactions(tmp_pathplus: PathPlus) -> None:
+	shared = SharedCache()
+	database = tmp_pathplus / ".doctrees" / "extras_require.sqlite"
+	shared.open(database)
+	connection = shared._connect()
+	assert connection is not None
+
+	other = sqlite3.connect(os.fspath(database), timeout=0, isolation_level=None)
+
+	with shared._transaction(connection):
+		connection.execute("INSERT INTO metadata VALUES ('test', 'a', 'digest', '[]')")
+
+		# Other connections can neither write, nor see the changes, until the transaction is committed.
+		with pytest.raises(sqlite3.OperationalError, match="database is locked"):
+			other.execute("BEGIN IMMEDIATE")
+		assert other.execute("SELECT COUNT(*) FROM metadata").fetchone()[0] == 0
+
+	assert other.execute("SELECT COUNT(*) FROM metadata").fetchone()[0] == 1
+
+	# The changes are rolled back if an exception is raised.
+	with pytest.raises(ValueError, match="rolled back"):
+		with shared._transaction(connection):
+			connection.execute("DELETE FROM metadata")
+			raise ValueError("rolled back")
+
+	assert len(shared) == 1
+	other.execute("BEGIN IMMEDIATE")
+	other.execute("ROLLBACK")
+
+	other.close()
+	shared.close()
@@ -0,0 +1,104 @@
+# stdlib
+from typing import List
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from sphinxcontrib.extras_require.__main__ import main
+from sphinxcontrib.extras_require.prefetch import ScannedDirective, extract_directives
+
+
+def test_extract_directives() -> None:
+	source = [
+			"Title",
+			"=====",
+			'',
+			".. extras-require:: test",
+			"\t:setup.cfg:",
+			'',
+			".. extras-require:: manual",
+			'',
+			"\tfoo",
+			"\tbar>=1",
+			'',
+			"\t.. extras-require:: nested",
+			"\t\t:flit:",
+			]
+
+	assert list(extract_directives(line + '\n' for line in source)) == [
+			ScannedDirective(4, "test", {"setup.cfg": None}, []),
+			ScannedDirective(7, "manual", {}, ["foo", "bar>=1"]),
+			ScannedDirective(12, "nested", {"flit": None}, []),
+			]
+
+
+@pytest.fixture()
+def project(tmp_pathplus: PathPlus) -> PathPlus:
+	doc_source = tmp_pathplus / "doc-source"
+	doc_source.mkdir()
+	(doc_source / "conf.py").write_lines([
+			'extensions = ["sphinxcontrib.extras_require"]',
+			'package_root = "."',
+			'project = "FooBar"',
+			'exclude_patterns = ["excluded.rst"]',
+			])
+	(doc_source / "index.rst").write_lines([
+			"Index",
+			"=====",
+			'',
+			".. extras-require:: test",
+			"\t:pyproject:",
+			'',
+			".. extras-require:: manual",
+			'',
+			"\tpytest",
+			])
+	(doc_source / "excluded.rst").write_lines([".. extras-require:: missing", "\t:pyproject:"])
+	(tmp_pathplus / "pyproject.toml").write_lines([
+			"[project.optional-dependencies]",
+			'test = ["pytest"]',
+			])
+
+	return doc_source
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_check_valid(project: PathPlus, jobs: str, capsys: pytest.CaptureFixture[str]) -> None:
+	assert main(["check", project.as_posix(), "--jobs", jobs]) == 0
+
+	captured = capsys.readouterr()
+	assert captured.out == ''
+	assert captured.err == "Checked 2 directive(s).\n"
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_check_invalid(project: PathPlus, jobs: str, capsys: pytest.CaptureFixture[str]) -> None:
+	(project / "usage.rst").write_lines([
+			"Usage",
+			"=====",
+			'',
+			".. extras-require:: missing",
+			"\t:pyproject:",
+			'',
+			".. extras-require:: invalid",
+			'',
+			"\tpytest!!",
+			'',
+			".. extras-require:: empty",
+			'',
+			".. extras-require:: unknown",
+			"\t:bogus:",
+			])
+
+	assert main(["check", project.as_posix(), "-j", jobs]) == 1
+
+	captured = capsys.readouterr()
+	lines: List[str] = captured.out.splitlines()
+	usage = (project / "usage.rst").as_posix()
+	assert lines[0] == f"{usage}:4: 'missing' not found in '[project.optional-dependencies]'"
+	assert lines[1].startswith(f"{usage}:7: Invalid requirement 'pytest!!'")
+	assert f"{usage}:11: Please specify a source for the extra requirements empty" in lines
+	assert lines[-1] == f"{usage}:13: Unknown option 'bogus'"
+	assert captured.err == "Found 4 problem(s) in 6 directive(s).\n"
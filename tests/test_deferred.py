@@ -0,0 +1,165 @@
+# stdlib
+import os
+from io import StringIO
+from typing import Dict, List
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+from sphinx.application import Sphinx
+from sphinx.util.docutils import docutils_namespace
+
+# this package
+from sphinxcontrib.extras_require import directive
+from sphinxcontrib.extras_require.purger import NoticeRecord, extras_require_purger
+from sphinxcontrib.extras_require.sources import pyproject_cache
+
+
+def write_project(repo_root: PathPlus, deferred: bool) -> None:
+	doc_source = repo_root / "doc-source"
+	doc_source.mkdir(parents=True)
+
+	(doc_source / "conf.py").write_lines([
+			'extensions = ["sphinxcontrib.extras_require"]',
+			'package_root = "."',
+			'project = "FooBar"',
+			f"extras_require_deferred = {deferred}",
+			])
+	(doc_source / "index.rst").write_lines([
+			"Index",
+			"=====",
+			'',
+			".. toctree::",
+			'',
+			*(f"\tdocument_{idx}" for idx in range(4)),
+			])
+
+	for idx in range(4):
+		(doc_source / f"document_{idx}.rst").write_lines([
+				f"Document {idx}",
+				"==========",
+				'',
+				".. extras-require:: test",
+				"\t:pyproject:",
+				'',
+				".. extras-require:: doc",
+				"\t:pyproject:",
+				"\t:scope: class",
+				])
+
+	(repo_root / "pyproject.toml").write_lines([
+			"[project.optional-dependencies]",
+			'test = ["pytest", "pytest-cov"]',
+			'doc = ["sphinx>=3.4"]',
+			])
+
+
+def build(repo_root: PathPlus) -> Dict[str, str]:
+	outdir = repo_root / "build"
+
+	with docutils_namespace():
+		app = Sphinx(
+				srcdir=os.fspath(repo_root / "doc-source"),
+				confdir=os.fspath(repo_root / "doc-source"),
+				outdir=os.fspath(outdir),
+				doctreedir=os.fspath(outdir / ".doctrees"),
+				buildername="html",
+				status=None,
+				warning=None,
+				)
+		app.build()
+		records = extras_require_purger.get_records(app.env)
+
+	assert records["document_0"] == [
+			NoticeRecord(4, "extras_require-0", "test", ("pytest", "pytest-cov"), records["document_0"][0].source),
+			NoticeRecord(7, "extras_require-1", "doc", ("sphinx>=3.4", ), records["document_0"][1].source),
+			]
+
+	return {filename.name: filename.read_text() for filename in sorted(outdir.glob("document_*.html"))}
+
+
+def test_deferred(tmp_pathplus: PathPlus, monkeypatch) -> None:
+	write_project(tmp_pathplus / "immediate", deferred=False)
+	expected_output = build(tmp_pathplus / "immediate")
+	assert len(expected_output) == 4
+
+	validated: List[List[str]] = []
+	validate_requirements = directive.validate_requirements
+
+	def record_validation(requirements_list: List[str]) -> List[str]:
+		validated.append(requirements_list)
+		return validate_requirements(requirements_list)
+
+	monkeypatch.setattr(directive, "validate_requirements", record_validation)
+
+	write_project(tmp_pathplus / "deferred", deferred=True)
+	assert build(tmp_pathplus / "deferred") == expected_output
+
+	# Each extra is only obtained and validated once.
+	assert pyproject_cache.statistics.misses == 1
+	assert sorted(validated) == [["pytest", "pytest-cov"], ["sphinx>=3.4"]]
+
+
+def test_deferred_errors(tmp_pathplus: PathPlus) -> None:
+	expected_output = {}
+
+	for deferred in (False, True):
+		repo_root = tmp_pathplus / str(deferred)
+		doc_source = repo_root / "doc-source"
+		doc_source.mkdir(parents=True)
+		(doc_source / "conf.py").write_lines([
+				'extensions = ["sphinxcontrib.extras_require"]',
+				'package_root = "."',
+				'project = "FooBar"',
+				f"extras_require_deferred = {deferred}",
+				])
+		(doc_source / "index.rst").write_lines([
+				"Index",
+				"=====",
+				'',
+				".. extras-require:: empty",
+				"\t:file: empty.txt",
+				])
+		(repo_root / "empty.txt").write_lines(["# no requirements"])
+		(repo_root / "pyproject.toml").write_lines(["[project.optional-dependencies]", 'test = ["pytest"]'])
+
+		if deferred:
+			(doc_source / "usage.rst").write_lines([
+					"Usage",
+					"=====",
+					'',
+					".. extras-require:: missing",
+					"\t:pyproject:",
+					'',
+					".. extras-require:: test",
+					"\t:pyproject:",
+					])
+
+		warnings = StringIO()
+
+		with docutils_namespace():
+			app = Sphinx(
+					srcdir=os.fspath(doc_source),
+					confdir=os.fspath(doc_source),
+					outdir=os.fspath(repo_root / "build"),
+					doctreedir=os.fspath(repo_root / "build" / ".doctrees"),
+					buildername="html",
+					status=None,
+					warning=warnings,
+					)
+			app.build()
+
+		index_warning = f"{doc_source / 'index.rst'}:4: WARNING: No requirements specified!"
+		assert index_warning in warnings.getvalue()
+		expected_output[deferred] = (repo_root / "build" / "index.html").read_text()
+
+	# The same as when the requirements are obtained while reading.
+	assert expected_output[True] == expected_output[False]
+	assert '<span class="problematic">.. extras-require:: empty' in expected_output[True]
+
+	# One extra which cannot be obtained doesn't prevent the others from being shown.
+	usage_warning = f"{doc_source / 'usage.rst'}:4: WARNING: 'missing' not found in '[project.optional-dependencies]'"
+	assert usage_warning in warnings.getvalue()
+
+	usage = (repo_root / "build" / "usage.html").read_text()
+	assert '<span class="problematic">.. extras-require:: missing' in usage
+	assert "pytest" in usage
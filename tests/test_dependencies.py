@@ -0,0 +1,162 @@
+# stdlib
+import os
+import pickle
+from typing import List
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+from sphinx.application import Sphinx
+from sphinx.util.docutils import docutils_namespace
+
+# this package
+import sphinxcontrib.extras_require
+from sphinxcontrib.extras_require.cache import requirements_index
+from sphinxcontrib.extras_require.dependencies import get_dependencies
+from sphinxcontrib.extras_require.sources import pyproject_cache
+
+
+def write_pyproject(repo_root: PathPlus, test: str, doc: str, mtime: int) -> None:
+	pyproject_file = repo_root / "pyproject.toml"
+	pyproject_file.write_lines([
+			"[project.optional-dependencies]",
+			f"test = [{test}]",
+			f"doc = [{doc}]",
+			])
+	os.utime(pyproject_file, ns=(mtime, mtime))
+
+
+def build(repo_root: PathPlus, freshenv: bool = False) -> List[str]:
+	with docutils_namespace():
+		app = Sphinx(
+				srcdir=os.fspath(repo_root / "doc-source"),
+				confdir=os.fspath(repo_root / "doc-source"),
+				outdir=os.fspath(repo_root / "build"),
+				doctreedir=os.fspath(repo_root / "build" / ".doctrees"),
+				buildername="html",
+				status=None,
+				warning=None,
+				freshenv=freshenv,
+				)
+
+		read: List[str] = []
+		app.connect("env-before-read-docs", lambda app, env, docnames: read.extend(docnames))
+		app.build()
+
+	return sorted(read)
+
+
+def test_incremental_build(tmp_pathplus: PathPlus, monkeypatch: pytest.MonkeyPatch) -> None:
+	doc_source = tmp_pathplus / "doc-source"
+	doc_source.mkdir()
+	(doc_source / "conf.py").write_lines([
+			'extensions = ["sphinxcontrib.extras_require"]',
+			'package_root = "."',
+			'project = "FooBar"',
+			])
+	(doc_source / "index.rst").write_lines([
+			"Index",
+			"=====",
+			'',
+			".. toctree::",
+			'',
+			"\ttesting",
+			"\tdocs",
+			])
+	(doc_source / "testing.rst").write_lines(["Testing", "=======", '', ".. extras-require:: test", "\t:pyproject:"])
+	(doc_source / "docs.rst").write_lines(["Docs", "====", '', ".. extras-require:: doc", "\t:pyproject:"])
+
+	mtime = 1_600_000_000_000_000_000
+	write_pyproject(tmp_pathplus, '"pytest"', '"sphinx"', mtime)
+	assert build(tmp_pathplus) == ["docs", "index", "testing"]
+
+	with open(tmp_pathplus / "build" / ".doctrees" / "environment.pickle", "rb") as fp:
+		dependencies = get_dependencies(pickle.load(fp))
+
+	assert dependencies["testing"].files == {os.fspath(tmp_pathplus / "pyproject.toml")}
+	assert list(dependencies["docs"].digests) == [("pyproject", True, "doc", None)]
+
+	# Only the "doc" extra changes.
+	write_pyproject(tmp_pathplus, '"pytest"', '"sphinx>=3"', mtime * 2)
+	assert build(tmp_pathplus) == ["docs"]
+	assert "sphinx&gt;=3" in (tmp_pathplus / "build" / "docs.html").read_text()
+
+	# The file is touched, but neither extra changes.
+	write_pyproject(tmp_pathplus, '"pytest"', '"sphinx>=3"', mtime * 3)
+	assert build(tmp_pathplus) == []
+
+
+	# A fresh environment reuses the requirements stored in the doctree directory.
+	assert build(tmp_pathplus, freshenv=True) == ["docs", "index", "testing"]
+	assert pyproject_cache.statistics.misses == 0
+	assert requirements_index.statistics.hits == 2
+	assert "sphinx&gt;=3" in (tmp_pathplus / "build" / "docs.html").read_text()
+
+	# The stored requirements were validated by an older version of the extension.
+	monkeypatch.setattr(sphinxcontrib.extras_require, "__version__", "0.0.0")
+	assert build(tmp_pathplus, freshenv=True) == ["docs", "index", "testing"]
+	assert requirements_index.statistics.hits == 0
+	assert requirements_index.statistics.entries == 2
+
+
+def test_shared_file_fresh_env(tmp_pathplus: PathPlus) -> None:
+	doc_source = tmp_pathplus / "doc-source"
+	doc_source.mkdir()
+	(doc_source / "conf.py").write_lines([
+			'extensions = ["sphinxcontrib.extras_require"]',
+			'package_root = "."',
+			'project = "FooBar"',
+			])
+	(doc_source / "index.rst").write_lines([
+			"Index",
+			"=====",
+			'',
+			".. toctree::",
+			'',
+			"\tflit",
+			"\tpep621",
+			])
+	(doc_source / "flit.rst").write_lines(["Flit", "====", '', ".. extras-require:: test", "\t:flit:"])
+	(doc_source / "pep621.rst").write_lines(["PEP 621", "=======", '', ".. extras-require:: test", "\t:pyproject:"])
+
+	def write(requirement: str) -> None:
+		(tmp_pathplus / "pyproject.toml").write_lines([
+				"[project.optional-dependencies]",
+				f'test = ["{requirement}"]',
+				"[tool.flit.metadata.requires-extra]",
+				f'test = ["{requirement}"]',
+				])
+
+	write("pytest-cov")
+	build(tmp_pathplus)
+
+	# Both sources read the file, and both must see the change.
+	write("pytest-cov>=3")
+	assert build(tmp_pathplus) == ["flit", "pep621"]
+	assert "pytest-cov&gt;=3" in (tmp_pathplus / "build" / "flit.html").read_text()
+	assert "pytest-cov&gt;=3" in (tmp_pathplus / "build" / "pep621.html").read_text()
+
+	write("pytest-cov>=4")
+	build(tmp_pathplus, freshenv=True)
+	assert "pytest-cov&gt;=4" in (tmp_pathplus / "build" / "flit.html").read_text()
+	assert "pytest-cov&gt;=4" in (tmp_pathplus / "build" / "pep621.html").read_text()
+
+
+def test_setuptools_directive_fresh_env(tmp_pathplus: PathPlus) -> None:
+	doc_source = tmp_pathplus / "doc-source"
+	doc_source.mkdir()
+	(doc_source / "conf.py").write_lines([
+			'extensions = ["sphinxcontrib.extras_require"]',
+			'package_root = "."',
+			'project = "FooBar"',
+			])
+	(doc_source / "index.rst").write_lines(["Index", "=====", '', ".. extras-require:: extra_c", "\t:setup.cfg:"])
+	(tmp_pathplus / "setup.cfg").write_lines(["[options.extras_require]", "extra_c = file: reqs-c.txt"])
+	(tmp_pathplus / "reqs-c.txt").write_lines(["faker"])
+	build(tmp_pathplus)
+
+	# The file referenced by setup.cfg is read again.
+	(tmp_pathplus / "reqs-c.txt").write_lines(["faker", "pytest"])
+	build(tmp_pathplus, freshenv=True)
+	assert "pytest" in (tmp_pathplus / "build" / "index.html").read_text()
+	assert requirements_index.statistics.entries == 0
@@ -0,0 +1,135 @@
+# stdlib
+import pathlib
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+# 3rd party
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from domdf_python_tools.paths import PathPlus
+
+# this package
+import sphinxcontrib.extras_require.directive
+from sphinxcontrib.extras_require.directive import add_source_options
+from sphinxcontrib.extras_require.sources import Sources, _optional_argument, sources
+
+
+@pytest.fixture()
+def plugin_dir(tmp_pathplus: PathPlus, monkeypatch: MonkeyPatch) -> PathPlus:
+	dist_info = tmp_pathplus / "my_plugin-1.0.0.dist-info"
+	dist_info.mkdir()
+	(dist_info / "METADATA").write_lines(["Metadata-Version: 2.1", "Name: my-plugin", "Version: 1.0.0"])
+	(dist_info / "entry_points.txt").write_lines([
+			"[sphinxcontrib.extras_require.sources]",
+			"lockfile = my_plugin_module:requirements_from_lockfile",
+			"bad_signature = my_plugin_module:bad_signature",
+			"batch_lockfile = my_plugin_module:batch_requirements_from_lockfile",
+			"flit = my_plugin_module:requirements_from_lockfile",
+			'',
+			"[console_scripts]",
+			"my-plugin = my_plugin_module:main",
+			])
+
+	(tmp_pathplus / "my_plugin_module.py").write_lines([
+			"def requirements_from_lockfile(package_root, options, env, extra):",
+			"\treturn [f'{options[\"lockfile\"]}-{extra}']",
+			'',
+			"def batch_requirements_from_lockfile(package_root, options, env, extras):",
+			"\treturn {extra: [f'batch-{extra}'] for extra in extras}",
+			'',
+			"def bad_signature(extra):",
+			"\treturn []",
+			])
+
+	monkeypatch.syspath_prepend(str(tmp_pathplus))
+	monkeypatch.delitem(sys.modules, "my_plugin_module", raising=False)
+
+	return tmp_pathplus
+
+
+def test_get() -> None:
+	source = sources.get("flit")
+	assert source is not None
+	assert source[0] == "flit"
+	assert sources.get("not-a-source") is None
+
+
+def test_load_entry_points(plugin_dir: PathPlus) -> None:
+	the_sources = Sources(sources)
+	the_sources.load_entry_points(path=[str(plugin_dir)])
+
+	source = the_sources.get("lockfile")
+	assert source is not None
+
+	option_name, getter, validator = source
+	assert option_name == "lockfile"
+	assert validator('') is True
+	assert validator("poetry") == "poetry"
+
+	# Registered sources take precedence.
+	assert the_sources.get("flit") == sources.get("flit")
+
+	# Not loaded until used.
+	assert "my_plugin_module" not in sys.modules
+
+	options: Dict[str, str] = {"lockfile": "poetry"}
+	requirements: List[str] = getter(pathlib.Path('.'), options, None, "docs")
+	assert requirements == ["poetry-docs"]
+	assert "my_plugin_module" in sys.modules
+
+	bad_source = the_sources.get("bad_signature")
+	assert bad_source is not None
+
+	with pytest.raises(SyntaxError, match="The function for the 'bad_signature' source must take only"):
+		bad_source[1](pathlib.Path('.'), {}, None, "docs")
+
+
+def test_load_batch_entry_point(plugin_dir: PathPlus) -> None:
+	the_sources = Sources(sources)
+	the_sources.load_entry_points(path=[str(plugin_dir)])
+
+	source = the_sources.get("batch_lockfile")
+	assert source is not None
+
+	getter = source[1]
+	assert "my_plugin_module" not in sys.modules
+
+	assert getter(pathlib.Path('.'), {}, None, "docs") == ["batch-docs"]
+	assert getattr(getter, "batch")(pathlib.Path('.'), {}, None, ["docs", "test"]) == {
+			"docs": ["batch-docs"],
+			"test": ["batch-test"],
+			}
+
+
+def test_get_after_modification() -> None:
+	the_sources = Sources(sources)
+	flit = the_sources.get("flit")
+	assert flit is not None
+
+	replacement: Tuple[str, Callable, Callable] = ("flit", lambda package_root, options, env, extra: [], flit[2])
+	the_sources.insert(0, replacement)
+	assert the_sources.get("flit") == replacement
+
+	the_sources.remove(replacement)
+	assert the_sources.get("flit") == flit
+
+	the_sources[the_sources.index(flit)] = ("flot", flit[1], flit[2])
+	assert the_sources.get("flit") is None
+	assert the_sources.get("flot") is not None
+
+	the_sources.extend([replacement])
+	assert the_sources.get("flit") == replacement
+
+
+def test_add_source_options(plugin_dir: PathPlus, monkeypatch: MonkeyPatch) -> None:
+	the_sources = Sources(sources)
+	the_sources.load_entry_points(path=[str(plugin_dir)])
+	monkeypatch.setattr(sphinxcontrib.extras_require.directive, "sources", the_sources)
+
+	option_spec: Dict[str, Callable[[str], Any]] = {"flit": str}
+	add_source_options(option_spec)
+
+	# Options which are already defined are kept.
+	assert option_spec["flit"] is str
+	assert option_spec["lockfile"] is _optional_argument
+	assert option_spec["batch_lockfile"] is _optional_argument
@@ -9,7 +9,9 @@ import pytest
 from domdf_python_tools.paths import PathPlus
 
 # this package
-from sphinxcontrib.extras_require.sources import requirements_from___pkginfo__
+from sphinxcontrib.extras_require.cache import clear_caches
+from sphinxcontrib.extras_require.dependencies import record_files
+from sphinxcontrib.extras_require.sources import pkginfo_cache, requirements_from___pkginfo__
 
 
 class MockBuildEnvironment:
@@ -46,6 +48,65 @@ def test_from___pkginfo__(
 			) == expects
 
 
+def test_from___pkginfo___not_executed(tmp_pathplus: PathPlus) -> None:
+	# The import would fail if the file were executed.
+	pkginfo_file = tmp_pathplus / "__pkginfo__.py"
+	pkginfo_file.write_lines([
+			"import a_module_which_does_not_exist",
+			"extras_require = {'extra_c': ['faker', 'pytest']}",
+			])
+
+	with record_files() as recorder:
+		assert requirements_from___pkginfo__(
+				package_root=tmp_pathplus,
+				options={},
+				env=MockBuildEnvironment(tmp_pathplus),
+				extra="extra_c",
+				) == ["faker", "pytest"]
+
+	assert not recorder.volatile
+
+
+def test_from___pkginfo___executed_once(tmp_pathplus: PathPlus) -> None:
+	counter_file = tmp_pathplus / "counter.txt"
+
+	pkginfo_file = tmp_pathplus / "__pkginfo__.py"
+	pkginfo_file.write_lines([
+			f"with open({str(counter_file)!r}, 'a') as fp:",
+			"\tfp.write('x')",
+			"extras_require = {}",
+			"extras_require['extra_c'] = ['faker', 'pytest']",
+			])
+
+	clear_caches()
+
+	for _ in range(3):
+		with record_files() as recorder:
+			assert requirements_from___pkginfo__(
+					package_root=tmp_pathplus,
+					options={},
+					env=MockBuildEnvironment(tmp_pathplus),
+					extra="extra_c",
+					) == ["faker", "pytest"]
+
+		# The module may read other files, so the requirements must not be stored in the index.
+		assert recorder.volatile
+
+	assert counter_file.read_text() == 'x'
+	assert pkginfo_cache.statistics == ("__pkginfo__.py", 2, 1, 1)
+
+	pkginfo_file.write_text(pkginfo_file.read_text().replace("'pytest'", "'tox'"))
+
+	assert requirements_from___pkginfo__(
+			package_root=tmp_pathplus,
+			options={},
+			env=MockBuildEnvironment(tmp_pathplus),
+			extra="extra_c",
+			) == ["faker", "tox"]
+
+	assert counter_file.read_text() == "xx"
+
+
 def test_from___pkginfo___not_found(tmp_pathplus: PathPlus) -> None:
 	with pytest.raises(FileNotFoundError, match="Cannot find __pkginfo__.py in"):
 		requirements_from___pkginfo__(
@@ -56,6 +117,19 @@ def test_from___pkginfo___not_found(tmp_pathplus: PathPlus) -> None:
 				)
 
 
+def test_from___pkginfo___extra_not_found(tmp_pathplus: PathPlus) -> None:
+	pkginfo_file = tmp_pathplus / "__pkginfo__.py"
+	pkginfo_file.write_text("extras_require = {'extra_c': ['faker', 'pytest']}")
+
+	with pytest.raises(ValueError, match="'extra_d' not found in '__pkginfo__.extras_require'"):
+		requirements_from___pkginfo__(
+				package_root=tmp_pathplus,
+				options={},
+				env=MockBuildEnvironment(tmp_pathplus),
+				extra="extra_d",
+				)
+
+
 def test_from___pkginfo___wrong_mime(tmp_pathplus: PathPlus) -> None:
 	pkginfo_file = tmp_pathplus / "__pkginfo__.py"
 	shutil.copy2(PathPlus(__file__).parent / "Example.png", pkginfo_file)
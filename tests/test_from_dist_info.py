@@ -0,0 +1,115 @@
+# stdlib
+import pathlib
+from typing import List, Optional, Union
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from sphinxcontrib.extras_require.cache import clear_caches
+from sphinxcontrib.extras_require.sources import distribution_index, requirements_from_dist_info
+
+
+class MockConfig:
+	pypi_name: Optional[str] = None
+	project: str = "FooBar"
+	extras_require_site_packages = "site-packages"
+
+
+class MockBuildEnvironment:
+
+	def __init__(self, tmpdir: pathlib.Path):
+		self.srcdir = tmpdir / "docs"
+		self.config = MockConfig()
+
+
+@pytest.fixture()
+def site_packages(tmp_pathplus: PathPlus) -> PathPlus:
+	dist_info = tmp_pathplus / "site-packages" / "FooBar-1.2.3.dist-info"
+	dist_info.maybe_make(parents=True)
+	(dist_info / "METADATA").write_lines([
+			"Metadata-Version: 2.1",
+			"Name: FooBar",
+			"Version: 1.2.3",
+			"Requires-Dist: requests>=2.0",
+			'Requires-Dist: sphinx>=3.0; extra == "docs"',
+			'Requires-Dist: sphinx-toolbox; extra == "docs"',
+			'Requires-Dist: importlib-metadata; python_version < "3.8" and extra == "docs"',
+			'Requires-Dist: pytest; extra == "testing" or extra == "dev"',
+			"Provides-Extra: docs",
+			"Provides-Extra: testing",
+			"Provides-Extra: dev",
+			"Provides-Extra: Empty_Extra",
+			'',
+			])
+
+	clear_caches()
+
+	return tmp_pathplus
+
+
+@pytest.mark.parametrize(
+		"name, extra, expects",
+		[
+				pytest.param(
+						True,
+						"docs",
+						['importlib-metadata; python_version < "3.8"', "sphinx>=3.0", "sphinx-toolbox"],
+						id="docs",
+						),
+				pytest.param("foobar", "testing", ['pytest; extra == "testing" or extra == "dev"'], id="testing"),
+				pytest.param("FooBar", "dev", ['pytest; extra == "testing" or extra == "dev"'], id="dev"),
+				pytest.param("foo-bar", "empty-extra", [], id="empty"),
+				],
+		)
+def test_from_dist_info(
+		site_packages: PathPlus,
+		name: Union[str, bool],
+		extra: str,
+		expects: List[str],
+		) -> None:
+	(site_packages / "site-packages" / "foo_bar-0.1.0.dist-info").mkdir()
+	(site_packages / "site-packages" / "foo_bar-0.1.0.dist-info" / "METADATA").write_lines([
+			"Metadata-Version: 2.1",
+			"Name: foo-bar",
+			"Version: 0.1.0",
+			"Provides-Extra: empty-extra",
+			])
+
+	assert requirements_from_dist_info(
+			package_root=site_packages,
+			options={"dist-info": name},
+			env=MockBuildEnvironment(site_packages),
+			extra=extra,
+			) == expects
+
+
+def test_from_dist_info_index(site_packages: PathPlus) -> None:
+	for extra in ["docs", "testing", "dev"]:
+		requirements_from_dist_info(
+				package_root=site_packages,
+				options={"dist-info": "FooBar"},
+				env=MockBuildEnvironment(site_packages),
+				extra=extra,
+				)
+
+	assert distribution_index.statistics == ("dist-info", 2, 1, 1)
+
+
+def test_from_dist_info_errors(site_packages: PathPlus) -> None:
+	with pytest.raises(ValueError, match="'extra' not found in the 'Provides-Extra' metadata for 'FooBar'"):
+		requirements_from_dist_info(
+				package_root=site_packages,
+				options={"dist-info": "FooBar"},
+				env=MockBuildEnvironment(site_packages),
+				extra="extra",
+				)
+
+	with pytest.raises(FileNotFoundError, match="Cannot find an installed distribution named 'Baz'"):
+		requirements_from_dist_info(
+				package_root=site_packages,
+				options={"dist-info": "Baz"},
+				env=MockBuildEnvironment(site_packages),
+				extra="extra",
+				)
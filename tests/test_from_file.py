@@ -8,7 +8,8 @@ from domdf_python_tools.compat import nullcontext
 from domdf_python_tools.paths import PathPlus
 
 # this package
-from sphinxcontrib.extras_require.sources import requirements_from_file
+from sphinxcontrib.extras_require.cache import clear_caches
+from sphinxcontrib.extras_require.sources import requirements_file_cache, requirements_from_file
 
 
 @pytest.mark.parametrize(
@@ -74,3 +75,21 @@ def test_from_file_errors(tmp_pathplus: PathPlus) -> None:
 				env=None,
 				extra="extra",
 				)
+
+
+def test_from_file_cached(tmp_pathplus: PathPlus) -> None:
+	# The extension is not used to determine whether the file is text.
+	requirements_file = tmp_pathplus / "requirements.in"
+	requirements_file.write_lines(["pytest", "faker", "pytest>=6.0.0"])
+
+	clear_caches()
+
+	for _ in range(3):
+		assert requirements_from_file(
+				package_root=tmp_pathplus,
+				options={"file": "requirements.in"},
+				env=None,
+				extra="extra",
+				) == ["faker", "pytest>=6.0.0"]
+
+	assert requirements_file_cache.statistics == ("requirements file", 2, 1, 1)
@@ -0,0 +1,95 @@
+# stdlib
+import io
+import pathlib
+import tarfile
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from sphinxcontrib.extras_require.cache import clear_caches
+from sphinxcontrib.extras_require.sources import requirements_from_sdist, sdist_cache
+
+
+class MockBuildEnvironment:
+
+	def __init__(self, tmpdir: pathlib.Path):
+		self.srcdir = tmpdir / "docs"
+
+
+PKG_INFO = '\n'.join([
+		"Metadata-Version: 2.2",
+		"Name: FooBar",
+		"Version: 1.2.3",
+		"Requires-Dist: requests>=2.0",
+		'Requires-Dist: sphinx>=3.0; extra == "docs"',
+		'Requires-Dist: pytest; extra == "testing"',
+		"Provides-Extra: docs",
+		"Provides-Extra: testing",
+		'',
+		])
+
+
+def _add_file(tar: tarfile.TarFile, name: str, content: bytes) -> None:
+	info = tarfile.TarInfo(name)
+	info.size = len(content)
+	tar.addfile(info, io.BytesIO(content))
+
+
+@pytest.fixture()
+def sdist(tmp_pathplus: PathPlus) -> PathPlus:
+	(tmp_pathplus / "dist").mkdir()
+	sdist_file = tmp_pathplus / "dist" / "FooBar-1.2.3.tar.gz"
+
+	with tarfile.open(sdist_file, "w:gz") as tar:
+		_add_file(tar, "FooBar-1.2.3/foobar/PKG-INFO", b"Name: NotThisOne")
+		_add_file(tar, "FooBar-1.2.3/PKG-INFO", PKG_INFO.encode("UTF-8"))
+		_add_file(tar, "FooBar-1.2.3/foobar/__init__.py", b"print('hello world')")
+
+	clear_caches()
+
+	return sdist_file
+
+
+def test_from_sdist(tmp_pathplus: PathPlus, sdist: PathPlus) -> None:
+	for _ in range(3):
+		assert requirements_from_sdist(
+				package_root=tmp_pathplus,
+				options={"sdist": "dist/*.tar.gz"},
+				env=MockBuildEnvironment(tmp_pathplus),
+				extra="docs",
+				) == ["sphinx>=3.0"]
+
+	assert sdist_cache.statistics == ("sdist", 2, 1, 1)
+
+
+def test_from_sdist_errors(tmp_pathplus: PathPlus, sdist: PathPlus) -> None:
+	with pytest.raises(ValueError, match="'extra' not found in the 'Provides-Extra' metadata of 'FooBar-1.2.3.tar.gz'"):
+		requirements_from_sdist(
+				package_root=tmp_pathplus,
+				options={"sdist": "dist/*.tar.gz"},
+				env=MockBuildEnvironment(tmp_pathplus),
+				extra="extra",
+				)
+
+	with tarfile.open(tmp_pathplus / "dist" / "no_pkg_info.tar.gz", "w:gz") as tar:
+		_add_file(tar, "FooBar-1.2.3/setup.py", b"print('hello world')")
+
+	with pytest.raises(ValueError, match="Cannot find the PKG-INFO file in '.*no_pkg_info.tar.gz'"):
+		requirements_from_sdist(
+				package_root=tmp_pathplus,
+				options={"sdist": "dist/no_pkg_info.tar.gz"},
+				env=MockBuildEnvironment(tmp_pathplus),
+				extra="extra",
+				)
+
+	(tmp_pathplus / "dist" / "invalid.tar.gz").write_text("Not a tar file")
+
+	with pytest.raises(ValueError, match="'.*invalid.tar.gz' is not a valid sdist"):
+		requirements_from_sdist(
+				package_root=tmp_pathplus,
+				options={"sdist": "dist/invalid.tar.gz"},
+				env=MockBuildEnvironment(tmp_pathplus),
+				extra="extra",
+				)
@@ -7,7 +7,9 @@ import pytest
 from domdf_python_tools.paths import PathPlus
 
 # this package
-from sphinxcontrib.extras_require.sources import requirements_from_setup_cfg
+from sphinxcontrib.extras_require.cache import clear_caches
+from sphinxcontrib.extras_require.dependencies import record_files
+from sphinxcontrib.extras_require.sources import requirements_from_setup_cfg, setup_cfg_cache
 
 
 class MockBuildEnvironment:
@@ -30,6 +32,17 @@ extra_c =
 						"extra_c",
 						["faker", "pytest", "tox; python<=3.6"],
 						),
+				(
+						"""\
+Extra_C =
+    # a comment
+    faker
+
+    pytest
+""",
+						"Extra_C",
+						["faker", "pytest"],
+						),
 				],
 		)
 def test_from_setup_cfg(
@@ -102,3 +115,51 @@ author = Joe Bloggs
 				env=MockBuildEnvironment(tmp_pathplus),
 				extra="docs",
 				)
+
+
+def test_from_setup_cfg_cached(tmp_pathplus: PathPlus) -> None:
+	setup_cfg_file = tmp_pathplus / "setup.cfg"
+	setup_cfg_file.write_text("""\
+[options.extras_require]
+extra_c = faker; pytest; tox
+""")
+
+	clear_caches()
+
+	for _ in range(3):
+		with record_files() as recorder:
+			assert requirements_from_setup_cfg(
+					package_root=PathPlus(),
+					options={},
+					env=MockBuildEnvironment(tmp_pathplus),
+					extra="extra_c",
+					) == ["faker", "pytest", "tox"]
+
+		assert not recorder.volatile
+
+	assert setup_cfg_cache.statistics == ("setup.cfg", 2, 1, 1)
+
+
+def test_from_setup_cfg_file_directive(tmp_pathplus: PathPlus) -> None:
+	(tmp_pathplus / "requirements-docs.txt").write_lines(["sphinx", "sphinx-toolbox"])
+
+	setup_cfg_file = tmp_pathplus / "setup.cfg"
+	setup_cfg_file.write_text("""\
+[options.extras_require]
+docs = file: requirements-docs.txt
+""")
+
+	clear_caches()
+
+	# The requirements file is not recorded, so the requirements must not be stored in the index,
+	# including when they come from the cache.
+	for _ in range(2):
+		with record_files() as recorder:
+			assert requirements_from_setup_cfg(
+					package_root=PathPlus(),
+					options={},
+					env=MockBuildEnvironment(tmp_pathplus),
+					extra="docs",
+					) == ["sphinx", "sphinx-toolbox"]
+
+		assert recorder.volatile
@@ -0,0 +1,94 @@
+# stdlib
+import pathlib
+import zipfile
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from sphinxcontrib.extras_require.cache import clear_caches
+from sphinxcontrib.extras_require.sources import requirements_from_wheel, wheel_cache
+
+
+class MockBuildEnvironment:
+
+	def __init__(self, tmpdir: pathlib.Path):
+		self.srcdir = tmpdir / "docs"
+
+
+METADATA = '\n'.join([
+		"Metadata-Version: 2.1",
+		"Name: FooBar",
+		"Version: 1.2.3",
+		"Requires-Dist: requests>=2.0",
+		'Requires-Dist: sphinx>=3.0; extra == "docs"',
+		'Requires-Dist: importlib-metadata; python_version < "3.8" and extra == "docs"',
+		'Requires-Dist: pytest; extra == "testing"',
+		"Provides-Extra: docs",
+		"Provides-Extra: testing",
+		'',
+		"A long description.",
+		])
+
+
+@pytest.fixture()
+def wheel(tmp_pathplus: PathPlus) -> PathPlus:
+	(tmp_pathplus / "dist").mkdir()
+	wheel_file = tmp_pathplus / "dist" / "FooBar-1.2.3-py3-none-any.whl"
+
+	with zipfile.ZipFile(wheel_file, 'w') as zip_file:
+		zip_file.writestr("foobar/__init__.py", "print('hello world')")
+		zip_file.writestr("FooBar-1.2.3.dist-info/METADATA", METADATA)
+		zip_file.writestr("FooBar-1.2.3.dist-info/WHEEL", "Wheel-Version: 1.0")
+
+	clear_caches()
+
+	return wheel_file
+
+
+def test_from_wheel(tmp_pathplus: PathPlus, wheel: PathPlus) -> None:
+	for _ in range(3):
+		assert requirements_from_wheel(
+				package_root=tmp_pathplus,
+				options={"wheel": "dist/*.whl"},
+				env=MockBuildEnvironment(tmp_pathplus),
+				extra="docs",
+				) == ['importlib-metadata; python_version < "3.8"', "sphinx>=3.0"]
+
+	assert requirements_from_wheel(
+			package_root=tmp_pathplus,
+			options={"wheel": "dist/FooBar-1.2.3-py3-none-any.whl"},
+			env=MockBuildEnvironment(tmp_pathplus),
+			extra="testing",
+			) == ["pytest"]
+
+	assert wheel_cache.statistics == ("wheel", 3, 1, 1)
+
+
+def test_from_wheel_errors(tmp_pathplus: PathPlus, wheel: PathPlus) -> None:
+	with pytest.raises(ValueError, match="'extra' not found in the 'Provides-Extra' metadata of 'FooBar-1.2.3-py3-none-any.whl'"):
+		requirements_from_wheel(
+				package_root=tmp_pathplus,
+				options={"wheel": "dist/*.whl"},
+				env=MockBuildEnvironment(tmp_pathplus),
+				extra="extra",
+				)
+
+	with pytest.raises(FileNotFoundError, match="Cannot find 'dist/\\*.tar.gz' in"):
+		requirements_from_wheel(
+				package_root=tmp_pathplus,
+				options={"wheel": "dist/*.tar.gz"},
+				env=MockBuildEnvironment(tmp_pathplus),
+				extra="extra",
+				)
+
+	(tmp_pathplus / "dist" / "invalid.whl").write_text("Not a zip file")
+
+	with pytest.raises(ValueError, match="'.*invalid.whl' is not a valid wheel"):
+		requirements_from_wheel(
+				package_root=tmp_pathplus,
+				options={"wheel": "dist/invalid.whl"},
+				env=MockBuildEnvironment(tmp_pathplus),
+				extra="extra",
+				)
@@ -0,0 +1,70 @@
+# stdlib
+import subprocess
+import sys
+from typing import Dict, Tuple
+
+# 3rd party
+import pytest
+
+# These are only needed once a source is used, so must not be imported with the extension.
+LAZY_MODULES = [
+		"dom_toml",
+		"packaging.markers",
+		"packaging.requirements",
+		"setuptools",
+		"shippinglabel",
+		"shippinglabel.requirements",
+		"tarfile",
+		]
+
+# The most time (in microseconds) the extension's own imports may add. About 10ms at present.
+MAX_IMPORT_TIME = 30_000
+
+
+def _import_times(statement: str) -> Dict[str, int]:
+	"""
+	Returns a mapping of module names to their own import times (in microseconds) for the given statement,
+	excluding the time taken to import their dependencies.
+	"""
+
+	process = subprocess.run(
+			[sys.executable, "-X", "importtime", "-c", statement],
+			stderr=subprocess.PIPE,
+			check=True,
+			)
+
+	times = {}
+
+	for line in process.stderr.decode("UTF-8").splitlines():
+		if not line.startswith("import time:") or "cumulative" in line:
+			continue
+
+		self_time, _, module = line[len("import time:"):].split('|')
+		times[module.strip()] = int(self_time)
+
+	return times
+
+
+@pytest.fixture(scope="module")
+def import_times() -> Tuple[Dict[str, int], Dict[str, int]]:
+	# Anything imported anyway by Sphinx, sphinx-toolbox or the interpreter's site-packages is excluded.
+	baseline = _import_times("import sphinx.application, sphinx.util.docutils, sphinx_toolbox.utils")
+	times = _import_times("import sphinxcontrib.extras_require")
+	return baseline, times
+
+
+@pytest.mark.parametrize("module", LAZY_MODULES)
+def test_lazy_imports(import_times: Tuple[Dict[str, int], Dict[str, int]], module: str) -> None:
+	baseline, times = import_times
+
+	if module in baseline:
+		pytest.skip(f"{module!r} is already imported by Sphinx")
+
+	assert module not in times
+
+
+def test_import_time(import_times: Tuple[Dict[str, int], Dict[str, int]]) -> None:
+	baseline, times = import_times
+
+	added_time = sum(time for module, time in times.items() if module not in baseline)
+	assert added_time < MAX_IMPORT_TIME
@@ -0,0 +1,147 @@
+# stdlib
+import json
+import os
+from typing import List
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+from sphinx.application import Sphinx
+from sphinx.util.docutils import docutils_namespace
+
+# this package
+from sphinxcontrib.extras_require.__main__ import main
+from sphinxcontrib.extras_require.cache import file_digest
+from sphinxcontrib.extras_require.manifest import build_manifest
+from sphinxcontrib.extras_require.sources import manifest_digest_cache, pyproject_cache, setup_cfg_cache
+
+
+@pytest.fixture()
+def project(tmp_pathplus: PathPlus) -> PathPlus:
+	(tmp_pathplus / "pyproject.toml").write_lines([
+			"[project.optional-dependencies]",
+			'test = ["pytest-cov", "pytest>=6"]',
+			'doc = ["Sphinx>=3.4"]',
+			])
+	(tmp_pathplus / "setup.cfg").write_lines([
+			"[options.extras_require]",
+			"cli = click",
+			])
+	(tmp_pathplus / "requirements.txt").write_lines(["toml", "attrs>=20"])
+
+	return tmp_pathplus
+
+
+def test_build_manifest(project: PathPlus) -> None:
+	manifest = build_manifest(project, ["requirements.txt"])
+
+	assert manifest == {
+			"version": 1,
+			"sources": {
+					"pyproject": {
+							"files": {"pyproject.toml": file_digest(project / "pyproject.toml")},
+							"extras": {"test": ["pytest>=6", "pytest-cov"], "doc": ["sphinx>=3.4"]},
+							},
+					"setup.cfg": {
+							"files": {"setup.cfg": file_digest(project / "setup.cfg")},
+							"extras": {"cli": ["click"]},
+							},
+					"requirements.txt": {
+							"files": {"requirements.txt": file_digest(project / "requirements.txt")},
+							"requirements": ["attrs>=20", "toml"],
+							},
+					},
+			}
+
+
+def test_build_manifest_invalid(project: PathPlus) -> None:
+	(project / "setup.cfg").write_lines(["[options.extras_require]", "cli = click!!"])
+
+	with pytest.raises(ValueError, match="Invalid requirement 'click!!'"):
+		build_manifest(project)
+
+
+def build(project: PathPlus) -> str:
+	with docutils_namespace():
+		app = Sphinx(
+				srcdir=os.fspath(project / "doc-source"),
+				confdir=os.fspath(project / "doc-source"),
+				outdir=os.fspath(project / "build"),
+				doctreedir=os.fspath(project / "build" / ".doctrees"),
+				buildername="html",
+				status=None,
+				warning=None,
+				)
+		app.build()
+
+	return (project / "build" / "index.html").read_text()
+
+
+def test_manifest_source(project: PathPlus, capsys: pytest.CaptureFixture[str]) -> None:
+	doc_source = project / "doc-source"
+	doc_source.mkdir()
+	(doc_source / "conf.py").write_lines([
+			'extensions = ["sphinxcontrib.extras_require"]',
+			'package_root = "."',
+			'project = "FooBar"',
+			'extras_require_manifest = "build/extras.json"',
+			])
+	(doc_source / "index.rst").write_lines([
+			"Index",
+			"=====",
+			'',
+			".. extras-require:: test",
+			"\t:manifest: pyproject",
+			'',
+			".. extras-require:: cli",
+			"\t:manifest: setup.cfg",
+			'',
+			".. extras-require:: docs",
+			"\t:manifest: requirements.txt",
+			'',
+			".. extras-require-table::",
+			"\t:manifest: pyproject",
+			])
+
+	argv: List[str] = ["build-manifest", project.as_posix(), "-o", (project / "build" / "extras.json").as_posix()]
+	assert main([*argv, "-r", "requirements.txt"]) == 0
+	assert "Wrote 3 extra(s) from 3 source(s)" in capsys.readouterr().err
+	assert json.loads((project / "build" / "extras.json").read_text())["version"] == 1
+
+	output = build(project)
+	assert "pytest&gt;=6" in output
+	assert "click" in output
+	assert "attrs&gt;=20" in output
+	assert "sphinx&gt;=3.4" in output
+
+	# The metadata files are not parsed.
+	assert pyproject_cache.statistics.misses == 0
+	assert setup_cfg_cache.statistics.misses == 0
+
+	# Each file the manifest was built from is only hashed once.
+	assert manifest_digest_cache.statistics == ("manifest sources", 2, 3, 3)
+
+	# The manifest is no longer up to date.
+	(project / "pyproject.toml").write_lines(["[project.optional-dependencies]", 'test = ["pytest>=7"]'])
+
+	with pytest.raises(ValueError, match="The extras manifest '.*' is out of date, as 'pyproject.toml' has changed."):
+		build(project)
+
+	assert main([*argv, "-r", "requirements.txt"]) == 0
+	assert "Wrote 2 extra(s) from 3 source(s)" in capsys.readouterr().err
+	assert "pytest&gt;=7" in build(project)
+
+
+def test_manifest_source_errors(project: PathPlus) -> None:
+	doc_source = project / "doc-source"
+	doc_source.mkdir()
+	(doc_source / "conf.py").write_lines(['extensions = ["sphinxcontrib.extras_require"]', 'package_root = "."'])
+	(doc_source / "index.rst").write_lines(["Index", "=====", '', ".. extras-require:: test", "\t:manifest:"])
+
+	with pytest.raises(FileNotFoundError, match="Cannot find the extras manifest"):
+		build(project)
+
+	assert main(["build-manifest", project.as_posix()]) == 0
+
+	with pytest.raises(ValueError, match="Please give the name of a source in 'extras-manifest.json': 'pyproject', 'setup.cfg'"):
+		build(project)
@@ -0,0 +1,123 @@
+# stdlib
+import json
+import os
+import pickle
+
+# 3rd party
+from docutils import nodes
+from domdf_python_tools.paths import PathPlus
+from sphinx.application import Sphinx
+from sphinx.util.docutils import docutils_namespace
+
+# this package
+from sphinxcontrib.extras_require.cache import notice_cache
+from sphinxcontrib.extras_require.notice import expand_notice, extras_require
+
+
+def test_expand_notice() -> None:
+	notice_cache.clear()
+
+	node = extras_require(
+			requirements=["pytest>=2.7.3", "pytest-cov"],
+			package_name="FooBar",
+			extra="test",
+			scope="module",
+			prompt_html='<div class="highlight"><pre><span class="prompt1">python -m pip install FooBar[test]</span></pre></div>',
+			prompt_latex="\\begin{Verbatim}\n$ python -m pip install FooBar[test]\n\\end{Verbatim}",
+			ids=["extras_require-0"],
+			)
+	node.source, node.line = "index.rst", 3
+
+	notice = expand_notice(node)
+	assert isinstance(notice, nodes.attention)
+	assert notice["ids"] == ["extras_require-0"]
+	assert notice.line == 3
+
+	intro, requirements, outro, prompt = notice.children
+	assert isinstance(requirements, nodes.block_quote)
+	assert isinstance(prompt, nodes.block_quote)
+	assert intro.astext() == "This module has the following additional requirements:"
+	literal = requirements[0]
+	assert isinstance(literal, nodes.literal_block)
+	assert literal.astext() == "pytest>=2.7.3\npytest-cov"
+	assert literal["language"] == "text"
+	assert outro.astext() == "These can be installed as follows:"
+
+	html, latex = prompt.children
+	assert isinstance(html, nodes.raw)
+	assert html["format"] == "html"
+	assert '<span class="prompt1">python' in html.astext()
+	assert latex.astext().splitlines()[1] == "$ python -m pip install FooBar[test]"
+
+	assert expand_notice(node) is not notice
+	assert notice_cache.statistics.hits == 1
+
+
+def test_expand_notice_raw_prompt() -> None:
+	node = extras_require(
+			requirements=["sphinx"],
+			package_name="FooBar",
+			extra="doc",
+			scope="class",
+			prompt_html="<pre>html</pre>",
+			prompt_latex="latex",
+			)
+
+	notice = expand_notice(node)
+	assert notice[0].astext() == "This class has the following additional requirement:"
+	assert notice[2].astext() == "This can be installed as follows:"
+	assert isinstance(notice[3], nodes.block_quote)
+	assert [raw.astext() for raw in notice[3]] == ["<pre>html</pre>", "latex"]
+
+
+def test_compact_node_size() -> None:
+	node = extras_require(
+			requirements=["pytest>=2.7.3", "pytest-cov"],
+			package_name="FooBar",
+			extra="test",
+			scope="module",
+			prompt_html="<pre>html</pre>",
+			prompt_latex="latex",
+			)
+
+	assert len(pickle.dumps(node)) < len(pickle.dumps(expand_notice(node)))
+
+
+def test_search_index(tmp_pathplus: PathPlus) -> None:
+	doc_source = tmp_pathplus / "doc-source"
+	doc_source.mkdir()
+	(doc_source / "conf.py").write_lines([
+			'extensions = ["sphinxcontrib.extras_require"]',
+			'package_root = "."',
+			'project = "FooBar"',
+			])
+	(doc_source / "index.rst").write_lines([
+			"Index",
+			"=====",
+			'',
+			".. extras-require:: webserver",
+			'',
+			"\tflask>=1.1.2",
+			])
+
+	with docutils_namespace():
+		app = Sphinx(
+				srcdir=os.fspath(doc_source),
+				confdir=os.fspath(doc_source),
+				outdir=os.fspath(tmp_pathplus / "build"),
+				doctreedir=os.fspath(tmp_pathplus / "build" / ".doctrees"),
+				buildername="html",
+				status=None,
+				warning=None,
+				)
+		app.build()
+
+	searchindex = (tmp_pathplus / "build" / "searchindex.js").read_text()
+	terms = json.loads(searchindex[searchindex.index('(') + 1:searchindex.rindex(')')])["terms"]
+
+	# The terms are stemmed.
+	for term in ("flask", "webserv", "pip", "instal", "addit"):
+		assert term in terms
+
+	# The notice is still shown.
+	assert "flask&gt;=1.1.2" in (tmp_pathplus / "build" / "index.html").read_text()
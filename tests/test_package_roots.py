@@ -0,0 +1,176 @@
+# stdlib
+import os
+from typing import List
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+from sphinx.application import Sphinx
+from sphinx.util.docutils import docutils_namespace
+
+# this package
+from sphinxcontrib.extras_require.prefetch import scan_directives
+from sphinxcontrib.extras_require.sources import package_index, pyproject_cache
+
+
+def write_alpha(repo_root: PathPlus, name: str, mtime: int) -> None:
+	pyproject_file = repo_root / "packages" / "alpha" / "pyproject.toml"
+	pyproject_file.parent.maybe_make(parents=True)
+	pyproject_file.write_lines([
+			"[project]",
+			f'name = "{name}"',
+			'',
+			"[project.optional-dependencies]",
+			'test = ["pytest"]',
+			'docs = ["sphinx"]',
+			])
+	os.utime(pyproject_file, ns=(mtime, mtime))
+
+
+def build(repo_root: PathPlus, deferred: bool = False) -> List[str]:
+	with docutils_namespace():
+		app = Sphinx(
+				srcdir=os.fspath(repo_root / "doc-source"),
+				confdir=os.fspath(repo_root / "doc-source"),
+				outdir=os.fspath(repo_root / "build"),
+				doctreedir=os.fspath(repo_root / "build" / ".doctrees"),
+				buildername="html",
+				status=None,
+				warning=None,
+				confoverrides={"extras_require_deferred": deferred},
+				)
+
+		read: List[str] = []
+		app.connect("env-before-read-docs", lambda app, env, docnames: read.extend(docnames))
+		app.build()
+
+	return sorted(read)
+
+
+@pytest.fixture()
+def monorepo(tmp_pathplus: PathPlus) -> PathPlus:
+	doc_source = tmp_pathplus / "doc-source"
+	doc_source.mkdir()
+	(doc_source / "conf.py").write_lines([
+			'extensions = ["sphinxcontrib.extras_require"]',
+			'project = "Monorepo"',
+			'package_roots = {"alpha": "packages/alpha", "beta": "packages/beta", "gamma": "packages/gamma"}',
+			])
+	(doc_source / "index.rst").write_lines([
+			"Index",
+			"=====",
+			'',
+			".. toctree::",
+			'',
+			"\talpha",
+			"\tbeta",
+			])
+	(doc_source / "alpha.rst").write_lines([
+			"Alpha",
+			"=====",
+			'',
+			".. extras-require:: test",
+			"\t:pyproject:",
+			"\t:package: alpha",
+			'',
+			".. extras-require-table::",
+			"\t:pyproject:",
+			"\t:package: alpha",
+			])
+	(doc_source / "beta.rst").write_lines([
+			"Beta",
+			"====",
+			'',
+			".. extras-require:: docs",
+			"\t:package: beta",
+			"\t:setup.cfg:",
+			'',
+			".. extras-require:: test",
+			"\t:package: gamma",
+			"\t:file: requirements.txt",
+			])
+
+	write_alpha(tmp_pathplus, "alpha-dist", 1_600_000_000_000_000_000)
+
+	beta = tmp_pathplus / "packages" / "beta"
+	beta.mkdir()
+	(beta / "setup.cfg").write_lines([
+			"[metadata]",
+			"name = beta-dist",
+			'',
+			"[options.extras_require]",
+			"docs = sphinx-toolbox",
+			])
+
+	gamma = tmp_pathplus / "packages" / "gamma"
+	gamma.mkdir()
+	(gamma / "requirements.txt").write_lines(["coverage"])
+
+	return tmp_pathplus
+
+
+@pytest.mark.parametrize("deferred", [False, True])
+def test_package_roots(monorepo: PathPlus, deferred: bool) -> None:
+	assert build(monorepo, deferred) == ["alpha", "beta", "index"]
+
+	alpha = (monorepo / "build" / "alpha.html").read_text()
+	assert "alpha-dist<span" in alpha
+	assert "python -m pip install alpha-dist[docs]" in alpha.replace('</span> <span class="pre">', ' ')
+	assert "Monorepo<span" not in alpha
+
+	beta = (monorepo / "build" / "beta.html").read_text()
+	assert "beta-dist<span" in beta
+	assert "sphinx-toolbox" in beta
+
+	# No name in the metadata, so the key is used.
+	assert "gamma<span" in beta
+	assert "coverage" in beta
+
+	# Each root's metadata is only read once.
+	assert pyproject_cache.statistics.misses == 1
+	assert package_index.statistics.misses == 3
+
+
+def test_package_roots_incremental(monorepo: PathPlus) -> None:
+	mtime = 1_600_000_000_000_000_000
+	assert build(monorepo) == ["alpha", "beta", "index"]
+
+	# The file is touched, but nothing changes.
+	write_alpha(monorepo, "alpha-dist", mtime * 2)
+	assert build(monorepo) == []
+
+	# Only the name changes.
+	write_alpha(monorepo, "alpha-renamed", mtime * 3)
+	assert build(monorepo) == ["alpha"]
+	assert "alpha-renamed<span" in (monorepo / "build" / "alpha.html").read_text()
+
+
+def test_unknown_package(monorepo: PathPlus) -> None:
+	(monorepo / "doc-source" / "beta.rst").write_lines([
+			"Beta",
+			"====",
+			'',
+			".. extras-require:: docs",
+			"\t:package: delta",
+			"\t:setup.cfg:",
+			])
+
+	with pytest.raises(ValueError, match="Unknown package 'delta'. Please add it to 'package_roots' in conf.py"):
+		build(monorepo)
+
+
+def test_scan_package_option() -> None:
+	source = [
+			".. extras-require:: test",
+			"\t:setup.cfg:",
+			"\t:package: alpha",
+			'',
+			".. extras-require:: docs",
+			"\t:package: beta",
+			"\t:pyproject:",
+			]
+
+	assert list(scan_directives(line + '\n' for line in source)) == [
+			("test", {"setup.cfg": True, "package": "alpha"}),
+			("docs", {"pyproject": True, "package": "beta"}),
+			]
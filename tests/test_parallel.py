@@ -0,0 +1,162 @@
+# stdlib
+import os
+import pickle
+import time
+from typing import Dict, List, Optional
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+from sphinx.application import Sphinx
+from sphinx.util.docutils import docutils_namespace
+from sphinx.util.parallel import parallel_available
+
+# this package
+from sphinxcontrib.extras_require.dependencies import get_dependencies
+from sphinxcontrib.extras_require.purger import extras_require_purger
+
+N_DOCUMENTS = 48
+EXTRAS = ("test", "doc", "all")
+
+# The benchmark is slow, and its timings depend on the machine, so it only runs when this is set.
+BENCHMARK = bool(os.environ.get("EXTRAS_REQUIRE_BENCHMARK"))
+BENCHMARK_DOCUMENTS = 2000
+BENCHMARK_JOBS = (1, 2, 4, 8)
+
+# The minimum read-phase speedup at -j N, as a proportion of N, while N does not exceed the number of CPUs.
+MIN_EFFICIENCY = 0.5
+
+
+def make_project(repo_root: PathPlus, n_documents: int) -> PathPlus:
+	doc_source = repo_root / "doc-source"
+	doc_source.mkdir()
+
+	(repo_root / "pyproject.toml").write_lines([
+			"[project.optional-dependencies]",
+			'test = ["pytest", "pytest-cov"]',
+			'doc = ["sphinx>=3.4"]',
+			'all = ["pytest", "pytest-cov", "sphinx>=3.4"]',
+			])
+
+	(doc_source / "conf.py").write_lines([
+			'extensions = ["sphinxcontrib.extras_require"]',
+			'package_root = "."',
+			'project = "FooBar"',
+			# Otherwise every page lists every document, and writing the benchmark project takes quadratic time.
+			'html_sidebars = {"**": []}',
+			])
+
+	(doc_source / "index.rst").write_lines([
+			"Index",
+			"=====",
+			'',
+			".. toctree::",
+			'',
+			*(f"\tdocument_{idx}" for idx in range(n_documents)),
+			])
+
+	for idx in range(n_documents):
+		(doc_source / f"document_{idx}.rst").write_lines([
+				f"Document {idx}",
+				"=" * 20,
+				'',
+				f".. extras-require:: {EXTRAS[idx % 3]}",
+				"\t:pyproject:",
+				'',
+				f".. extras-require:: {EXTRAS[(idx + 1) % 3]}",
+				"\t:pyproject:",
+				"\t:scope: function",
+				])
+
+	return repo_root
+
+
+@pytest.fixture(scope="module")
+def project(tmp_path_factory: pytest.TempPathFactory) -> PathPlus:
+	return make_project(PathPlus(tmp_path_factory.mktemp("parallel")), N_DOCUMENTS)
+
+
+def build(repo_root: PathPlus, parallel: int, timings: Optional[List[float]] = None) -> PathPlus:
+	outdir = repo_root / f"build-{parallel}"
+
+	with docutils_namespace():
+		app = Sphinx(
+				srcdir=os.fspath(repo_root / "doc-source"),
+				confdir=os.fspath(repo_root / "doc-source"),
+				outdir=os.fspath(outdir),
+				doctreedir=os.fspath(outdir / ".doctrees"),
+				buildername="html",
+				status=None,
+				warning=None,
+				parallel=parallel,
+				)
+
+		if timings is not None:
+			# The read phase, from env-before-read-docs until env-updated, including merging the environments.
+			start = 0.0
+
+			def start_timer(*args: object) -> None:
+				nonlocal start
+				start = time.perf_counter()
+
+			app.connect("env-before-read-docs", start_timer, priority=0)
+			app.connect("env-updated", lambda *args: timings.append(time.perf_counter() - start), priority=0)
+
+		app.build()
+
+	return outdir
+
+
+def read_output(outdir: PathPlus) -> Dict[str, str]:
+	return {
+			filename.name: filename.read_text().replace(outdir.name, "build")
+			for filename in sorted(outdir.glob("document_*.html"))
+			}
+
+
+@pytest.mark.skipif(not parallel_available, reason="Parallel builds are not available on this platform.")
+def test_parallel_read(project: PathPlus) -> None:
+	serial = build(project, 1)
+	expected_output = read_output(serial)
+	assert len(expected_output) == N_DOCUMENTS
+
+	with open(serial / ".doctrees" / "environment.pickle", "rb") as fp:
+		expected_env = pickle.load(fp)
+
+	for parallel in (2, 4):
+		outdir = build(project, parallel)
+		assert read_output(outdir) == expected_output
+
+		with open(outdir / ".doctrees" / "environment.pickle", "rb") as fp:
+			env = pickle.load(fp)
+
+		assert extras_require_purger.get_records(env) == extras_require_purger.get_records(expected_env)
+
+		dependencies = get_dependencies(env)
+		assert sorted(dependencies) == sorted(f"document_{idx}" for idx in range(N_DOCUMENTS))
+		for docname, record in get_dependencies(expected_env).items():
+			assert dependencies[docname].files == record.files
+			assert dependencies[docname].digests == record.digests
+
+
+@pytest.mark.skipif(not BENCHMARK, reason="Set EXTRAS_REQUIRE_BENCHMARK=1 to run the benchmark.")
+@pytest.mark.skipif(not parallel_available, reason="Parallel builds are not available on this platform.")
+@pytest.mark.timeout(3600)
+def test_parallel_read_benchmark(tmp_pathplus: PathPlus) -> None:
+	make_project(tmp_pathplus, BENCHMARK_DOCUMENTS)
+	n_cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+	timings: List[float] = []
+	expected_output = read_output(build(tmp_pathplus, BENCHMARK_JOBS[0], timings))
+	assert len(expected_output) == BENCHMARK_DOCUMENTS
+
+	for parallel in BENCHMARK_JOBS[1:]:
+		assert read_output(build(tmp_pathplus, parallel, timings)) == expected_output
+
+	print(f"\nRead phase for {BENCHMARK_DOCUMENTS} documents on {n_cpus} CPU(s):")
+	for parallel, duration in zip(BENCHMARK_JOBS, timings):
+		print(f"  -j {parallel}: {duration:.2f}s ({timings[0] / duration:.2f}x)")
+
+	for parallel, duration in zip(BENCHMARK_JOBS, timings):
+		if parallel <= n_cpus:
+			assert timings[0] / duration >= parallel * MIN_EFFICIENCY
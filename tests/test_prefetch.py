@@ -0,0 +1,91 @@
+# stdlib
+import os
+from typing import List
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+from sphinx.application import Sphinx
+from sphinx.util.docutils import docutils_namespace
+
+# this package
+from sphinxcontrib.extras_require.prefetch import scan_directives
+from sphinxcontrib.extras_require.sources import setup_cfg_cache
+
+
+def test_scan_directives() -> None:
+	source = [
+			"Title",
+			"=====",
+			'',
+			".. extras-require:: test",
+			"\t:setup.cfg:",
+			"\t:scope: class",
+			'',
+			"    .. extras-require:: docs",
+			"        :file: requirements.txt",
+			'',
+			".. extras-require:: manual",
+			'',
+			"\tfoo",
+			'',
+			".. extras-require:: invalid",
+			"\t:setup.cfg: not allowed",
+			'',
+			".. extras-require:: outdented",
+			":flit:",
+			]
+
+	assert list(scan_directives(line + '\n' for line in source)) == [
+			("test", {"setup.cfg": True}),
+			("docs", {"file": "requirements.txt"}),
+			]
+
+
+def test_prefetch(tmp_pathplus: PathPlus) -> None:
+	doc_source = tmp_pathplus / "doc-source"
+	doc_source.mkdir()
+	(doc_source / "conf.py").write_lines([
+			'extensions = ["sphinxcontrib.extras_require"]',
+			'package_root = "."',
+			'project = "FooBar"',
+			"extras_require_prefetch = True",
+			])
+	(doc_source / "index.rst").write_lines([
+			"Index",
+			"=====",
+			'',
+			".. extras-require:: test",
+			"\t:setup.cfg:",
+			'',
+			".. extras-require:: docs",
+			"\t:setup.cfg:",
+			])
+	(tmp_pathplus / "setup.cfg").write_lines([
+			"[options.extras_require]",
+			"test = pytest",
+			"docs = sphinx",
+			])
+
+	read: List[int] = []
+
+	with docutils_namespace():
+		app = Sphinx(
+				srcdir=os.fspath(doc_source),
+				confdir=os.fspath(doc_source),
+				outdir=os.fspath(tmp_pathplus / "build"),
+				doctreedir=os.fspath(tmp_pathplus / "build" / ".doctrees"),
+				buildername="html",
+				status=None,
+				warning=None,
+				)
+
+		# The file has been parsed before the document is read.
+		app.connect("source-read", lambda app, docname, source: read.append(setup_cfg_cache.statistics.misses))
+		app.build()
+
+	assert read == [1]
+	assert setup_cfg_cache.statistics.misses == 1
+
+	output = (tmp_pathplus / "build" / "index.html").read_text()
+	assert "pytest" in output
+	assert "sphinx" in output
@@ -0,0 +1,95 @@
+# stdlib
+from types import SimpleNamespace
+
+# 3rd party
+from docutils import nodes
+
+# this package
+from sphinxcontrib.extras_require.notice import expand_notice, extras_require, pending_extras_require
+from sphinxcontrib.extras_require.purger import ExtrasRequirePurger, NoticeRecord
+
+
+def make_node(extra: str) -> extras_require:
+	return extras_require(
+			requirements=["pytest", "pytest-cov"],
+			package_name="FooBar",
+			extra=extra,
+			scope="module",
+			prompt_html="<pre>$ python -m pip install FooBar</pre>",
+			prompt_latex='',
+			)
+
+
+def test_add_and_purge() -> None:
+	purger = ExtrasRequirePurger("extras_require_records")
+	env = SimpleNamespace(docname="index")
+
+	purger.add_node(env, make_node("test"), nodes.target('', '', ids=["extras_require-0"]), 3)  # type: ignore[arg-type]
+	env.docname = "usage"
+	purger.add_node(env, make_node("doc"), nodes.target('', '', ids=["extras_require-1"]), 7)  # type: ignore[arg-type]
+
+	assert env.extras_require_records == {
+			"index": [NoticeRecord(3, "extras_require-0", "test", ("pytest", "pytest-cov"))],
+			"usage": [NoticeRecord(7, "extras_require-1", "doc", ("pytest", "pytest-cov"))],
+			}
+	assert sorted(purger.get_outdated_docnames(None, env, set(), set(), set())) == ["index", "usage"]  # type: ignore[arg-type]
+
+	purger.purge_nodes(None, env, "index")  # type: ignore[arg-type]
+	assert list(env.extras_require_records) == ["usage"]
+
+	purger.purge_nodes(None, env, "missing")  # type: ignore[arg-type]
+	assert list(env.extras_require_records) == ["usage"]
+
+
+def test_migrate_legacy_list() -> None:
+	purger = ExtrasRequirePurger("extras_require_records", legacy_attr_name="all_extras_requires")
+
+	# The format used by sphinx_toolbox.utils.Purger
+	env = SimpleNamespace(
+			all_extras_requires=[
+					{
+							"docname": "index",
+							"lineno": 3,
+							"installation_node": expand_notice(make_node("test")),
+							"target": nodes.target('', '', ids=["extras_require-0"]),
+							},
+					{
+							"docname": "usage",
+							"lineno": 7,
+							"installation_node": make_node("doc"),
+							"target": nodes.target('', '', ids=["extras_require-1"]),
+							},
+					],
+			)
+
+	purger.purge_nodes(None, env, "usage")  # type: ignore[arg-type]
+
+	assert not hasattr(env, "all_extras_requires")
+	assert env.extras_require_records == {
+			"index": [NoticeRecord(3, "extras_require-0", "test", ("pytest", "pytest-cov"))],
+			}
+
+
+def test_add_pending_node() -> None:
+	purger = ExtrasRequirePurger("extras_require_records")
+	env = SimpleNamespace(docname="index")
+
+	node = pending_extras_require(
+			source="pyproject",
+			value=True,
+			package_name="FooBar",
+			extra="test",
+			scope="module",
+			target="extras_require-0",
+			)
+	purger.add_node(env, node, nodes.target('', '', ids=["extras_require-0"]), 3)  # type: ignore[arg-type]
+
+	assert env.extras_require_records == {
+			"index": [NoticeRecord(3, "extras_require-0", "test", None, ("pyproject", True, None))],
+			}
+
+	resolved = node.resolve(["pytest"])
+	assert type(resolved) is extras_require
+	assert resolved.attributes["requirements"] == ["pytest"]
+	assert "source" not in resolved.attributes
+	assert "target" not in resolved.attributes
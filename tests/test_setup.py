@@ -10,7 +10,13 @@ from sphinx_toolbox.testing import Sphinx, run_setup
 # this package
 import sphinxcontrib.extras_require
 from sphinxcontrib.extras_require import __version__, extras_require_purger
+from sphinxcontrib.extras_require.cache import clear_caches, report_statistics
+from sphinxcontrib.extras_require.deferred import resolve_pending_notices
+from sphinxcontrib.extras_require.dependencies import check_outdated, merge_dependencies, purge_dependencies
 from sphinxcontrib.extras_require.directive import ExtrasRequireDirective
+from sphinxcontrib.extras_require.notice import extras_require, reset_prompt_cache
+from sphinxcontrib.extras_require.prefetch import prefetch_requirements
+from sphinxcontrib.extras_require.table import ExtrasRequireTableDirective
 
 
 # https://github.com/sphinx-toolbox/sphinx-toolbox/blob/d1750cf9d19f8f5e7fc5e408f0b50164ac9fad63/tests/common.py#L32
@@ -44,13 +50,34 @@ def test_setup() -> None:
 			"parallel_write_safe": True,
 			}
 
-	assert additional_nodes == set()
+	assert additional_nodes == {extras_require}
 
 	assert get_app_config_values(app.config.values["package_root"]) == (None, "env", [str])
+	assert get_app_config_values(app.config.values["package_roots"]) == ({}, "env", [dict])
 	assert get_app_config_values(app.config.values["pypi_name"]) == (None, "env", [str])
+	assert get_app_config_values(app.config.values["extras_require_site_packages"]) == (None, "env", [str])
+	assert get_app_config_values(app.config.values["extras_require_notice_cache_size"]) == (256, '', [int])
+	assert get_app_config_values(app.config.values["extras_require_prefetch"]) == (False, '', [bool])
+	assert get_app_config_values(app.config.values["extras_require_deferred"]) == (False, "env", [bool])
 
-	assert directives == {"extras-require": ExtrasRequireDirective}
+	assert directives == {
+			"extras-require": ExtrasRequireDirective,
+			"extras-require-table": ExtrasRequireTableDirective,
+			}
 
 	assert app.events.listeners == {
-			"env-purge-doc": [EventListener(id=0, handler=extras_require_purger.purge_nodes, priority=500)],
+			"source-read": [EventListener(id=0, handler=reset_prompt_cache, priority=500)],
+			"env-purge-doc": [
+					EventListener(id=1, handler=extras_require_purger.purge_nodes, priority=500),
+					EventListener(id=2, handler=purge_dependencies, priority=500),
+					],
+			"env-merge-info": [
+					EventListener(id=3, handler=extras_require_purger.merge_info, priority=500),
+					EventListener(id=4, handler=merge_dependencies, priority=500),
+					],
+			"env-get-outdated": [EventListener(id=5, handler=check_outdated, priority=500)],
+			"builder-inited": [EventListener(id=6, handler=clear_caches, priority=500)],
+			"env-before-read-docs": [EventListener(id=7, handler=prefetch_requirements, priority=500)],
+			"env-updated": [EventListener(id=8, handler=resolve_pending_notices, priority=500)],
+			"build-finished": [EventListener(id=9, handler=report_statistics, priority=500)],
 			}
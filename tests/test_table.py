@@ -0,0 +1,116 @@
+# stdlib
+import os
+import re
+from typing import List
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+from sphinx.application import Sphinx
+from sphinx.util.docutils import docutils_namespace
+
+# this package
+from sphinxcontrib.extras_require.sources import pyproject_cache
+from sphinxcontrib.extras_require.table import _sort_order, extras_list
+
+
+def write_pyproject(repo_root: PathPlus, *extras: str, mtime: int) -> None:
+	pyproject_file = repo_root / "pyproject.toml"
+	pyproject_file.write_lines([
+			"[project.optional-dependencies]",
+			*(f'{extra} = ["{extra}-requirement>=1.0", "shared"]' for extra in extras),
+			])
+	os.utime(pyproject_file, ns=(mtime, mtime))
+
+
+def build(repo_root: PathPlus) -> List[str]:
+	with docutils_namespace():
+		app = Sphinx(
+				srcdir=os.fspath(repo_root / "doc-source"),
+				confdir=os.fspath(repo_root / "doc-source"),
+				outdir=os.fspath(repo_root / "build"),
+				doctreedir=os.fspath(repo_root / "build" / ".doctrees"),
+				buildername="html",
+				status=None,
+				warning=None,
+				)
+
+		read: List[str] = []
+		app.connect("env-before-read-docs", lambda app, env, docnames: read.extend(docnames))
+		app.build()
+
+	return sorted(read)
+
+
+def rows(repo_root: PathPlus, docname: str) -> List[str]:
+	output = (repo_root / "build" / f"{docname}.html").read_text()
+	return re.findall(r'<tr class="row-(?:odd|even)"><td><p><code[^>]*><span class="pre">([^<]+)</span>', output)
+
+
+def test_extras_require_table(tmp_pathplus: PathPlus) -> None:
+	doc_source = tmp_pathplus / "doc-source"
+	doc_source.mkdir()
+	(doc_source / "conf.py").write_lines([
+			'extensions = ["sphinxcontrib.extras_require"]',
+			'package_root = "."',
+			'project = "FooBar"',
+			])
+	(doc_source / "index.rst").write_lines([
+			"Index",
+			"=====",
+			'',
+			".. toctree::",
+			'',
+			"\tfiltered",
+			'',
+			".. extras-require-table::",
+			"\t:pyproject:",
+			])
+	(doc_source / "filtered.rst").write_lines([
+			"Filtered",
+			"========",
+			'',
+			".. extras-require-table::",
+			"\t:pyproject:",
+			"\t:sort: source",
+			"\t:exclude: all",
+			'',
+			".. extras-require-table::",
+			"\t:pyproject:",
+			"\t:extras: test, docs",
+			])
+
+	mtime = 1_600_000_000_000_000_000
+	write_pyproject(tmp_pathplus, "test", "docs", "all", mtime=mtime)
+	assert build(tmp_pathplus) == ["filtered", "index"]
+
+	# The file is only parsed once for all the extras.
+	assert pyproject_cache.statistics.misses == 1
+
+	assert rows(tmp_pathplus, "index") == ["all", "docs", "test"]
+	assert rows(tmp_pathplus, "filtered") == ["test", "docs", "docs", "test"]
+
+	output = (tmp_pathplus / "build" / "index.html").read_text()
+	assert "docs-requirement&gt;=1.0" in output
+	assert "python -m pip install FooBar[docs]" in output.replace('</span> <span class="pre">', ' ')
+
+	# The file is touched, but nothing changes.
+	write_pyproject(tmp_pathplus, "test", "docs", "all", mtime=mtime * 2)
+	assert build(tmp_pathplus) == []
+
+	# An extra is added.
+	write_pyproject(tmp_pathplus, "test", "docs", "all", "extra", mtime=mtime * 3)
+	assert build(tmp_pathplus) == ["filtered", "index"]
+	assert rows(tmp_pathplus, "index") == ["all", "docs", "extra", "test"]
+
+
+def test_option_validators() -> None:
+	assert extras_list("test, docs all") == ["test", "docs", "all"]
+
+	with pytest.raises(ValueError, match="argument required but none supplied"):
+		extras_list(None)
+
+	assert _sort_order("Source") == "source"
+
+	with pytest.raises(ValueError, match="must supply an argument; choose from \"name\", or \"source\""):
+		_sort_order(None)